@@ -0,0 +1,94 @@
+# -*- mode: python ; coding: utf-8 -*-
+# cel_coor_tran_system.spec PyInstaller 打包配置（启动优化版）
+#
+# 程序只用到 QtCore/QtGui/QtWidgets，这里把 PyInstaller 默认收集进来的
+# Qml/Quick/WebSockets/Network/Svg 等模块、OpenGL 运行库以及无用插件
+# 全部剔除，减少启动时需要映射和加载的 DLL/so 数量。
+# Qt5DBus 不能剔除：Linux 上的 xcb 平台插件（经 libQt5XcbQpa）链接了它。
+# 改动剔除列表后，用 ldd 检查保留下来的 Qt 库与插件没有 not found。
+# 构建请使用 tools/build.sh（固定哈希种子与时间戳，保证可复现）。
+
+# 不需要的 Python 模块
+EXCLUDED_MODULES = [
+    'PyQt5.QtQml', 'PyQt5.QtQuick', 'PyQt5.QtQuickWidgets', 'PyQt5.QtWebSockets',
+    'PyQt5.QtNetwork', 'PyQt5.QtDBus', 'PyQt5.QtSvg', 'PyQt5.QtOpenGL',
+    'PyQt5.QtPrintSupport', 'PyQt5.QtSql', 'PyQt5.QtTest', 'PyQt5.QtXml',
+    'PyQt5.QtMultimedia', 'PyQt5.QtBluetooth', 'PyQt5.QtPositioning',
+    # 标准库：email 会被 importlib.metadata（numba 等）在运行时导入，unittest、http
+    # 也可能经 numpy.testing 等间接导入，均不剔除
+    'tkinter', 'pydoc', 'doctest',
+]
+
+# 以下列前缀开头的 Qt 动态库一律不打包（Linux 上的 lib 前缀在比较前去掉）
+EXCLUDED_QT_LIBS = (
+    'Qt5Qml', 'Qt5Quick', 'Qt5WebSockets', 'Qt5Network', 'Qt5Svg',
+    # 只随 wayland/eglfs 平台插件使用
+    'Qt5WaylandClient', 'Qt5EglFSDeviceIntegration', 'Qt5EglFsKmsSupport',
+    # 纯 QPainter 绘制，不需要 ANGLE/OpenGL 运行库
+    'd3dcompiler_47', 'EGL', 'GLESv2', 'opengl32sw',
+)
+
+# 只保留的 Qt 插件：各平台的窗口系统插件、无界面渲染用的 offscreen 插件和 Windows 样式
+KEPT_QT_PLUGINS = {
+    'platforms': ('qwindows', 'qxcb', 'qcocoa', 'qoffscreen'),
+    'styles': ('qwindowsvistastyle',),
+    'xcbglintegrations': (),
+}
+
+
+def keep(dest):
+    parts = dest.replace('\\', '/').split('/')
+    name = parts[-1]
+    if name.startswith('lib'):
+        name = name[3:]
+    if any(name.startswith(prefix) for prefix in EXCLUDED_QT_LIBS):
+        return False
+    if 'plugins' in parts:
+        kind = parts[parts.index('plugins') + 1]
+        kept = KEPT_QT_PLUGINS.get(kind)
+        if kept is None:
+            return False
+        return any(name.startswith(prefix) for prefix in kept)
+    if 'translations' in parts and 'Qt5' in parts:
+        return False
+    return True
+
+
+a = Analysis(
+    ['enterance.py'],
+    pathex=[],
+    binaries=[],
+    datas=[],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=EXCLUDED_MODULES,
+    noarchive=False,
+)
+a.binaries = [entry for entry in a.binaries if keep(entry[0])]
+a.datas = [entry for entry in a.datas if keep(entry[0])]
+
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='cel_coor_tran_system',
+    debug=False,
+    bootloader_ignore_signals=False,
+    # strip 会破坏 numpy 自带的 OpenBLAS 动态库，保持关闭
+    strip=False,
+    upx=False,
+    console=False,
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    name='cel_coor_tran_system',
+)
@@ -0,0 +1,33 @@
+# celcoord 天球坐标转换核心包（不依赖 Qt）
+#
+# 标量函数只依赖标准库，导入本包几乎没有开销；
+# 批量函数依赖 numpy，首次访问时才导入。
+from .coords import (hms_to_hours, hours_to_hms, dms_to_deg, deg_to_dms,
+                     spherical_to_cartesian, cartesian_to_spherical,
+                     angular_separation, distance_3d)
+
+_LAZY = {
+    'spherical_to_cartesian_batch': 'batch',
+    'cartesian_to_spherical_batch': 'batch',
+    'hours_to_hms_batch': 'batch',
+    'deg_to_dms_batch': 'batch',
+    'iter_catalog_chunks': 'catalog',
+    'separation_from': 'separation',
+    'distance_from': 'separation',
+    'iter_pair_tiles': 'separation',
+    'pairs_within': 'separation',
+}
+
+__all__ = ['hms_to_hours', 'hours_to_hms', 'dms_to_deg', 'deg_to_dms',
+           'spherical_to_cartesian', 'cartesian_to_spherical',
+           'angular_separation', 'distance_3d'] + list(_LAZY)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+        module = importlib.import_module('.' + _LAZY[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,276 @@
+# celcoord/__main__.py 命令行入口：python -m celcoord <子命令>
+import argparse
+import os
+import sys
+import time
+
+
+def cmd_convert(args):
+    from .catalog import default_output_path
+    from .pipeline import convert_file
+    output = args.output or default_output_path(args.input)
+    from . import arrow_io
+    if arrow_io.is_arrow(args.input) or arrow_io.is_arrow(output) or args.region or args.keep:
+        keep = args.keep.split(',') if args.keep else ()
+        try:
+            rows, _ = arrow_io.convert_file(args.input, output, args.region, keep,
+                                            args.chunk_rows)
+        except (ImportError, ValueError) as e:
+            # 缺少 pyarrow、星表中没有 --keep 指定的列、附加列与输入输出格式不符等
+            print(e, file=sys.stderr)
+            return 2
+    else:
+        rows = convert_file(args.input, output, args.chunk_rows, args.workers, args.buffers)
+    print(f"{rows} 行 → {output}", file=sys.stderr)
+    return 0
+
+
+def cmd_pipe(args):
+    from .stream import run_pipe
+    # 读线程直接读无缓冲的文件描述符：--strict 出错退出时读线程可能仍阻塞在读取中，
+    # 若它持有 sys.stdin.buffer 的锁，解释器退出时会因拿不到锁而中止
+    stdin = open(sys.stdin.fileno(), 'rb', buffering=0, closefd=False)
+    try:
+        run_pipe(stdin, sys.stdout.buffer, fmt=args.format,
+                 max_batch=args.max_batch, max_buffer=args.max_buffer,
+                 strict=args.strict)
+    except BrokenPipeError:
+        # 下游提前关闭（例如 | head）：把标准输出指向 /dev/null，
+        # 免得解释器退出时 flush 再次报错；标准错误保持可用
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except (ValueError, OSError) as e:
+        # --strict 下的错误记录，或读取标准输入失败
+        print(e, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+
+def cmd_watch(args):
+    from .incremental import update, watch
+    from .catalog import default_output_path
+    output = args.output or default_output_path(args.input)
+
+    def report(mode, rows):
+        label = '重建' if mode == 'rebuild' else '追加'
+        print(f"{time.strftime('%H:%M:%S')} {label} {rows} 行 → {output}", file=sys.stderr)
+        if args.metrics:
+            # 长时间运行时每次更新后刷新指标文件
+            from . import metrics
+            metrics.write(args.metrics)
+
+    if args.once:
+        report(*update(args.input, output, args.chunk_rows))
+        return 0
+    try:
+        watch(args.input, output, args.interval, args.chunk_rows, report)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_galactocentric(args):
+    from .galactic import GalactocentricFrame, transform_file, default_output_path
+    output = args.output or default_output_path(args.input)
+    frame = GalactocentricFrame(args.galcen_distance, args.z_sun, args.v_sun, args.roll)
+    rows = transform_file(args.input, output, frame, args.chunk_rows)
+    print(f"{rows} 行 → {output}", file=sys.stderr)
+    return 0
+
+
+def cmd_store_import(args):
+    from .store import CatalogStore
+    with CatalogStore(args.database) as store:
+        rows = store.import_file(args.input, args.chunk_rows)
+        print(f"{rows} 行 → {args.database}（共 {len(store)} 行）", file=sys.stderr)
+    return 0
+
+
+def cmd_store_query(args):
+    from .arrow_io import is_arrow, ArrowCatalogWriter
+    from .catalog import write_header, write_chunk, write_raw_chunk
+    from .incremental import output_format
+    import sqlite3
+    from .store import CatalogStore
+    try:
+        store = CatalogStore(args.database, readonly=True)
+    except sqlite3.Error as e:
+        # 只读打开不会新建库文件，路径写错时直接报告
+        print(f"无法打开星表库 {args.database}：{e}", file=sys.stderr)
+        return 2
+    with store:
+        if args.region:
+            ids, chunk = store.query_region(args.region, args.limit)
+        else:
+            ids, chunk = store.query_cone(*args.cone, args.limit)
+    if args.output is None:
+        write_header(sys.stdout)
+        write_chunk(sys.stdout, chunk)
+    elif is_arrow(args.output):
+        with ArrowCatalogWriter(args.output) as writer:
+            writer.write(chunk)
+    elif output_format(args.output) == 'raw':
+        with open(args.output, 'wb') as out:
+            write_raw_chunk(out, chunk)
+    else:
+        with open(args.output, 'w', newline='') as out:
+            write_header(out)
+            write_chunk(out, chunk)
+    print(f"{len(ids)} 行", file=sys.stderr)
+    return 0
+
+
+def cmd_verify(args):
+    import json
+    from .verify import run, format_report
+    backends = args.backends.split(',') if args.backends else None
+    report = run(args.samples, args.rows, args.seed, backends)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+    return 0 if report['passed'] else 1
+
+
+def region_arg(text):
+    # argparse 的 type：格式错误时给出用法提示而不是异常栈
+    from .arrow_io import parse_region
+    try:
+        return parse_region(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"天区应为 ra_min,ra_max,dec_min,dec_max 四个数: {text!r}") from None
+
+
+def cone_arg(text):
+    try:
+        ra, dec, radius = (float(v) for v in text.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"圆锥应为 ra,dec,radius 三个数: {text!r}") from None
+    if not radius >= 0:
+        raise argparse.ArgumentTypeError(f"圆锥半径不能为负: {text!r}")
+    return ra, dec, radius
+
+
+def velocity_arg(text):
+    try:
+        u, v, w = (float(x) for x in text.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"速度应为 U,V,W 三个数: {text!r}") from None
+    return u, v, w
+
+
+def build_parser():
+    from .catalog import DEFAULT_CHUNK_ROWS
+    from .pipeline import DEFAULT_BUFFERS
+    from .stream import DEFAULT_MAX_BATCH, DEFAULT_MAX_BUFFER
+    parser = argparse.ArgumentParser(prog='python -m celcoord',
+                                     description="天球坐标批量转换工具")
+    parser.add_argument('--metrics', metavar='PATH',
+                        help="记录各阶段吞吐量、队列深度等指标并写到 PATH（.json 为 JSON，"
+                             "否则为 Prometheus 文本格式）")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="运行期间采样调用栈，结束时把折叠栈写到 PATH（可用 flamegraph 查看）")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('convert', help="转换 CSV 或 Parquet 星表文件")
+    p.add_argument('input', help="CSV 星表，或 .parquet 文件（需要 pyarrow）")
+    p.add_argument('-o', '--output', help="输出路径，默认为 <输入名>_converted.<原扩展名>；"
+                                        "以 .f64/.bin 结尾时写成可内存映射的二进制文件，"
+                                        "以 .parquet/.arrow/.feather 结尾时写成列式文件")
+    p.add_argument('--region', metavar='RA1,RA2,DEC1,DEC2', type=region_arg,
+                   help="只输出该天区内的天体（赤经单位为时，RA1 > RA2 表示跨过 0 时）；"
+                        "Parquet 输入按行组统计值跳过不相交的行组")
+    p.add_argument('--keep', metavar='COLS', help="从 Parquet 输入原样带到列式输出的附加列，逗号分隔")
+    p.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    p.add_argument('--workers', type=int, default=1, help="计算线程数（读、写各另占一个线程）")
+    p.add_argument('--buffers', type=int, default=DEFAULT_BUFFERS,
+                   help="预分配的块缓冲区个数，决定最多预读多少块")
+    p.set_defaults(func=cmd_convert)
+
+    p = sub.add_parser('pipe', help="从标准输入流式读取记录，转换后写到标准输出")
+    p.add_argument('--format', choices=('auto', 'ndjson', 'csv'), default='auto',
+                   help="输入格式，auto 时首行以 { 开头视为 NDJSON")
+    p.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH,
+                   help="突发输入时每批最多转换的记录数")
+    p.add_argument('--max-buffer', type=int, default=DEFAULT_MAX_BUFFER,
+                   help="已读取但未转换的数据上限（字节），超出时停止读取以反压上游")
+    p.add_argument('--strict', action='store_true', help="遇到无法解析的记录时报错退出")
+    p.set_defaults(func=cmd_pipe)
+
+    p = sub.add_parser('watch', help="增量转换只追加的星表文件，文件被改写时自动重建")
+    p.add_argument('input')
+    p.add_argument('-o', '--output',
+                   help="输出路径，以 .f64/.bin 结尾时写成可内存映射的二进制文件")
+    p.add_argument('--interval', type=float, default=2.0, help="轮询间隔（秒）")
+    p.add_argument('--once', action='store_true', help="只更新一次后退出")
+    p.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser('galactocentric', help="把星表转换为银心直角坐标（及速度）")
+    p.add_argument('input', help="CSV 星表或 watch 生成的 .f64/.bin 二进制文件；"
+                                 "CSV 含 pmra,pmdec,rv 列时同时输出速度")
+    p.add_argument('-o', '--output', help="输出路径，以 .f64/.bin 结尾时写成二进制文件")
+    p.add_argument('--galcen-distance', type=float, default=8122.0, help="太阳到银心的距离 (pc)")
+    p.add_argument('--z-sun', type=float, default=20.8, help="太阳在银盘上方的高度 (pc)")
+    p.add_argument('--v-sun', metavar='U,V,W', type=velocity_arg, default=(12.9, 245.6, 7.78),
+                   help="太阳的银心速度 U,V,W (km/s)")
+    p.add_argument('--roll', type=float, default=0.0, help="绕银心方向的附加转角 (度)")
+    p.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    p.set_defaults(func=cmd_galactocentric)
+
+    p = sub.add_parser('store', help="本地 SQLite 星表库：导入星表、按天区或圆锥查询")
+    store_sub = p.add_subparsers(dest='action', required=True)
+    q = store_sub.add_parser('import', help="把 CSV 或 Parquet 星表追加导入到库中")
+    q.add_argument('database', help="库文件，不存在时新建")
+    q.add_argument('input')
+    q.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    q.set_defaults(func=cmd_store_import)
+    q = store_sub.add_parser('query', help="查询天区或圆锥内的天体")
+    q.add_argument('database')
+    shape = q.add_mutually_exclusive_group(required=True)
+    shape.add_argument('--region', metavar='RA1,RA2,DEC1,DEC2', type=region_arg,
+                       help="赤经赤纬范围（赤经单位为时，RA1 > RA2 表示跨过 0 时）")
+    shape.add_argument('--cone', metavar='RA,DEC,RADIUS', type=cone_arg,
+                       help="圆锥中心的赤经(时)、赤纬(度)与角半径(度)")
+    q.add_argument('--limit', type=int, help="结果较多时按步长抽样到约 LIMIT 行")
+    q.add_argument('-o', '--output', help="输出路径（CSV、.f64/.bin 或 .parquet/.arrow），"
+                                         "默认以 CSV 写到标准输出")
+    q.set_defaults(func=cmd_store_query)
+
+    from .verify import DEFAULT_SAMPLES, DEFAULT_THROUGHPUT_ROWS
+    p = sub.add_parser('verify', help="以标量函数为参考校验各批量后端的精度并测量吞吐量")
+    p.add_argument('--samples', type=int, default=DEFAULT_SAMPLES,
+                   help="边界值之外的随机样本数")
+    p.add_argument('--rows', type=int, default=DEFAULT_THROUGHPUT_ROWS,
+                   help="测量吞吐量的行数，0 表示跳过")
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--backends', help="逗号分隔的后端列表，默认为全部可用后端")
+    p.add_argument('--json', metavar='PATH', help="同时把完整报告写成 JSON")
+    p.set_defaults(func=cmd_verify)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.metrics:
+        from . import metrics
+        metrics.enable()
+    profiler = None
+    if args.profile:
+        from .metrics import SamplingProfiler
+        profiler = SamplingProfiler().start()
+    try:
+        return args.func(args)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            profiler.write(args.profile)
+        if args.metrics:
+            metrics.write(args.metrics)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+# celcoord/_jit.py numba JIT 内核（可选依赖）
+#
+# 每个内核与 numpy 版本逐行执行相同的浮点运算（取模、floor、rint 与按相同顺序的
+# 四则运算），结果逐位一致。三角函数不在内核里算，见 cartesian_to_spherical_into。
+# 输入均为一维连续的 float64 数组，由调用方负责整理形状。
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def hours_to_hms(hours, scale):
+    # scale <= 0 表示不取整
+    n = hours.shape[0]
+    h_out = np.empty(n, dtype=np.int64)
+    m_out = np.empty(n, dtype=np.int64)
+    s_out = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        value = hours[i] % 24.0
+        if value >= 24.0:
+            value -= 24.0
+        h = np.floor(value)
+        remainder = (value - h) * 60
+        m = np.floor(remainder)
+        s = (remainder - m) * 60
+        if scale > 0:
+            s = np.rint(s * scale) / scale
+            if s >= 60:
+                s -= 60
+                m += 1
+            if m >= 60:
+                m -= 60
+                h += 1
+            if h >= 24:
+                h -= 24
+        h_out[i] = np.int64(h)
+        m_out[i] = np.int64(m)
+        s_out[i] = s
+    return h_out, m_out, s_out
+
+
+@njit(cache=True)
+def deg_to_dms(deg, scale):
+    n = deg.shape[0]
+    d_out = np.empty(n, dtype=np.int64)
+    m_out = np.empty(n, dtype=np.int64)
+    s_out = np.empty(n, dtype=np.float64)
+    sign_out = np.empty(n, dtype=np.int64)
+    for i in range(n):
+        value = deg[i]
+        sign_out[i] = 1 if value >= 0 else -1
+        value = abs(value)
+        d = np.floor(value)
+        remainder = (value - d) * 60
+        m = np.floor(remainder)
+        s = (remainder - m) * 60
+        if scale > 0:
+            s = np.rint(s * scale) / scale
+            if s >= 60:
+                s -= 60
+                m += 1
+            if m >= 60:
+                m -= 60
+                d += 1
+        d_out[i] = np.int64(d)
+        m_out[i] = np.int64(m)
+        s_out[i] = s
+    return d_out, m_out, s_out, sign_out
+
+
+def cartesian_to_spherical(x, y, z):
+    n = x.shape[0]
+    ra_out = np.empty(n, dtype=np.float64)
+    dec_out = np.empty(n, dtype=np.float64)
+    r_out = np.empty(n, dtype=np.float64)
+    cartesian_to_spherical_into(x, y, z, ra_out, dec_out, r_out)
+    return ra_out, dec_out, r_out
+
+
+def cartesian_to_spherical_into(x, y, z, ra_out, dec_out, r_out):
+    # 结果写入调用方提供的数组（可以是非连续的列视图）。
+    # arctan2/arcsin 仍用 numpy 的 ufunc 在连续数组上计算：numpy 的 SIMD 实现与 numba
+    # 调用的 libm 末位可能不同，这样两个后端的结果逐位一致；其余逐行运算在内核中完成。
+    vector_norm(x, y, z, r_out)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ra = np.arctan2(np.ascontiguousarray(y), np.ascontiguousarray(x))
+        dec = np.arcsin(np.ascontiguousarray(z) / r_out)
+    spherical_angles(ra, dec, r_out, ra_out, dec_out)
+
+
+@njit(cache=True)
+def vector_norm(x, y, z, r_out):
+    for i in range(x.shape[0]):
+        r_out[i] = np.sqrt(x[i]**2 + y[i]**2 + z[i]**2)
+
+
+@njit(cache=True)
+def spherical_angles(ra_rad, dec_rad, r, ra_out, dec_out):
+    # 弧度 -> 赤经(时)/赤纬(度)；r == 0 的行与标量版本一致，返回 (0, 0)
+    for i in range(r.shape[0]):
+        if r[i] == 0:
+            ra_out[i] = 0.0
+            dec_out[i] = 0.0
+            continue
+        ra_deg = np.degrees(ra_rad[i]) % 360
+        ra_out[i] = ra_deg / 15 % 24
+        dec_out[i] = np.degrees(dec_rad[i])
+
+
+@njit(cache=True)
+def bin_cells(ra_deg, sin_dec, n_ra, n_dec, counts):
+    # 在 counts 上原地累加每个天体所在的等面积格子
+    ra_scale = n_ra / 360
+    dec_scale = n_dec / 2
+    for i in range(ra_deg.shape[0]):
+        i_ra = np.int64(np.floor(ra_deg[i] % 360 * ra_scale))
+        i_dec = np.int64(np.floor((sin_dec[i] + 1) * dec_scale))
+        i_ra = min(max(i_ra, 0), n_ra - 1)
+        i_dec = min(max(i_dec, 0), n_dec - 1)
+        counts[i_dec * n_ra + i_ra] += 1
+
+
+@njit(cache=True)
+def project_points(xyz, matrix, width, height):
+    # 透视投影：返回屏幕坐标 (N, 2) 与相机前方掩码，不按屏幕范围裁剪
+    n = xyz.shape[0]
+    xy = np.empty((n, 2), dtype=np.float64)
+    visible = np.empty(n, dtype=np.bool_)
+    for i in range(n):
+        px, py, pz = xyz[i, 0], xyz[i, 1], xyz[i, 2]
+        w = matrix[3, 0] * px + matrix[3, 1] * py + matrix[3, 2] * pz + matrix[3, 3]
+        cx = (matrix[0, 0] * px + matrix[0, 1] * py + matrix[0, 2] * pz + matrix[0, 3]) / w
+        cy = (matrix[1, 0] * px + matrix[1, 1] * py + matrix[1, 2] * pz + matrix[1, 3]) / w
+        cz = (matrix[2, 0] * px + matrix[2, 1] * py + matrix[2, 2] * pz + matrix[2, 3]) / w
+        sx = (cx + 1) * width / 2
+        sy = (1 - cy) * height / 2
+        xy[i, 0] = sx
+        xy[i, 1] = sy
+        visible[i] = cz > 0
+    return xy, visible
+
+
+@njit(cache=True)
+def galactocentric_positions(ra_hours, dec_deg, distance, matrix, offset, out):
+    # 球面 -> 日心直角 -> 银心直角，一次遍历完成，结果写入 out (N, 3)
+    for i in range(ra_hours.shape[0]):
+        ra = np.radians(ra_hours[i] * 15)
+        dec = np.radians(dec_deg[i])
+        cos_dec = np.cos(dec)
+        x = distance[i] * cos_dec * np.cos(ra)
+        y = distance[i] * cos_dec * np.sin(ra)
+        z = distance[i] * np.sin(dec)
+        for k in range(3):
+            out[i, k] = matrix[k, 0] * x + matrix[k, 1] * y + matrix[k, 2] * z + offset[k]
+
+
+@njit(cache=True)
+def galactocentric_velocities(ra_hours, dec_deg, distance, pmra, pmdec, rv, matrix,
+                              v_offset, out):
+    # 自行、视向速度 -> 日心赤道速度 -> 银心速度 (km/s)，K = 4.740470463533348
+    for i in range(ra_hours.shape[0]):
+        ra = np.radians(ra_hours[i] * 15)
+        dec = np.radians(dec_deg[i])
+        sin_ra, cos_ra = np.sin(ra), np.cos(ra)
+        sin_dec, cos_dec = np.sin(dec), np.cos(dec)
+        scale = 4.740470463533348e-3 * distance[i]
+        v_ra = scale * pmra[i]
+        v_dec = scale * pmdec[i]
+        vx = rv[i] * cos_dec * cos_ra - v_ra * sin_ra - v_dec * sin_dec * cos_ra
+        vy = rv[i] * cos_dec * sin_ra + v_ra * cos_ra - v_dec * sin_dec * sin_ra
+        vz = rv[i] * sin_dec + v_dec * cos_dec
+        for k in range(3):
+            out[i, k] = matrix[k, 0] * vx + matrix[k, 1] * vy + matrix[k, 2] * vz + v_offset[k]
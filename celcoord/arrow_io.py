@@ -0,0 +1,261 @@
+# celcoord/arrow_io.py Parquet / Arrow 星表的列式读写（需要 pyarrow，可选依赖）
+#
+# 读取时只取需要的列（ra,dec,distance 或 x,y,z，以及 keep 指定的附加列），其余几十列
+# 不解码。给定天区 region 时，先用各行组 ra/dec 列的 min/max 统计值跳过整组不相交的
+# 行组，再在剩余行中逐行筛选。列数据以 numpy 数组进出 pyarrow，数值不经过 Python 对象。
+# pyarrow 在首次调用时才导入；未安装时抛出 ImportError，说明需要安装的包。
+import numpy as np
+from .batch import spherical_to_cartesian_batch, cartesian_to_spherical_batch
+from .catalog import (DEFAULT_CHUNK_ROWS, SPHERICAL_COLUMNS, CARTESIAN_COLUMNS,
+                      COLUMN_ALIASES, CatalogChunk, iter_catalog_chunks, write_header,
+                      write_chunk, write_raw_chunk)
+from .incremental import output_format
+from . import metrics
+
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+ARROW_EXTENSIONS = ('.arrow', '.feather', '.ipc')
+OUTPUT_COLUMNS = SPHERICAL_COLUMNS + CARTESIAN_COLUMNS
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.ipc
+    except ImportError:
+        raise ImportError("读写 Parquet/Arrow 星表需要安装 pyarrow（pip install pyarrow）") \
+            from None
+    return pyarrow
+
+
+def available():
+    try:
+        _pyarrow()
+    except ImportError:
+        return False
+    return True
+
+
+def is_parquet(path):
+    return path.lower().endswith(PARQUET_EXTENSIONS)
+
+
+def is_arrow(path):
+    # Parquet 或 Arrow IPC（feather v2）文件
+    return path.lower().endswith(PARQUET_EXTENSIONS + ARROW_EXTENSIONS)
+
+
+def parse_region(text):
+    # 'ra_min,ra_max,dec_min,dec_max'（赤经单位为时）-> 元组；ra_min > ra_max 表示跨过 0 时
+    values = [float(v) for v in text.split(',')]
+    if len(values) != 4:
+        raise ValueError("天区应为 ra_min,ra_max,dec_min,dec_max")
+    return tuple(values)
+
+
+def in_region(ra_hours, dec_deg, region):
+    # 逐行判断是否落在天区内，返回布尔数组
+    ra_min, ra_max, dec_min, dec_max = region
+    ra = np.asarray(ra_hours) % 24
+    if ra_min <= ra_max:
+        mask = (ra >= ra_min) & (ra <= ra_max)
+    else:
+        mask = (ra >= ra_min) | (ra <= ra_max)
+    return mask & (dec_deg >= dec_min) & (dec_deg <= dec_max)
+
+
+def _overlaps(region, ra_stats, dec_stats):
+    # 行组的 ra/dec 取值范围是否可能与天区相交；没有统计值时按相交处理
+    ra_min, ra_max, dec_min, dec_max = region
+    if dec_stats is not None and (dec_stats[1] < dec_min or dec_stats[0] > dec_max):
+        return False
+    if ra_stats is None or ra_stats[0] < 0 or ra_stats[1] >= 24:
+        return True
+    if ra_min <= ra_max:
+        return ra_stats[1] >= ra_min and ra_stats[0] <= ra_max
+    return ra_stats[1] >= ra_min or ra_stats[0] <= ra_max
+
+
+def _column_names(names):
+    # 规范化后的列名 -> 原列名
+    return {COLUMN_ALIASES.get(n.strip().lower(), n.strip().lower()): n for n in names}
+
+
+def _select_columns(names):
+    normalized = _column_names(names)
+    for kind, wanted in (('spherical', SPHERICAL_COLUMNS), ('cartesian', CARTESIAN_COLUMNS)):
+        if all(c in normalized for c in wanted):
+            return kind, [normalized[c] for c in wanted]
+    raise ValueError("无法识别星表列：需要 ra,dec,distance 或 x,y,z")
+
+
+def _statistics(row_group, index):
+    stats = row_group.column(index).statistics
+    if stats is None or not stats.has_min_max:
+        return None
+    return float(stats.min), float(stats.max)
+
+
+def plan_row_groups(metadata, kind, columns, region):
+    """按 min/max 统计值挑出需要读取的行组，返回 (行组下标列表, 跳过的行组数)
+
+    只有球面坐标列才能据统计值判断；直角坐标输入读取全部行组，读入后逐行筛选。
+    """
+    groups = list(range(metadata.num_row_groups))
+    if region is None or kind != 'spherical':
+        return groups, 0
+    paths = [metadata.schema.column(i).path for i in range(metadata.num_columns)]
+    ra_index, dec_index = paths.index(columns[0]), paths.index(columns[1])
+    kept = []
+    for i in groups:
+        row_group = metadata.row_group(i)
+        if _overlaps(region, _statistics(row_group, ra_index), _statistics(row_group, dec_index)):
+            kept.append(i)
+    return kept, len(groups) - len(kept)
+
+
+def _to_numpy(array):
+    # 无空值的 float64 列零拷贝；其他数值类型转换为 float64，空值为 NaN
+    return np.asarray(array.to_numpy(zero_copy_only=False), dtype=np.float64)
+
+
+def iter_parquet_chunks(path, region=None, keep=(), chunk_rows=DEFAULT_CHUNK_ROWS):
+    """逐块读取 Parquet 星表并完成双向转换，产出 (CatalogChunk, 附加列)
+
+    附加列为 keep 中各列（原列名）的 pyarrow 数组，已按天区筛选，可直接写回。
+    CatalogChunk 的 bytes_read/total_bytes 这里为已读行数/总行数，仅用于报告进度。
+    """
+    pa = _pyarrow()
+    parquet = pa.parquet.ParquetFile(path)
+    metadata = parquet.metadata
+    kind, columns = _select_columns(parquet.schema_arrow.names)
+    missing = [c for c in keep if c not in parquet.schema_arrow.names]
+    if missing:
+        raise ValueError(f"星表中没有列: {', '.join(missing)}")
+    groups, skipped = plan_row_groups(metadata, kind, columns, region)
+    if metrics.enabled:
+        metrics.inc('celcoord_row_groups_total', len(groups), result='read')
+        metrics.inc('celcoord_row_groups_total', skipped, result='skipped')
+    if not groups:
+        return
+    total = sum(metadata.row_group(i).num_rows for i in groups)
+    done = 0
+    read_columns = columns + [c for c in keep if c not in columns]
+    for batch in parquet.iter_batches(batch_size=chunk_rows, row_groups=groups,
+                                      columns=read_columns):
+        done += batch.num_rows
+        with metrics.stage('parse', batch.num_rows, format='parquet'):
+            a, b, c = (_to_numpy(batch.column(name)) for name in columns)
+        if kind == 'spherical':
+            chunk = CatalogChunk(a, b, c, *spherical_to_cartesian_batch(a, b, c), done, total)
+        else:
+            chunk = CatalogChunk(*cartesian_to_spherical_batch(a, b, c), a, b, c, done, total)
+        extras = [batch.column(name) for name in keep]
+        if region is not None:
+            mask = in_region(chunk.ra_hours, chunk.dec_deg, region)
+            if not mask.all():
+                chunk = _filter_chunk(chunk, mask)
+                extras = [array.filter(pa.array(mask)) for array in extras]
+        if len(chunk):
+            yield chunk, extras
+
+
+def _filter_chunk(chunk, mask):
+    return CatalogChunk(chunk.ra_hours[mask], chunk.dec_deg[mask], chunk.distance[mask],
+                        chunk.x[mask], chunk.y[mask], chunk.z[mask],
+                        chunk.bytes_read, chunk.total_bytes)
+
+
+def _iter_csv(path, region, chunk_rows):
+    for chunk in iter_catalog_chunks(path, chunk_rows):
+        if region is not None:
+            chunk = _filter_chunk(chunk, in_region(chunk.ra_hours, chunk.dec_deg, region))
+        if len(chunk):
+            yield chunk, []
+
+
+class ArrowCatalogWriter:
+    """把转换结果按块写成 Parquet（按扩展名）或 Arrow IPC 文件
+
+    每块写成一个 Parquet 行组，行组带 min/max 统计值，输出本身也能按天区裁剪读取。
+    extra_fields 为附加列的 pyarrow 字段，写在坐标列之前。
+    """
+
+    def __init__(self, path, extra_fields=(), compression='zstd'):
+        pa = _pyarrow()
+        self._pa = pa
+        self.format = 'parquet' if is_parquet(path) else 'arrow'
+        self.schema = pa.schema(list(extra_fields) +
+                                [pa.field(name, pa.float64()) for name in OUTPUT_COLUMNS])
+        if self.format == 'parquet':
+            self._writer = pa.parquet.ParquetWriter(path, self.schema, compression=compression)
+        else:
+            self._writer = pa.ipc.new_file(path, self.schema)
+
+    def write(self, chunk, extras=()):
+        pa = self._pa
+        with metrics.stage('write', len(chunk), format=self.format):
+            arrays = list(extras) + [pa.array(column) for column in
+                                     (chunk.ra_hours, chunk.dec_deg, chunk.distance,
+                                      chunk.x, chunk.y, chunk.z)]
+            table = pa.Table.from_arrays(arrays, schema=self.schema)
+            self._writer.write_table(table)
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def convert_file(input_path, output_path, region=None, keep=(), chunk_rows=DEFAULT_CHUNK_ROWS,
+                 on_chunk=None, cancel=None):
+    """转换 Parquet 或 CSV 星表，输出按扩展名写成 Parquet、Arrow IPC、二进制或 CSV
+
+    region 为 (ra_min, ra_max, dec_min, dec_max)，赤经单位为时；keep 为需要原样带到输出的
+    列（仅 Parquet 输入、Parquet/Arrow 输出时可用）。on_chunk(chunk) 在每块写出后调用，
+    cancel() 返回真时在块与块之间停止。返回 (写出的行数, 是否被取消)。
+    """
+    keep = list(keep)
+    if keep and not (is_parquet(input_path) and is_arrow(output_path)):
+        raise ValueError("附加列只能从 Parquet 输入带到 Parquet/Arrow 输出")
+    if is_parquet(input_path):
+        chunks = iter_parquet_chunks(input_path, region, keep, chunk_rows)
+    else:
+        chunks = _iter_csv(input_path, region, chunk_rows)
+
+    if is_arrow(output_path):
+        extra_fields = []
+        if keep:
+            schema = _pyarrow().parquet.read_schema(input_path)
+            missing = [c for c in keep if c not in schema.names]
+            if missing:
+                raise ValueError(f"星表中没有列: {', '.join(missing)}")
+            extra_fields = [schema.field(name) for name in keep]
+        writer = ArrowCatalogWriter(output_path, extra_fields)
+        write = writer.write
+    else:
+        raw = output_format(output_path) == 'raw'
+        writer = open(output_path, 'wb') if raw else open(output_path, 'w', newline='')
+        if not raw:
+            write_header(writer)
+
+        def write(chunk, extras):
+            (write_raw_chunk if raw else write_chunk)(writer, chunk)
+
+    rows = 0
+    try:
+        with writer:
+            for chunk, extras in chunks:
+                if cancel is not None and cancel():
+                    return rows, True
+                write(chunk, extras)
+                rows += len(chunk)
+                if on_chunk is not None:
+                    on_chunk(chunk)
+    finally:
+        chunks.close()
+    return rows, False
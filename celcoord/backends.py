@@ -0,0 +1,67 @@
+# celcoord/backends.py 批量计算后端的选择
+#
+# 'numpy' 为默认的向量化实现；安装了 numba 时可选用 'numba'，由 _jit.py 提供
+# 逐行循环的 JIT 内核（进位、r == 0 分支、分格与裁剪等不易向量化的逻辑）。
+# 选择顺序：set_backend() > 环境变量 CELCOORD_BACKEND (auto/numpy/numba) > auto。
+# auto 在 numba 可用时使用 numba，否则静默回退到 numpy。
+import os
+from contextlib import contextmanager
+
+BACKENDS = ('numpy', 'numba')
+
+_backend = None
+_jit_module = None
+
+
+def jit_kernels():
+    # 返回 _jit 模块，numba 未安装时返回 None
+    global _jit_module
+    if _jit_module is None:
+        try:
+            from . import _jit as module
+        except ImportError:
+            module = False
+        _jit_module = module
+    return _jit_module or None
+
+
+def available_backends():
+    return [name for name in BACKENDS if name == 'numpy' or jit_kernels() is not None]
+
+
+def _resolve(name):
+    if name == 'auto':
+        return 'numba' if jit_kernels() is not None else 'numpy'
+    if name not in BACKENDS:
+        raise ValueError(f"未知的计算后端 {name!r}，可选 auto/{'/'.join(BACKENDS)}")
+    if name == 'numba' and jit_kernels() is None:
+        raise ImportError("numba 后端需要安装 numba")
+    return name
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = _resolve(os.environ.get('CELCOORD_BACKEND', 'auto'))
+    return _backend
+
+
+def set_backend(name):
+    global _backend
+    _backend = _resolve(name)
+
+
+@contextmanager
+def using(name):
+    # 临时切换后端，便于对比不同后端的结果
+    global _backend
+    previous = _backend
+    set_backend(name)
+    try:
+        yield
+    finally:
+        _backend = previous
+
+
+def use_jit():
+    return get_backend() == 'numba'
@@ -0,0 +1,90 @@
+# celcoord/batch.py 坐标转换的批量（向量化）版本
+# 输入为等长数组，供星表文件转换使用；语义与 coords.py 中的标量版本一致。
+# 不易向量化的函数在选用 numba 后端时改走 _jit.py 中的内核（见 backends.py）。
+import numpy as np
+from .backends import use_jit, jit_kernels
+from .metrics import timed
+
+def _flatten(*arrays):
+    # JIT 内核只接受一维连续的 float64 数组
+    arrays = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in arrays))
+    return arrays[0].shape, [np.ascontiguousarray(a).ravel() for a in arrays]
+
+def _scale(decimals):
+    return -1.0 if decimals is None else 10.0 ** decimals
+
+@timed('convert')
+def spherical_to_cartesian_batch(ra_hours, dec_deg, distance):
+    ra_rad = np.radians(np.asarray(ra_hours, dtype=np.float64) * 15)
+    dec_rad = np.radians(np.asarray(dec_deg, dtype=np.float64))
+    distance = np.asarray(distance, dtype=np.float64)
+    cos_dec = np.cos(dec_rad)
+    x = distance * cos_dec * np.cos(ra_rad)
+    y = distance * cos_dec * np.sin(ra_rad)
+    z = distance * np.sin(dec_rad)
+    return x, y, z
+
+@timed('convert')
+def cartesian_to_spherical_batch(x, y, z):
+    if use_jit():
+        shape, flat = _flatten(x, y, z)
+        return tuple(a.reshape(shape) for a in jit_kernels().cartesian_to_spherical(*flat))
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    z = np.asarray(z, dtype=np.float64)
+    r = np.sqrt(x**2 + y**2 + z**2)
+    zero = r == 0
+    ra_deg = np.degrees(np.arctan2(np.ascontiguousarray(y), np.ascontiguousarray(x))) % 360
+    ra_hours = ra_deg / 15 % 24
+    # r == 0 的行与标量版本一致，返回 (0, 0, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dec_deg = np.degrees(np.arcsin(z / r))
+    ra_hours = np.where(zero, 0.0, ra_hours)
+    dec_deg = np.where(zero, 0.0, dec_deg)
+    return ra_hours, dec_deg, r
+
+def _carry(big, minutes, seconds, decimals):
+    # 与 coords.round_seconds 相同的取整方式，再把 60 秒/60 分向上进位
+    scale = 10.0 ** decimals
+    seconds = np.rint(seconds * scale) / scale
+    carry = seconds >= 60
+    seconds = np.where(carry, seconds - 60, seconds)
+    minutes = minutes + carry
+    carry = minutes >= 60
+    minutes = np.where(carry, minutes - 60, minutes)
+    return big + carry, minutes, seconds
+
+@timed('convert')
+def hours_to_hms_batch(hours, decimals=None):
+    if use_jit():
+        shape, (flat,) = _flatten(hours)
+        return tuple(a.reshape(shape) for a in
+                     jit_kernels().hours_to_hms(flat, _scale(decimals)))
+    hours = np.asarray(hours, dtype=np.float64) % 24
+    # 极小的负数取模后会得到 24.0
+    hours = np.where(hours >= 24, hours - 24, hours)
+    h = np.floor(hours)
+    remainder = (hours - h) * 60
+    m = np.floor(remainder)
+    s = (remainder - m) * 60
+    if decimals is not None:
+        h, m, s = _carry(h, m, s, decimals)
+        h = np.where(h >= 24, h - 24, h)
+    return h.astype(np.int64), m.astype(np.int64), s
+
+@timed('convert')
+def deg_to_dms_batch(deg, decimals=None):
+    if use_jit():
+        shape, (flat,) = _flatten(deg)
+        return tuple(a.reshape(shape) for a in
+                     jit_kernels().deg_to_dms(flat, _scale(decimals)))
+    deg = np.asarray(deg, dtype=np.float64)
+    sign = np.where(deg >= 0, 1, -1).astype(np.int64)
+    deg_abs = np.abs(deg)
+    d = np.floor(deg_abs)
+    remainder = (deg_abs - d) * 60
+    m = np.floor(remainder)
+    s = (remainder - m) * 60
+    if decimals is not None:
+        d, m, s = _carry(d, m, s, decimals)
+    return d.astype(np.int64), m.astype(np.int64), s, sign
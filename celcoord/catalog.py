@@ -0,0 +1,103 @@
+# celcoord/catalog.py 星表文件的分块读取、转换与写出
+import os
+from itertools import islice
+import numpy as np
+from .batch import spherical_to_cartesian_batch, cartesian_to_spherical_batch
+from . import metrics
+
+# 表头中可识别的列名
+SPHERICAL_COLUMNS = ('ra', 'dec', 'distance')
+CARTESIAN_COLUMNS = ('x', 'y', 'z')
+COLUMN_ALIASES = {'dist': 'distance', 'r': 'distance'}
+
+DEFAULT_CHUNK_ROWS = 50000
+
+
+class CatalogChunk:
+    """一块已转换的星表数据，列均为 float64 数组"""
+    def __init__(self, ra_hours, dec_deg, distance, x, y, z, bytes_read, total_bytes):
+        self.ra_hours = ra_hours
+        self.dec_deg = dec_deg
+        self.distance = distance
+        self.x = x
+        self.y = y
+        self.z = z
+        self.bytes_read = bytes_read
+        self.total_bytes = total_bytes
+
+    def __len__(self):
+        return len(self.ra_hours)
+
+
+def parse_header(line):
+    names = [COLUMN_ALIASES.get(n, n) for n in
+             (c.strip().lower() for c in line.split(','))]
+    if all(c in names for c in SPHERICAL_COLUMNS):
+        return 'spherical', [names.index(c) for c in SPHERICAL_COLUMNS]
+    if all(c in names for c in CARTESIAN_COLUMNS):
+        return 'cartesian', [names.index(c) for c in CARTESIAN_COLUMNS]
+    raise ValueError("无法识别星表列：需要 ra,dec,distance 或 x,y,z")
+
+
+def iter_catalog_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """逐块读取 CSV 星表并完成双向转换
+
+    ra 单位为小时，dec 单位为度，distance 单位为 pc。
+    以二进制方式读取，便于用文件偏移量报告进度。
+    """
+    total_bytes = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline().decode('utf-8-sig')
+        kind, cols = parse_header(header)
+        while True:
+            lines = list(islice(f, chunk_rows))
+            if not lines:
+                break
+            yield convert_lines(lines, kind, cols, f.tell(), total_bytes)
+
+
+def convert_lines(lines, kind, cols, bytes_read=0, total_bytes=0):
+    # 把一批 CSV 数据行（bytes）解析并转换成 CatalogChunk
+    with metrics.stage('parse', len(lines)):
+        data = np.loadtxt([line.decode('utf-8') for line in lines], delimiter=',',
+                          usecols=cols, dtype=np.float64, ndmin=2)
+    a, b, c = data[:, 0], data[:, 1], data[:, 2]
+    if kind == 'spherical':
+        x, y, z = spherical_to_cartesian_batch(a, b, c)
+        return CatalogChunk(a, b, c, x, y, z, bytes_read, total_bytes)
+    ra, dec, r = cartesian_to_spherical_batch(a, b, c)
+    return CatalogChunk(ra, dec, r, a, b, c, bytes_read, total_bytes)
+
+
+def write_header(f):
+    f.write('ra,dec,distance,x,y,z\n')
+
+
+def write_chunk(f, chunk):
+    with metrics.stage('write', len(chunk), format='csv'):
+        np.savetxt(f, np.column_stack((chunk.ra_hours, chunk.dec_deg, chunk.distance,
+                                       chunk.x, chunk.y, chunk.z)),
+                   delimiter=',', fmt='%.10g')
+
+
+# 二进制输出：每行六个小端 float64（ra, dec, distance, x, y, z），可直接内存映射
+RAW_DTYPE = np.dtype('<f8')
+RAW_COLUMNS = 6
+
+
+def write_raw_chunk(f, chunk):
+    with metrics.stage('write', len(chunk), format='raw'):
+        np.column_stack((chunk.ra_hours, chunk.dec_deg, chunk.distance,
+                         chunk.x, chunk.y, chunk.z)).astype(RAW_DTYPE, copy=False).tofile(f)
+
+
+def open_raw(path, mode='r'):
+    # 以 (N, 6) 的内存映射数组打开二进制输出
+    if os.path.getsize(path) == 0:
+        return np.empty((0, RAW_COLUMNS), dtype=RAW_DTYPE)
+    return np.memmap(path, dtype=RAW_DTYPE, mode=mode).reshape(-1, RAW_COLUMNS)
+
+
+def default_output_path(path):
+    root, ext = os.path.splitext(path)
+    return root + '_converted' + (ext or '.csv')
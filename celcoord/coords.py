@@ -0,0 +1,93 @@
+# celcoord/coords.py 坐标转换的数学计算（标量版本，仅依赖标准库）
+
+import math
+
+def hms_to_hours(h, m, s):
+    return h + m/60 + s/3600
+
+def round_seconds(seconds, decimals):
+    # 先放大再按 IEEE 就近偶数取整，批量与 JIT 版本用完全相同的运算，结果逐位一致
+    scale = 10.0 ** decimals
+    return round(seconds * scale) / scale
+
+def hours_to_hms(hours, decimals=None):
+    # decimals 给定时秒按该位数取整，并把 60 秒/60 分进位到上一级
+    hours = hours % 24
+    if hours >= 24:
+        # 极小的负数取模后会得到 24.0
+        hours -= 24
+    h = int(hours)
+    remainder = (hours - h) * 60
+    m = int(remainder)
+    s = (remainder - m) * 60
+    if decimals is not None:
+        s = round_seconds(s, decimals)
+        if s >= 60:
+            s -= 60
+            m += 1
+        if m >= 60:
+            m -= 60
+            h += 1
+        if h >= 24:
+            h -= 24
+    return h, m, s
+
+def dms_to_deg(degrees, minutes, seconds, sign):
+    return sign * (degrees + minutes/60 + seconds/3600)
+
+def deg_to_dms(deg, decimals=None):
+    sign = 1 if deg >= 0 else -1
+    deg_abs = abs(deg)
+    degrees = int(deg_abs)
+    remainder = (deg_abs - degrees) * 60
+    minutes = int(remainder)
+    seconds = (remainder - minutes) * 60
+    if decimals is not None:
+        seconds = round_seconds(seconds, decimals)
+        if seconds >= 60:
+            seconds -= 60
+            minutes += 1
+        if minutes >= 60:
+            minutes -= 60
+            degrees += 1
+    return degrees, minutes, seconds, sign
+
+def spherical_to_cartesian(ra_hours, dec_deg, distance):
+    ra_deg = ra_hours * 15
+    ra_rad = math.radians(ra_deg)
+    dec_rad = math.radians(dec_deg)
+    x = distance * math.cos(dec_rad) * math.cos(ra_rad)
+    y = distance * math.cos(dec_rad) * math.sin(ra_rad)
+    z = distance * math.sin(dec_rad)
+    return x, y, z
+
+def cartesian_to_spherical(x, y, z):
+    r = math.sqrt(x**2 + y**2 + z**2)
+    if r == 0:
+        return (0, 0, 0)
+    ra_rad = math.atan2(y, x)
+    ra_deg = math.degrees(ra_rad) % 360
+    ra_hours = ra_deg / 15 % 24
+    dec_rad = math.asin(z / r)
+    dec_deg = math.degrees(dec_rad)
+    return ra_hours, dec_deg, r
+
+def angular_separation(ra1_hours, dec1_deg, ra2_hours, dec2_deg):
+    # Vincenty 公式：在极小角距和接近 180° 时都不会因相消而丢失精度，返回度
+    ra_diff = math.radians((ra2_hours - ra1_hours) * 15)
+    dec1 = math.radians(dec1_deg)
+    dec2 = math.radians(dec2_deg)
+    sin_d1, cos_d1 = math.sin(dec1), math.cos(dec1)
+    sin_d2, cos_d2 = math.sin(dec2), math.cos(dec2)
+    num1 = cos_d2 * math.sin(ra_diff)
+    num2 = cos_d1 * sin_d2 - sin_d1 * cos_d2 * math.cos(ra_diff)
+    denominator = sin_d1 * sin_d2 + cos_d1 * cos_d2 * math.cos(ra_diff)
+    return math.degrees(math.atan2(math.hypot(num1, num2), denominator))
+
+def distance_3d(ra1_hours, dec1_deg, distance1, ra2_hours, dec2_deg, distance2):
+    # 两天体的空间距离，单位与 distance 相同（pc）
+    # 用 (r1-r2)^2 + 4 r1 r2 sin^2(θ/2) 计算，避免近邻天体坐标相减时的相消
+    theta = math.radians(angular_separation(ra1_hours, dec1_deg, ra2_hours, dec2_deg))
+    half_chord = math.sin(theta / 2)
+    return math.sqrt((distance1 - distance2)**2
+                     + 4 * distance1 * distance2 * half_chord * half_chord)
@@ -0,0 +1,91 @@
+# celcoord/density.py 天区等面积分格计数
+#
+# 赤经等分 n_ra 份，sin(赤纬) 等分 n_dec 份，每个格子的立体角都是 4π/(n_ra*n_dec)。
+# 计数可以按块增量累加，不需要重新分格已有的数据。
+import numpy as np
+from .backends import use_jit, jit_kernels
+
+
+class SkyDensityMap:
+    def __init__(self, n_ra=72, n_dec=36):
+        self.n_ra = n_ra
+        self.n_dec = n_dec
+        self.counts = np.zeros(n_ra * n_dec, dtype=np.int64)
+        # 每次计数变化加一，绘制端据此判断缓存是否失效
+        self.revision = 0
+        self._vertices = None
+        self._centers = None
+
+    @property
+    def n_cells(self):
+        return self.n_ra * self.n_dec
+
+    @property
+    def cell_area(self):
+        # 单个格子的立体角（球面度）
+        return 4 * np.pi / self.n_cells
+
+    def cell_index(self, ra_deg, sin_dec):
+        i_ra = np.floor(np.asarray(ra_deg) % 360 * (self.n_ra / 360)).astype(np.int64)
+        i_dec = np.floor((np.asarray(sin_dec) + 1) * (self.n_dec / 2)).astype(np.int64)
+        np.clip(i_ra, 0, self.n_ra - 1, out=i_ra)
+        np.clip(i_dec, 0, self.n_dec - 1, out=i_dec)
+        return i_dec * self.n_ra + i_ra
+
+    def add(self, ra_deg, dec_deg):
+        self._add(np.asarray(ra_deg, dtype=np.float64),
+                  np.sin(np.radians(np.asarray(dec_deg, dtype=np.float64))))
+
+    def add_vectors(self, xyz):
+        # xyz 为 (N, 3) 单位向量，z 分量即 sin(赤纬)
+        xyz = np.asarray(xyz, dtype=np.float64)
+        self._add(np.degrees(np.arctan2(xyz[:, 1], xyz[:, 0])), xyz[:, 2])
+
+    def _add(self, ra_deg, sin_dec):
+        if not len(ra_deg):
+            return
+        if use_jit():
+            # JIT 内核直接在计数数组上累加，不生成中间的格子编号数组
+            jit_kernels().bin_cells(np.ascontiguousarray(ra_deg), np.ascontiguousarray(sin_dec),
+                                    self.n_ra, self.n_dec, self.counts)
+        else:
+            self.counts += np.bincount(self.cell_index(ra_deg, sin_dec),
+                                       minlength=self.n_cells)
+        self.revision += 1
+
+    def clear(self):
+        self.counts[:] = 0
+        self.revision += 1
+
+    def density(self):
+        # 每球面度的天体数
+        return self.counts / self.cell_area
+
+    def _edges(self):
+        ra = np.radians(np.linspace(0, 360, self.n_ra + 1))
+        sin_dec = np.linspace(-1, 1, self.n_dec + 1)
+        return ra, sin_dec
+
+    def cell_vertices(self):
+        # 每个格子四个角点的单位向量，形状 (n_cells, 4, 3)，按格子编号排列
+        if self._vertices is None:
+            ra, sin_dec = self._edges()
+            cos_dec = np.sqrt(1 - sin_dec**2)
+            grid = np.stack(np.broadcast_arrays(
+                cos_dec[:, None] * np.cos(ra), cos_dec[:, None] * np.sin(ra),
+                sin_dec[:, None]), axis=-1)
+            self._vertices = np.stack((grid[:-1, :-1], grid[:-1, 1:],
+                                       grid[1:, 1:], grid[1:, :-1]),
+                                      axis=2).reshape(-1, 4, 3)
+        return self._vertices
+
+    def cell_centers(self):
+        if self._centers is None:
+            ra, sin_dec = self._edges()
+            ra_c = (ra[:-1] + ra[1:]) / 2
+            sin_c = (sin_dec[:-1] + sin_dec[1:]) / 2
+            cos_c = np.sqrt(1 - sin_c**2)
+            self._centers = np.stack(np.broadcast_arrays(
+                cos_c[:, None] * np.cos(ra_c), cos_c[:, None] * np.sin(ra_c),
+                sin_c[:, None]), axis=-1).reshape(-1, 3)
+        return self._centers
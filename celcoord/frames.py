@@ -0,0 +1,32 @@
+# celcoord/frames.py 天球参考架之间的旋转
+#
+# 各参考架的直角坐标均由赤道直角坐标左乘一个 3x3 旋转矩阵得到。
+# 银道坐标采用 Hipparcos 星表给出的 ICRS -> 银道 旋转矩阵（ESA 1997, 第 1 卷 §1.5.3）。
+import numpy as np
+from .metrics import timed
+
+EQUATORIAL_TO_GALACTIC = np.array([
+    [-0.0548755604162154, -0.8734370902348850, -0.4838350155487132],
+    [+0.4941094278755837, -0.4448296299600112, +0.7469822444972189],
+    [-0.8676661490190047, -0.1980763734312015, +0.4559837761750669],
+])
+
+# 参考架名称 -> 从赤道坐标到该参考架的旋转矩阵
+FRAMES = {
+    'equatorial': np.eye(3),
+    'galactic': EQUATORIAL_TO_GALACTIC,
+}
+
+
+def frame_matrix(frame):
+    try:
+        return FRAMES[frame]
+    except KeyError:
+        raise ValueError(f"未知的参考架: {frame!r}，可选 {', '.join(FRAMES)}") from None
+
+
+@timed('transform')
+def transform(xyz, from_frame='equatorial', to_frame='galactic'):
+    """把 (N, 3) 或 (3,) 直角坐标从一个参考架旋转到另一个参考架"""
+    matrix = frame_matrix(to_frame) @ frame_matrix(from_frame).T
+    return np.asarray(xyz, dtype=np.float64) @ matrix.T
@@ -0,0 +1,206 @@
+# celcoord/incremental.py 只追加的星表文件的增量转换
+#
+# 每次转换后在输出旁写一个状态文件 <输出>.state.json，记录已处理到的输入字节偏移、
+# 该偏移之前整段前缀的校验值、已写出的行数与输出文件大小。
+# 下次运行时若输入仍以同样的前缀开头，就从该偏移继续，只转换新追加的完整行并
+# 追加到输出；若输入变短或前缀校验不符（文件被改写），则整体重建。
+# 前缀按 CHECK_BLOCK 切块，每个完整块记一个 SHA-256，末尾不足一块的部分另记一个。
+# 从状态文件续传（update 的默认行为、watch 的第一次更新）时重新校验整段前缀，
+# 文件中间被改写也能发现。watch 之后的每次轮询只做快速校验：文件的设备号与 inode、
+# 末尾不足一块的部分、最后一个完整块以及随机抽查的 SAMPLE_BLOCKS 个块，代价与文件大小
+# 无关；每 FULL_CHECK_INTERVAL 次更新再做一次完整校验。写入新状态时已有的块校验值
+# 直接沿用，只需对新追加的部分计算校验值。
+import hashlib
+import json
+import os
+import random
+import time
+from itertools import islice
+from .catalog import (DEFAULT_CHUNK_ROWS, parse_header, convert_lines, write_header,
+                      write_chunk, write_raw_chunk)
+
+STATE_VERSION = 2
+# 前缀校验块的大小（字节）
+CHECK_BLOCK = 4 * 1024 * 1024
+# 快速校验时随机抽查的完整块数（另外总是检查最后一个完整块）
+SAMPLE_BLOCKS = 2
+# watch 每隔多少次更新做一次完整校验
+FULL_CHECK_INTERVAL = 100
+# 以该扩展名结尾的输出写成可内存映射的二进制文件，其余写成 CSV 文本
+RAW_EXTENSIONS = ('.f64', '.bin')
+
+
+def state_path(output_path):
+    return output_path + '.state.json'
+
+
+def output_format(output_path):
+    return 'raw' if output_path.lower().endswith(RAW_EXTENSIONS) else 'csv'
+
+
+def _window_digest(f, start, end):
+    f.seek(start)
+    return hashlib.sha256(f.read(end - start)).hexdigest()
+
+
+def _block_digests(f, offset, start=0):
+    # 从第 start 块起，offset 之前各完整块的 SHA-256
+    digests = []
+    f.seek(start * CHECK_BLOCK)
+    for _ in range(start, offset // CHECK_BLOCK):
+        digests.append(hashlib.sha256(f.read(CHECK_BLOCK)).hexdigest())
+    return digests
+
+
+def _tail_digest(f, offset):
+    # 最后一个完整块之后、offset 之前的部分
+    return _window_digest(f, offset - offset % CHECK_BLOCK, offset)
+
+
+def _file_id(st):
+    return [st.st_dev, st.st_ino]
+
+
+def _prefix_matches(f, offset, state, full=True):
+    # full 为假时只做快速校验：同一个文件、末尾部分与抽查的块不变
+    blocks = state.get('blocks')
+    if not isinstance(blocks, list) or len(blocks) != offset // CHECK_BLOCK:
+        return False
+    if _tail_digest(f, offset) != state.get('tail_sha256'):
+        return False
+    if full:
+        indices = range(len(blocks))
+    else:
+        if state.get('file_id') != _file_id(os.fstat(f.fileno())):
+            return False
+        last = len(blocks) - 1
+        indices = random.sample(range(last), min(SAMPLE_BLOCKS, last)) if last > 0 else []
+        if last >= 0:
+            indices.append(last)
+    for i in indices:
+        f.seek(i * CHECK_BLOCK)
+        if hashlib.sha256(f.read(CHECK_BLOCK)).hexdigest() != blocks[i]:
+            return False
+    return True
+
+
+def load_state(output_path):
+    try:
+        with open(state_path(output_path)) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get('version') == STATE_VERSION else None
+
+
+def _save_state(output_path, state):
+    # 先写临时文件再替换，避免中断时留下半个状态文件
+    path = state_path(output_path)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f)
+    os.replace(path + '.tmp', path)
+
+
+def _resume_offset(f, input_size, output_path, state, full_check):
+    # 校验状态是否仍然适用；适用时返回可继续的输入偏移，否则返回 None
+    if state is None or state.get('format') != output_format(output_path):
+        return None
+    offset = state['offset']
+    if input_size < offset:
+        return None
+    if not _prefix_matches(f, offset, state, full_check):
+        return None
+    try:
+        output_size = os.path.getsize(output_path)
+    except OSError:
+        return None
+    if output_size < state['output_size']:
+        return None
+    if output_size > state['output_size']:
+        # 上次写出后未能保存状态（例如被中断），丢弃多出来的部分
+        os.truncate(output_path, state['output_size'])
+    return offset
+
+
+def update(input_path, output_path, chunk_rows=DEFAULT_CHUNK_ROWS, full_check=True):
+    """把输入中新追加的行转换并追加到输出
+
+    返回 (模式, 本次新增行数)，模式为 'append'（增量）或 'rebuild'（整体重建）。
+    输入末尾没有换行符的不完整行留到下次处理。full_check 为假时续传前只做快速校验
+    （见模块说明），供 watch 在两次完整校验之间使用。
+    """
+    fmt = output_format(output_path)
+    with open(input_path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        input_size = st.st_size
+        state = load_state(output_path)
+        offset = _resume_offset(f, input_size, output_path, state, full_check)
+        if offset is None:
+            mode = 'rebuild'
+            f.seek(0)
+            header = f.readline()
+            if not header.endswith(b'\n'):
+                return mode, 0
+            kind, cols = parse_header(header.decode('utf-8-sig'))
+            with open(output_path, 'w' if fmt == 'csv' else 'wb') as out:
+                if fmt == 'csv':
+                    write_header(out)
+            state = {'version': STATE_VERSION, 'format': fmt, 'kind': kind, 'cols': cols,
+                     'rows': 0, 'blocks': []}
+            offset = len(header)
+        else:
+            mode = 'append'
+            kind, cols = state['kind'], state['cols']
+
+        f.seek(offset)
+        added = 0
+        with open(output_path, 'a' if fmt == 'csv' else 'ab') as out:
+            while True:
+                lines = list(islice(f, chunk_rows))
+                if lines and not lines[-1].endswith(b'\n'):
+                    # 正在写入的最后一行，等下次再处理
+                    lines.pop()
+                    if not lines:
+                        break
+                    f.seek(offset + sum(len(line) for line in lines))
+                if not lines:
+                    break
+                offset += sum(len(line) for line in lines)
+                chunk = convert_lines(lines, kind, cols)
+                if fmt == 'csv':
+                    write_chunk(out, chunk)
+                else:
+                    write_raw_chunk(out, chunk)
+                added += len(chunk)
+
+        # 已校验的完整块沿用，只对之后的部分计算校验值
+        blocks = state['blocks'] + _block_digests(f, offset, len(state['blocks']))
+        tail = _tail_digest(f, offset)
+    output_size = os.path.getsize(output_path)
+    state.update(offset=offset, blocks=blocks, tail_sha256=tail, file_id=_file_id(st),
+                 rows=state['rows'] + added, output_size=output_size,
+                 input_size=input_size)
+    _save_state(output_path, state)
+    return mode, added
+
+
+def watch(input_path, output_path, interval=2.0, chunk_rows=DEFAULT_CHUNK_ROWS,
+          callback=None):
+    # 轮询输入文件，大小或修改时间变化时执行一次 update；callback(模式, 新增行数)。
+    # 第一次与此后每 FULL_CHECK_INTERVAL 次更新完整校验前缀，其余只做快速校验
+    last = None
+    updates = 0
+    while True:
+        try:
+            st = os.stat(input_path)
+            current = (st.st_size, st.st_mtime_ns, st.st_ino)
+        except FileNotFoundError:
+            current = None
+        if current is not None and current != last:
+            result = update(input_path, output_path, chunk_rows,
+                            full_check=updates % FULL_CHECK_INTERVAL == 0)
+            updates += 1
+            if callback:
+                callback(*result)
+            last = current
+        time.sleep(interval)
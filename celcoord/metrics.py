@@ -0,0 +1,273 @@
+# celcoord/metrics.py 转换流程的运行指标与采样分析
+#
+# 默认关闭。关闭时埋点处只读一次模块属性 enabled，不计时、不加锁；
+# 用 enable() 或环境变量 CELCOORD_METRICS=1 开启。
+# 指标按 名称 + 标签 存放，分两类：
+#   计数器：只增不减，如各阶段（parse/convert/transform/write/query）的行数、耗时与调用次数，
+#           缓存的命中/未命中次数；
+#   仪表：当前值，如流式模式下队列中等待的块数及其峰值。
+# 可导出为 Prometheus 文本格式或 JSON（见 write）。SamplingProfiler 定时采样各线程的
+# 调用栈，输出可直接用 flamegraph.pl / speedscope 查看的折叠栈文本。
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+enabled = os.environ.get('CELCOORD_METRICS', '') not in ('', '0')
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+
+# 导出 Prometheus 文本时写在 # HELP 行的说明
+HELP = {
+    'celcoord_stage_rows_total': "各阶段处理的行数",
+    'celcoord_stage_seconds_total': "各阶段累计耗时（秒）",
+    'celcoord_stage_calls_total': "各阶段调用次数",
+    'celcoord_stage_rows_per_second': "各阶段吞吐量（行数/累计耗时，导出时计算）",
+    'celcoord_cache_requests_total': "缓存查询次数，result 为 hit 或 miss",
+    'celcoord_row_groups_total': "Parquet 行组数，result 为 read 或 skipped（按统计值跳过）",
+    'celcoord_queue_depth': "队列中等待处理的块数",
+    'celcoord_queue_depth_max': "队列深度峰值",
+}
+
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def observe_stage(stage, rows, seconds, **labels):
+    key_labels = dict(labels, stage=stage)
+    with _lock:
+        for name, value in (('celcoord_stage_rows_total', rows),
+                            ('celcoord_stage_seconds_total', seconds),
+                            ('celcoord_stage_calls_total', 1)):
+            key = _key(name, key_labels)
+            _counters[key] = _counters.get(key, 0) + value
+
+
+def cache(name, hit):
+    inc('celcoord_cache_requests_total', cache=name, result='hit' if hit else 'miss')
+
+
+def queue_depth(name, depth):
+    key = _key('celcoord_queue_depth_max', {'queue': name})
+    with _lock:
+        _gauges[_key('celcoord_queue_depth', {'queue': name})] = depth
+        _gauges[key] = max(_gauges.get(key, 0), depth)
+
+
+class _Stage:
+    # 计时上下文；块内可给 rows 赋值，退出时记入该阶段
+    __slots__ = ('stage', 'rows', 'labels', 'start')
+
+    def __init__(self, stage, rows, labels):
+        self.stage = stage
+        self.rows = rows
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe_stage(self.stage, self.rows, time.perf_counter() - self.start, **self.labels)
+
+
+class _NullStage:
+    # 关闭时使用的空上下文，rows 赋值直接丢弃
+    rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name, rows=0, **labels):
+    """统计一个阶段：with metrics.stage('parse') as s: ...; s.rows = n"""
+    return _Stage(name, rows, labels) if enabled else _NULL_STAGE
+
+
+def _rows(args):
+    # 第一个数组或序列参数的行数：(N, 3) 数组按 N 行计；方法的 self 等其他参数跳过
+    for value in args:
+        shape = getattr(value, 'shape', None)
+        if isinstance(shape, tuple):
+            return shape[0] if shape else 1
+        if isinstance(value, (list, tuple)):
+            return len(value)
+    return 1 if args else 0
+
+
+def timed(stage_name):
+    """函数装饰器：开启时按第一个数组参数的行数记入 stage_name 阶段，op 标签为函数名"""
+    def decorate(func):
+        op = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            observe_stage(stage_name, _rows(args), time.perf_counter() - start, op=op)
+            return result
+        return wrapper
+    return decorate
+
+
+def _stage_rates():
+    # {(阶段标签): 行/秒}，由行数与耗时计数器推算
+    rates = {}
+    for (name, labels), rows in _counters.items():
+        if name == 'celcoord_stage_rows_total':
+            seconds = _counters.get(('celcoord_stage_seconds_total', labels), 0)
+            if seconds > 0:
+                rates[labels] = rows / seconds
+    return rates
+
+
+def snapshot():
+    """当前全部指标：{'counters': [...], 'gauges': [...]}，每项含 name、labels、value"""
+    with _lock:
+        rates = _stage_rates()
+        counters = [{'name': n, 'labels': dict(l), 'value': v}
+                    for (n, l), v in sorted(_counters.items())]
+        gauges = [{'name': n, 'labels': dict(l), 'value': v}
+                  for (n, l), v in sorted(_gauges.items())]
+    gauges += [{'name': 'celcoord_stage_rows_per_second', 'labels': dict(l), 'value': v}
+               for l, v in sorted(rates.items())]
+    return {'timestamp': time.time(), 'counters': counters, 'gauges': gauges}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + '}'
+
+
+def render_prometheus():
+    data = snapshot()
+    lines = []
+    for kind, entries in (('counter', data['counters']), ('gauge', data['gauges'])):
+        seen = set()
+        for entry in entries:
+            name = entry['name']
+            if name not in seen:
+                seen.add(name)
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name}{_format_labels(entry['labels'])} {entry['value']:.17g}")
+    return '\n'.join(lines) + '\n'
+
+
+def write(path):
+    """写出指标：扩展名为 .json 时写 JSON，否则写 Prometheus 文本格式
+
+    先写临时文件再替换，node_exporter 的 textfile 收集器不会读到半个文件。
+    """
+    if path.lower().endswith('.json'):
+        text = json.dumps(snapshot(), ensure_ascii=False, indent=1)
+    else:
+        text = render_prometheus()
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(path + '.tmp', path)
+
+
+class SamplingProfiler:
+    """定时采样其他线程的 Python 调用栈，按折叠栈统计出现次数
+
+    用法：with SamplingProfiler() as profiler: ...; profiler.write('profile.folded')
+    采样只读取 sys._current_frames()，不修改被测代码，开销与采样间隔成反比。
+    """
+
+    def __init__(self, interval=0.005, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='celcoord-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def top(self, n=20):
+        # 按栈顶函数（自身耗时）统计的前 n 项：[(函数, 采样次数)]
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return leaves.most_common(n)
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
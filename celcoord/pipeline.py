@@ -0,0 +1,273 @@
+# celcoord/pipeline.py 读取、计算、写出重叠进行的星表分块转换
+#
+# 三个阶段各用独立线程：读线程预读并解析下一块，计算线程做坐标转换，写线程写出上一块。
+# 块缓冲区在启动时预先分配 buffers 个，经有界队列在阶段之间循环传递：
+#   free -> 读 -> parsed -> 计算 -> computed -> 写 -> free
+# 稳态下每块不再分配大数组（转换用 out= 原地写入缓冲区的列，CSV 文本解析本身的临时数组除外）；
+# 空闲缓冲区用完时读线程阻塞，预读量不会超过缓冲区个数。numpy 的大数组运算与文件读写都会
+# 释放 GIL，墙钟时间接近三个阶段中最慢的一个，而不是三者之和。
+# 计算线程多于一个时各块可能乱序完成，写线程按块序号重新排序后写出。
+import os
+import queue
+import threading
+from itertools import islice
+import numpy as np
+from .backends import use_jit, jit_kernels
+from .catalog import (DEFAULT_CHUNK_ROWS, RAW_DTYPE, RAW_COLUMNS, parse_header,
+                      write_header)
+from .incremental import output_format
+from . import metrics
+
+# 默认的块缓冲区个数：读、算、写各占一个时仍有一个空闲，供读线程继续预读
+DEFAULT_BUFFERS = 4
+# 输入文件的读缓冲大小（字节）
+READ_BUFFER = 1 << 20
+# 阶段线程等待队列时检查取消标志的间隔（秒）
+POLL_INTERVAL = 0.1
+
+_DONE = object()
+
+
+class Cancelled(Exception):
+    pass
+
+
+class ChunkBuffer:
+    """一块可重复使用的转换缓冲区
+
+    data 为 (capacity, 6) 的 float64 数组，列依次为 ra(时), dec(度), distance, x, y, z，
+    与 catalog 的二进制输出格式相同，写出二进制时可直接 tofile。
+    """
+    __slots__ = ('data', 'scratch', 'mask', 'rows', 'seq', 'kind', 'bytes_read', 'total_bytes')
+
+    def __init__(self, capacity):
+        self.data = np.empty((capacity, RAW_COLUMNS), dtype=RAW_DTYPE)
+        self.scratch = np.empty((3, capacity), dtype=np.float64)
+        self.mask = np.empty(capacity, dtype=bool)
+        self.rows = 0
+        self.seq = 0
+        self.kind = None
+        self.bytes_read = 0
+        self.total_bytes = 0
+
+    def __len__(self):
+        return self.rows
+
+    def columns(self):
+        # 当前有效行的六个列视图
+        return tuple(self.data[:self.rows, i] for i in range(RAW_COLUMNS))
+
+
+def spherical_to_cartesian_into(buffer):
+    # 由 data 的前三列原地计算后三列，运算顺序与 batch.spherical_to_cartesian_batch 相同
+    n = buffer.rows
+    ra_hours, dec_deg, distance, x, y, z = buffer.columns()
+    ra, dec, c = buffer.scratch[0, :n], buffer.scratch[1, :n], buffer.scratch[2, :n]
+    np.multiply(ra_hours, 15, out=ra)
+    np.radians(ra, out=ra)
+    np.radians(dec_deg, out=dec)
+    np.cos(dec, out=c)
+    np.multiply(distance, c, out=c)
+    np.cos(ra, out=x)
+    np.multiply(c, x, out=x)
+    np.sin(ra, out=y)
+    np.multiply(c, y, out=y)
+    np.sin(dec, out=z)
+    np.multiply(distance, z, out=z)
+
+
+def cartesian_to_spherical_into(buffer):
+    # 由 data 的后三列原地计算前三列，结果与 batch.cartesian_to_spherical_batch 一致
+    n = buffer.rows
+    ra_hours, dec_deg, r, x, y, z = buffer.columns()
+    if use_jit():
+        jit_kernels().cartesian_to_spherical_into(x, y, z, ra_hours, dec_deg, r)
+        return
+    tmp, ra, zero = buffer.scratch[0, :n], buffer.scratch[1, :n], buffer.mask[:n]
+    np.multiply(x, x, out=r)
+    np.multiply(y, y, out=tmp)
+    np.add(r, tmp, out=r)
+    np.multiply(z, z, out=tmp)
+    np.add(r, tmp, out=r)
+    np.sqrt(r, out=r)
+    np.equal(r, 0, out=zero)
+    # 连续数组与跨步视图走的 SIMD 路径不同，末位可能不一致；先在连续的暂存区里算，再拷进列
+    np.copyto(tmp, x)
+    np.copyto(ra, y)
+    np.arctan2(ra, tmp, out=ra)
+    np.degrees(ra, out=ra)
+    np.remainder(ra, 360, out=ra)
+    np.divide(ra, 15, out=ra)
+    np.remainder(ra, 24, out=ra_hours)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        np.divide(z, r, out=dec_deg)
+        np.arcsin(dec_deg, out=dec_deg)
+    np.degrees(dec_deg, out=dec_deg)
+    # r == 0 的行与标量版本一致，返回 (0, 0, 0)
+    np.copyto(ra_hours, 0.0, where=zero)
+    np.copyto(dec_deg, 0.0, where=zero)
+
+
+class ChunkPipeline:
+    """把 CSV 星表按块转换并写出，读取、计算、写出三个阶段并行
+
+    on_chunk(buffer) 在写线程中、每块写出之后调用；buffer 随后会被重复使用，
+    回调若要保留数据需自行复制。cancel() 可从任意线程调用，run() 随即抛出 Cancelled。
+    """
+
+    def __init__(self, input_path, output_path, chunk_rows=DEFAULT_CHUNK_ROWS, workers=1,
+                 buffers=DEFAULT_BUFFERS, on_chunk=None):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.chunk_rows = chunk_rows
+        self.workers = max(1, workers)
+        self.format = output_format(output_path)
+        self.on_chunk = on_chunk
+        # 每个计算线程至少要有一块在手，读写两端各一块，才能真正重叠
+        count = max(buffers, self.workers + 2)
+        self.free = queue.Queue(count)
+        for _ in range(count):
+            self.free.put(ChunkBuffer(chunk_rows))
+        self.parsed = queue.Queue(count)
+        self.computed = queue.Queue(count)
+        self.rows = 0
+        self.complete = False
+        self._stop = threading.Event()
+        self._errors = []
+
+    def cancel(self):
+        self._stop.set()
+
+    def _get(self, q):
+        # 每次交接都检查取消标志；队列为空时按 POLL_INTERVAL 轮询
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                pass
+        raise Cancelled()
+
+    def _put(self, q, item):
+        while not self._stop.is_set():
+            try:
+                return q.put(item, timeout=POLL_INTERVAL)
+            except queue.Full:
+                pass
+        raise Cancelled()
+
+    def _stage(self, func, *args):
+        # 任一阶段出错时记下异常并让其余阶段尽快退出
+        try:
+            func(*args)
+        except Cancelled:
+            pass
+        except BaseException as e:
+            self._errors.append(e)
+            self._stop.set()
+
+    def _read(self):
+        total_bytes = os.path.getsize(self.input_path)
+        with open(self.input_path, 'rb', buffering=READ_BUFFER) as f:
+            if hasattr(os, 'posix_fadvise'):
+                # 提示内核按顺序预读
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            kind, cols = parse_header(f.readline().decode('utf-8-sig'))
+            base = 0 if kind == 'spherical' else 3
+            seq = 0
+            while True:
+                buffer = self._get(self.free)
+                if metrics.enabled:
+                    metrics.queue_depth('pipeline_free', self.free.qsize())
+                lines = list(islice(f, self.chunk_rows))
+                if not lines:
+                    self.free.put(buffer)
+                    break
+                with metrics.stage('parse', len(lines), format='csv'):
+                    parsed = np.loadtxt([line.decode('utf-8') for line in lines],
+                                        delimiter=',', usecols=cols, dtype=np.float64,
+                                        ndmin=2)
+                    n = len(parsed)
+                    buffer.data[:n, base:base + 3] = parsed
+                buffer.rows, buffer.seq, buffer.kind = n, seq, kind
+                buffer.bytes_read, buffer.total_bytes = f.tell(), total_bytes
+                self._put(self.parsed, buffer)
+                seq += 1
+        for _ in range(self.workers):
+            self._put(self.parsed, _DONE)
+
+    def _compute(self):
+        while True:
+            buffer = self._get(self.parsed)
+            if metrics.enabled:
+                metrics.queue_depth('pipeline_parsed', self.parsed.qsize())
+            if buffer is _DONE:
+                break
+            with metrics.stage('convert', buffer.rows, op='pipeline'):
+                if buffer.kind == 'spherical':
+                    spherical_to_cartesian_into(buffer)
+                else:
+                    cartesian_to_spherical_into(buffer)
+            self._put(self.computed, buffer)
+        self._put(self.computed, _DONE)
+
+    def _write(self):
+        raw = self.format == 'raw'
+        pending = {}
+        next_seq = 0
+        finished = 0
+        with (open(self.output_path, 'wb') if raw
+              else open(self.output_path, 'w', newline='')) as out:
+            if not raw:
+                write_header(out)
+            while finished < self.workers:
+                buffer = self._get(self.computed)
+                if metrics.enabled:
+                    metrics.queue_depth('pipeline_computed', self.computed.qsize())
+                if buffer is _DONE:
+                    finished += 1
+                    continue
+                pending[buffer.seq] = buffer
+                while next_seq in pending:
+                    buffer = pending.pop(next_seq)
+                    with metrics.stage('write', buffer.rows, format=self.format):
+                        if raw:
+                            buffer.data[:buffer.rows].tofile(out)
+                        else:
+                            np.savetxt(out, buffer.data[:buffer.rows], delimiter=',',
+                                       fmt='%.10g')
+                    self.rows += buffer.rows
+                    if self.on_chunk is not None:
+                        self.on_chunk(buffer)
+                    next_seq += 1
+                    self.free.put(buffer)
+        self.complete = True
+
+    def run(self):
+        """执行转换并返回行数；任一阶段的异常在这里重新抛出"""
+        threads = [threading.Thread(target=self._stage, args=(self._read,),
+                                    name='celcoord-read', daemon=True)]
+        threads += [threading.Thread(target=self._stage, args=(self._compute,),
+                                     name=f'celcoord-compute-{i}', daemon=True)
+                    for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        # 写阶段在调用线程中执行，回调与调用者在同一线程
+        self._stage(self._write)
+        self._stop.set()
+        for thread in threads:
+            thread.join()
+        if self._errors:
+            raise self._errors[0]
+        if not self.complete:
+            raise Cancelled()
+        return self.rows
+
+
+def convert_file(input_path, output_path, chunk_rows=DEFAULT_CHUNK_ROWS, workers=1,
+                 buffers=DEFAULT_BUFFERS, on_chunk=None):
+    """用 ChunkPipeline 转换 CSV 星表，返回行数
+
+    输出以 .f64/.bin 结尾时写成 catalog 的二进制格式（每行 6 个小端 float64），否则写 CSV。
+    """
+    return ChunkPipeline(input_path, output_path, chunk_rows, workers, buffers,
+                         on_chunk).run()
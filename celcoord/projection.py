@@ -0,0 +1,25 @@
+# celcoord/projection.py 视图投影（不依赖 Qt）
+import numpy as np
+from .backends import use_jit, jit_kernels
+
+
+def project_points(xyz, matrix, width, height):
+    """按 4x4 行主序投影矩阵把 (N, 3) 点投影到屏幕
+
+    与 QMatrix4x4.map 一致地做透视除法，返回屏幕坐标 (N, 2) 与可见掩码；
+    可见指位于相机前方（归一化深度 > 0），不按屏幕范围裁剪：跨出屏幕边缘的折线段
+    仍需两端的坐标，屏幕范围的判断由需要的调用方（如点选索引）自行完成。
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if use_jit():
+        return jit_kernels().project_points(
+            np.ascontiguousarray(xyz, dtype=np.float64), np.ascontiguousarray(matrix),
+            float(width), float(height))
+    xyz = np.asarray(xyz, dtype=np.float64)
+    px, py, pz = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+    # 逐分量按与 JIT 内核相同的顺序相乘累加（矩阵乘法的求和顺序不固定，末位会不同）
+    w, cx, cy, cz = (m[0] * px + m[1] * py + m[2] * pz + m[3] for m in matrix[[3, 0, 1, 2]])
+    xy = np.empty((len(xyz), 2), dtype=np.float64)
+    xy[:, 0] = (cx / w + 1) * width / 2
+    xy[:, 1] = (1 - cy / w) * height / 2
+    return xy, cz / w > 0
@@ -0,0 +1,59 @@
+# celcoord/ringbuffer.py 固定容量的环形缓冲区（numpy 连续存储）
+#
+# 按行追加，写满后覆盖最旧的行。每行有一个从 0 开始递增的绝对序号，
+# 读取方按序号记住自己处理到哪里，之后只取新增的部分，不必每次拷贝全部数据。
+import numpy as np
+
+
+class RingBuffer:
+    def __init__(self, capacity, columns=1, dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError("容量必须为正数")
+        self.capacity = capacity
+        self.columns = columns
+        self.data = np.empty((capacity, columns), dtype=dtype)
+        # 累计写入的行数，也即下一行的序号
+        self.total = 0
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    @property
+    def start(self):
+        # 仍在缓冲区中的最旧一行的序号
+        return self.total - len(self)
+
+    def append(self, rows):
+        rows = np.asarray(rows, dtype=self.data.dtype).reshape(-1, self.columns)
+        n = len(rows)
+        if n > self.capacity:
+            # 超出容量的部分写入后也会立即被覆盖，只保留最后 capacity 行
+            self.total += n - self.capacity
+            rows = rows[-self.capacity:]
+            n = self.capacity
+        pos = self.total % self.capacity
+        first = min(n, self.capacity - pos)
+        self.data[pos:pos + first] = rows[:first]
+        self.data[:n - first] = rows[first:]
+        self.total += n
+
+    def slice(self, start=None, stop=None):
+        """返回序号在 [start, stop) 内、仍在缓冲区中的行（按写入顺序）
+
+        不跨越缓冲区末尾时返回视图，否则返回拷贝。
+        """
+        start = self.start if start is None else max(start, self.start)
+        stop = self.total if stop is None else min(stop, self.total)
+        if stop <= start:
+            return self.data[:0]
+        i, j = start % self.capacity, stop % self.capacity
+        if i < j or j == 0:
+            return self.data[i:j or self.capacity]
+        return np.concatenate((self.data[i:], self.data[:j]))
+
+    def last(self):
+        # 最新一行，缓冲区为空时返回 None
+        return self.data[(self.total - 1) % self.capacity] if self.total else None
+
+    def clear(self):
+        self.total = 0
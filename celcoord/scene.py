@@ -0,0 +1,89 @@
+# celcoord/scene.py 多个视图共享的星表场景数据
+#
+# 星表的单位向量、距离与密度计数只存一份（赤道坐标），以只读数组交给各个视图；
+# 视图只保存自己的投影结果，不同参考架的视图把参考架旋转并入各自的投影矩阵，
+# 因而不需要为每个参考架复制一份向量。revision 在数据变化时递增，供视图判断缓存是否失效。
+import weakref
+import numpy as np
+from .density import SkyDensityMap
+
+
+def _readonly(array):
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class SceneStore:
+    def __init__(self, n_ra=72, n_dec=36):
+        # 新到达的块先暂存，读取时才合并，避免每块都重新拷贝全部数据
+        self._chunks = []
+        self._xyz = np.empty((0, 3), dtype=np.float64)
+        self._distance = np.empty(0, dtype=np.float64)
+        self.density_map = SkyDensityMap(n_ra, n_dec)
+        self.revision = 0
+        self._listeners = []
+
+    def __len__(self):
+        return len(self._xyz) + sum(len(xyz) for xyz, _ in self._chunks)
+
+    def subscribe(self, callback):
+        # 数据变化时调用 callback()；绑定方法只保存弱引用，不延长视图的生命周期
+        ref = weakref.WeakMethod(callback) if hasattr(callback, '__self__') else (lambda: callback)
+        self._listeners.append(ref)
+
+    def unsubscribe(self, callback):
+        self._listeners = [ref for ref in self._listeners if ref() not in (None, callback)]
+
+    def _changed(self):
+        self.revision += 1
+        alive = []
+        for ref in self._listeners:
+            callback = ref()
+            if callback is not None:
+                alive.append(ref)
+                callback()
+        self._listeners = alive
+
+    def add_chunk(self, ra_deg, dec_deg, distance=None):
+        ra_rad = np.radians(ra_deg)
+        dec_rad = np.radians(dec_deg)
+        cos_dec = np.cos(dec_rad)
+        xyz = np.column_stack((cos_dec * np.cos(ra_rad),
+                               cos_dec * np.sin(ra_rad),
+                               np.sin(dec_rad)))
+        if distance is None:
+            distance = np.ones(len(xyz))
+        self._chunks.append((xyz, np.asarray(distance, dtype=np.float64)))
+        # 只对新块分格，已有计数保持不变
+        self.density_map.add_vectors(xyz)
+        self._changed()
+
+    def clear(self):
+        self._chunks = []
+        self._xyz = np.empty((0, 3), dtype=np.float64)
+        self._distance = np.empty(0, dtype=np.float64)
+        self.density_map.clear()
+        self._changed()
+
+    def _merge(self):
+        if self._chunks:
+            self._xyz = np.concatenate([self._xyz] + [xyz for xyz, _ in self._chunks])
+            self._distance = np.concatenate([self._distance] + [d for _, d in self._chunks])
+            self._chunks = []
+
+    def vectors(self):
+        # 赤道坐标单位向量 (N, 3)，只读
+        self._merge()
+        return _readonly(self._xyz)
+
+    def distances(self):
+        self._merge()
+        return _readonly(self._distance)
+
+    def lonlat(self, i):
+        # 第 i 个天体的赤经(时)与赤纬(度)
+        x, y, z = (float(v) for v in self.vectors()[i])
+        ra_hours = np.degrees(np.arctan2(y, x)) % 360 / 15
+        dec_deg = np.degrees(np.arcsin(max(-1.0, min(1.0, z))))
+        return float(ra_hours), float(dec_deg)
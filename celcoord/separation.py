@@ -0,0 +1,141 @@
+# celcoord/separation.py 角距与空间距离的批量计算
+#
+# 角距统一用 atan2(|a×b|, a·b)，与 coords.angular_separation 的 Vincenty 公式等价，
+# 在极小角距和接近 180° 时都数值稳定。空间距离用 (r1-r2)^2 + 4 r1 r2 sin^2(θ/2)，
+# 避免近邻天体直角坐标直接相减时的相消。
+# 两两计算按块（tile）进行，任何时候只占用固定大小的内存，不会生成 N×N 矩阵。
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+DEFAULT_MEMORY_BUDGET = 64 * 2**20
+# 每对天体在一个块内大致占用的临时内存（字节）
+_BYTES_PER_PAIR = 128
+
+
+def unit_vectors(ra_hours, dec_deg):
+    ra = np.radians(np.asarray(ra_hours, dtype=np.float64) * 15)
+    dec = np.radians(np.asarray(dec_deg, dtype=np.float64))
+    cos_dec = np.cos(dec)
+    return np.stack((cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)), axis=-1)
+
+
+def _separation_rad(a, b):
+    cross = np.cross(a, b)
+    return np.arctan2(np.sqrt(np.einsum('...i,...i->...', cross, cross)),
+                      np.einsum('...i,...i->...', a, b))
+
+
+def _distance(theta, r1, r2):
+    half_chord = np.sin(theta / 2)
+    return np.sqrt((r1 - r2)**2 + 4 * r1 * r2 * half_chord**2)
+
+
+def separation_from(target_ra, target_dec, ra_hours, dec_deg):
+    # 目标与星表中每个天体的角距（度）
+    return np.degrees(_separation_rad(unit_vectors(target_ra, target_dec),
+                                      unit_vectors(ra_hours, dec_deg)))
+
+
+def distance_from(target_ra, target_dec, target_distance, ra_hours, dec_deg, distance):
+    # 目标与星表中每个天体的空间距离（pc）
+    theta = _separation_rad(unit_vectors(target_ra, target_dec),
+                            unit_vectors(ra_hours, dec_deg))
+    return _distance(theta, float(target_distance), np.asarray(distance, dtype=np.float64))
+
+
+def tile_size(memory_budget=DEFAULT_MEMORY_BUDGET):
+    return max(16, int(np.sqrt(memory_budget / _BYTES_PER_PAIR)))
+
+
+def _tile(vectors, distance, i0, i1, j0, j1):
+    theta = _separation_rad(vectors[i0:i1, None, :], vectors[None, j0:j1, :])
+    dist = None
+    if distance is not None:
+        dist = _distance(theta, distance[i0:i1, None], distance[None, j0:j1])
+    return np.degrees(theta, out=theta), dist
+
+
+def iter_pair_tiles(ra_hours, dec_deg, distance=None, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """按块生成两两角距，只覆盖上三角 (j0 >= i0)
+
+    每次产出 (i0, j0, 角距块, 距离块)；角距块形状为 (行数, 列数)，单位为度，
+    未给出 distance 时距离块为 None。对角块中 j <= i 的部分由调用方自行忽略。
+    """
+    vectors = unit_vectors(ra_hours, dec_deg)
+    if distance is not None:
+        distance = np.asarray(distance, dtype=np.float64)
+    n = len(vectors)
+    step = tile_size(memory_budget)
+    for i0 in range(0, n, step):
+        i1 = min(n, i0 + step)
+        for j0 in range(i0, n, step):
+            j1 = min(n, j0 + step)
+            sep, dist = _tile(vectors, distance, i0, i1, j0, j1)
+            yield i0, j0, sep, dist
+
+
+def _row_block_pairs(vectors, distance, i0, i1, step, max_sep_deg):
+    # 处理一行块内所有上三角的块，返回满足角距条件的配对
+    n = len(vectors)
+    found = []
+    for j0 in range(i0, n, step):
+        j1 = min(n, j0 + step)
+        sep, dist = _tile(vectors, distance, i0, i1, j0, j1)
+        mask = sep <= max_sep_deg
+        if j0 == i0:
+            mask &= np.arange(i0, i1)[:, None] < np.arange(j0, j1)[None, :]
+        ii, jj = np.nonzero(mask)
+        found.append((ii + i0, jj + j0, sep[ii, jj], None if dist is None else dist[ii, jj]))
+    return found
+
+
+def pairs_within(ra_hours, dec_deg, max_sep_deg, distance=None, groups=None,
+                 memory_budget=DEFAULT_MEMORY_BUDGET, workers=1):
+    """找出角距不超过 max_sep_deg 的所有天体对 (i < j)
+
+    groups 为每个天体的分组标签时只在同组内配对。workers > 1 时各行块在线程池中
+    并行计算（numpy 运算会释放 GIL），内存预算在各线程间平分。
+    返回 (i, j, 角距(度), 空间距离或 None)。
+    """
+    vectors = unit_vectors(ra_hours, dec_deg)
+    if distance is not None:
+        distance = np.asarray(distance, dtype=np.float64)
+    if groups is None:
+        members = [np.arange(len(vectors))]
+    else:
+        groups = np.asarray(groups)
+        order = np.argsort(groups, kind='stable')
+        bounds = np.flatnonzero(groups[order][1:] != groups[order][:-1]) + 1
+        members = np.split(order, bounds)
+    step = tile_size(memory_budget / max(1, workers))
+
+    tasks = []
+    for idx in members:
+        sub_vectors = vectors[idx]
+        sub_distance = None if distance is None else distance[idx]
+        for i0 in range(0, len(idx), step):
+            tasks.append((idx, sub_vectors, sub_distance, i0, min(len(idx), i0 + step)))
+
+    def run(task):
+        idx, sub_vectors, sub_distance, i0, i1 = task
+        return [(idx[ii], idx[jj], sep, dist) for ii, jj, sep, dist in
+                _row_block_pairs(sub_vectors, sub_distance, i0, i1, step, max_sep_deg)]
+
+    if workers > 1:
+        with ThreadPoolExecutor(workers) as pool:
+            results = list(pool.map(run, tasks))
+    else:
+        results = [run(task) for task in tasks]
+
+    parts = [part for result in results for part in result]
+    if not parts:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty.copy(), np.empty(0), None if distance is None else np.empty(0)
+    i = np.concatenate([p[0] for p in parts])
+    j = np.concatenate([p[1] for p in parts])
+    sep = np.concatenate([p[2] for p in parts])
+    dist = None if distance is None else np.concatenate([p[3] for p in parts])
+    # 分组后下标已映射回原始顺序，保证 i < j
+    swap = i > j
+    i[swap], j[swap] = j[swap], i[swap]
+    return i, j, sep, dist
@@ -0,0 +1,322 @@
+# celcoord/store.py 基于 SQLite 的本地星表库（R*Tree 天区索引）
+#
+# 图形界面、命令行工具与本地服务可以同时打开同一个库文件，不必各自重新读取星表文件。
+# objects 表存每个天体的 ra(时)、dec(度)、distance(pc) 与 spherical_to_cartesian 给出的
+# x, y, z；objects_index 为 R*Tree，按方向单位向量建索引（每个天体是一个退化成点的盒子），
+# 与距离无关，距离为 0 的天体也有确定的方向。
+# 天区（赤经赤纬范围）与圆锥查询先用包围盒在 R*Tree 中粗筛，再对候选行精确判断。
+# R*Tree 以 32 位浮点存坐标（下界向下、上界向上取整），粗筛只会多取，不会漏取。
+# 写入使用 WAL 日志与分批事务，读连接在写入期间仍能读到上一次提交的数据；
+# 读连接放在连接池中循环使用，可被多个线程同时借用。
+import math
+import pathlib
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+import numpy as np
+from .batch import spherical_to_cartesian_batch
+from .catalog import DEFAULT_CHUNK_ROWS, CatalogChunk, iter_catalog_chunks
+from .arrow_io import in_region, is_parquet, iter_parquet_chunks
+from . import metrics
+
+# 以该扩展名结尾的文件视为星表库
+STORE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+# 每个写事务插入的行数
+DEFAULT_BATCH_ROWS = 50000
+# 读连接池的大小，即可同时执行的查询数
+DEFAULT_READERS = 4
+# 写连接的页缓存（KiB）；R*Tree 插入时要反复访问上层节点，缓存太小时大部分时间花在换页上
+WRITER_CACHE_KIB = 256 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    id INTEGER PRIMARY KEY,
+    ra REAL NOT NULL,
+    dec REAL NOT NULL,
+    distance REAL NOT NULL,
+    x REAL NOT NULL,
+    y REAL NOT NULL,
+    z REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS objects_index USING rtree(
+    id, min_ux, max_ux, min_uy, max_uy, min_uz, max_uz
+);
+"""
+
+_SELECT = ("SELECT o.id, o.ra, o.dec, o.distance, o.x, o.y, o.z "
+           "FROM objects_index AS i JOIN objects AS o ON o.id = i.id ")
+_BOX = ("i.max_ux >= ? AND i.min_ux <= ? AND i.max_uy >= ? AND i.min_uy <= ? "
+        "AND i.max_uz >= ? AND i.min_uz <= ?")
+
+
+def unit_vectors(ra_hours, dec_deg):
+    # 赤经(时)、赤纬(度) -> 方向单位向量 (N, 3)
+    ra = np.radians(np.asarray(ra_hours, dtype=np.float64) * 15)
+    dec = np.radians(np.asarray(dec_deg, dtype=np.float64))
+    cos_dec = np.cos(dec)
+    return np.column_stack((cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)))
+
+
+def cone_bounds(center, radius_deg):
+    """以单位向量 center 为中心、角半径 radius_deg 的球冠的包围盒
+
+    返回 [(min_x, max_x), (min_y, max_y), (min_z, max_z)]。第 k 个分量等于方向与第 k 个
+    坐标轴夹角的余弦，球冠内该夹角的取值范围是 [α - r, α + r] 与 [0, π] 的交集。
+    """
+    radius = math.radians(radius_deg)
+    bounds = []
+    for c in center:
+        alpha = math.acos(max(-1.0, min(1.0, c)))
+        bounds.append((math.cos(min(math.pi, alpha + radius)),
+                       math.cos(max(0.0, alpha - radius))))
+    return bounds
+
+
+def region_bounds(region):
+    """天区 (ra_min, ra_max, dec_min, dec_max) 的单位向量包围盒
+
+    x = cosδ·cosα 与 y = cosδ·sinα 各自是 δ、α 两个因子之积，极值只可能出现在
+    各因子的端点或极值点（α 为 0/90/180/270 度，δ 为 0）的组合上。
+    """
+    ra_min, ra_max, dec_min, dec_max = region
+    ra_lo, ra_hi = ra_min * 15, ra_max * 15
+    if ra_lo > ra_hi:
+        ra_hi += 360
+    ras = [ra_lo, ra_hi] + [a for a in range(0, 720, 90) if ra_lo < a < ra_hi]
+    decs = [dec_min, dec_max] + ([0.0] if dec_min < 0 < dec_max else [])
+    xs, ys = [], []
+    for dec in decs:
+        cos_dec = math.cos(math.radians(dec))
+        for ra in ras:
+            xs.append(cos_dec * math.cos(math.radians(ra)))
+            ys.append(cos_dec * math.sin(math.radians(ra)))
+    z = (math.sin(math.radians(dec_min)), math.sin(math.radians(dec_max)))
+    return [(min(xs), max(xs)), (min(ys), max(ys)), z]
+
+
+class ConnectionPool:
+    """只读连接池：connection() 借出一个连接，用完自动归还；连接按需创建，最多 size 个
+
+    close() 关闭空闲连接；此后归还的连接直接关闭，再借用（包括正在等待的借用）抛出
+    sqlite3.ProgrammingError。
+    """
+
+    def __init__(self, path, size=DEFAULT_READERS):
+        self.uri = pathlib.Path(path).resolve().as_uri() + '?mode=ro'
+        self.size = size
+        # None 为关闭标记，取到时放回，以唤醒其余等待者
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _check(self, conn):
+        if conn is None:
+            self._idle.put(None)
+            raise sqlite3.ProgrammingError("连接池已关闭")
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._check(self._idle.get_nowait())
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("连接池已关闭")
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if not create:
+            # 连接都已借出，等待归还
+            return self._check(self._idle.get())
+        try:
+            return sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        except sqlite3.Error:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _release(self, conn):
+        with self._lock:
+            if not self._closed:
+                self._idle.put(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if conn is not None:
+                conn.close()
+        self._idle.put(None)
+
+
+class CatalogStore:
+    """本地星表库：写入经单一写连接分批提交，查询经只读连接池并发执行
+
+    查询结果为 (ids, CatalogChunk)；CatalogChunk 的 bytes_read/total_bytes 为 0。
+    readonly 为真时只打开读连接池（mode=ro），不建写连接、不改动库文件，
+    库文件不存在或不是星表库时立即抛出 sqlite3.OperationalError，insert 同样抛出该异常。
+    """
+
+    def __init__(self, path, readers=DEFAULT_READERS, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self._write_lock = threading.Lock()
+        self._writer = None
+        if not readonly:
+            self._writer = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                           isolation_level=None)
+            self._writer.execute('PRAGMA journal_mode=WAL')
+            # WAL 模式下 NORMAL 在断电时最多丢失最后一个事务，不会损坏库文件
+            self._writer.execute('PRAGMA synchronous=NORMAL')
+            self._writer.execute(f'PRAGMA cache_size=-{WRITER_CACHE_KIB}')
+            self._writer.executescript(SCHEMA)
+        self.pool = ConnectionPool(path, readers)
+        if readonly:
+            # 先借一个读连接确认库可用，连接随后留在池中
+            try:
+                with self.pool.connection() as conn:
+                    conn.execute('SELECT 1 FROM objects JOIN objects_index LIMIT 0')
+            except sqlite3.Error:
+                self.pool.close()
+                raise
+
+    def close(self):
+        self.pool.close()
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        with self.pool.connection() as conn:
+            return conn.execute('SELECT count(*) FROM objects').fetchone()[0]
+
+    # ---- 写入 ----
+
+    def insert(self, ra_hours, dec_deg, distance, x=None, y=None, z=None,
+               batch_rows=DEFAULT_BATCH_ROWS):
+        """批量写入天体，返回新行的 id 数组；x, y, z 省略时由球面坐标计算"""
+        if self.readonly:
+            raise sqlite3.OperationalError(f"星表库以只读方式打开：{self.path}")
+        ra_hours, dec_deg, distance = (np.asarray(a, dtype=np.float64).ravel()
+                                       for a in (ra_hours, dec_deg, distance))
+        if x is None:
+            x, y, z = spherical_to_cartesian_batch(ra_hours, dec_deg, distance)
+        units = unit_vectors(ra_hours, dec_deg)
+        ids = []
+        with self._write_lock:
+            for start in range(0, len(ra_hours), batch_rows):
+                stop = start + batch_rows
+                ids.append(self._insert_batch(
+                    ra_hours[start:stop], dec_deg[start:stop], distance[start:stop],
+                    x[start:stop], y[start:stop], z[start:stop], units[start:stop]))
+        return np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+
+    def _insert_batch(self, ra, dec, distance, x, y, z, units):
+        n = len(ra)
+        conn = self._writer
+        with metrics.stage('write', n, format='sqlite'):
+            # IMMEDIATE 在事务开始时就取得写锁，分配 id 与插入之间不会被其他进程插入
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                first = conn.execute('SELECT coalesce(max(id), 0) + 1 FROM objects').fetchone()[0]
+                ids = np.arange(first, first + n, dtype=np.int64)
+                conn.executemany('INSERT INTO objects VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                 zip(ids.tolist(), ra.tolist(), dec.tolist(),
+                                     distance.tolist(), x.tolist(), y.tolist(), z.tolist()))
+                ux, uy, uz = units.T.tolist()
+                conn.executemany('INSERT INTO objects_index VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                 zip(ids.tolist(), ux, ux, uy, uy, uz, uz))
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        return ids
+
+    def insert_chunk(self, chunk):
+        return self.insert(chunk.ra_hours, chunk.dec_deg, chunk.distance,
+                           chunk.x, chunk.y, chunk.z)
+
+    def import_file(self, path, chunk_rows=DEFAULT_CHUNK_ROWS):
+        # 导入 CSV 或 Parquet 星表，返回导入的行数
+        if is_parquet(path):
+            chunks = (chunk for chunk, _ in iter_parquet_chunks(path, chunk_rows=chunk_rows))
+        else:
+            chunks = iter_catalog_chunks(path, chunk_rows)
+        rows = 0
+        for chunk in chunks:
+            rows += len(self.insert_chunk(chunk))
+        return rows
+
+    # ---- 查询 ----
+
+    def _candidates(self, bounds, limit):
+        # 在 R*Tree 中按包围盒粗筛；候选数超过 limit 时按 id 步长抽样
+        params = [v for pair in bounds for v in pair]
+        with self.pool.connection() as conn:
+            where = 'WHERE ' + _BOX
+            if limit:
+                count = conn.execute('SELECT count(*) FROM objects_index AS i ' + where,
+                                     params).fetchone()[0]
+                step = max(1, math.ceil(count / limit))
+                if step > 1:
+                    where += ' AND i.id % ? = 0'
+                    params.append(step)
+            rows = conn.execute(_SELECT + where, params).fetchall()
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty((0, 6))
+        data = np.array(rows, dtype=np.float64)
+        return data[:, 0].astype(np.int64), data[:, 1:]
+
+    def _result(self, ids, data, mask):
+        ids, data = ids[mask], data[mask]
+        return ids, CatalogChunk(*(np.ascontiguousarray(data[:, k]) for k in range(6)), 0, 0)
+
+    def query_region(self, region, limit=None):
+        """天区 (ra_min, ra_max, dec_min, dec_max) 内的天体，赤经单位为时
+
+        limit 给出时按步长抽样，返回的行数约为 limit（用于预览）。
+        """
+        with metrics.stage('query', 0, shape='region') as s:
+            ids, data = self._candidates(region_bounds(region), limit)
+            ids, chunk = self._result(ids, data, in_region(data[:, 0], data[:, 1], region))
+            s.rows = len(ids)
+        return ids, chunk
+
+    def query_cone(self, ra_hours, dec_deg, radius_deg, limit=None):
+        # 以 (ra_hours, dec_deg) 为中心、角半径 radius_deg 度的圆锥内的天体
+        center = unit_vectors([ra_hours], [dec_deg])[0]
+        return self.query_direction(center, radius_deg, limit)
+
+    def query_direction(self, center, radius_deg, limit=None):
+        # 与 query_cone 相同，中心以赤道坐标单位向量给出
+        center = np.asarray(center, dtype=np.float64)
+        center = center / np.linalg.norm(center)
+        with metrics.stage('query', 0, shape='cone') as s:
+            ids, data = self._candidates(cone_bounds(center, radius_deg), limit)
+            inside = unit_vectors(data[:, 0], data[:, 1]) @ center >= \
+                math.cos(math.radians(radius_deg))
+            ids, chunk = self._result(ids, data, inside)
+            s.rows = len(ids)
+        return ids, chunk
@@ -0,0 +1,250 @@
+# celcoord/stream.py 标准输入/输出的流式转换（NDJSON 或 CSV）
+#
+# 读线程用 read1() 取出管道中已到达的数据，切成完整的行后整块放进队列，并按字节计入
+# 缓冲额度：已读入但尚未转换写出的数据达到 max_buffer 字节时读线程阻塞、不再从管道读取，
+# 上游自然被反压（额度为零时单独一块可以超出，避免死锁）。尚未读到换行符的半行单独
+# 计算，超过 max_buffer 字节时按无法解析的记录处理：丢弃到下一个换行符为止。
+# 转换端阻塞等待第一块，再把队列里已经到达的块一并取出成批转换（约 max_batch 条），
+# 写出后立即 flush 并归还额度。记录零星到达时每条单独处理、延迟最低，突发到达时自动批量化。
+import csv
+import json
+import queue
+import sys
+import threading
+import numpy as np
+from .batch import spherical_to_cartesian_batch, cartesian_to_spherical_batch
+from .catalog import SPHERICAL_COLUMNS, CARTESIAN_COLUMNS, COLUMN_ALIASES
+from . import metrics
+
+DEFAULT_MAX_BATCH = 4096
+DEFAULT_MAX_BUFFER = 4 * 2**20
+READ_SIZE = 64 * 1024
+OUTPUT_COLUMNS = SPHERICAL_COLUMNS + CARTESIAN_COLUMNS
+
+_EOF = object()
+
+
+class _ByteBudget:
+    # 读线程与转换端之间按字节计的缓冲额度
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, size):
+        with self._cond:
+            while self.used and self.used + size > self.limit:
+                self._cond.wait()
+            self.used += size
+
+    def release(self, size):
+        with self._cond:
+            self.used -= size
+            self._cond.notify()
+
+
+def _reader(stream, blocks, budget):
+    # 读线程：每块为 (首行行号, 行列表, 字节数)，读到结尾时放入 _EOF；读取出错时放入
+    # 异常对象，由转换端重新抛出。超长的行在行列表中记为 None，由转换端按无法解析的记录报告
+    number = 1
+    pending = b''
+    skipping = False
+    try:
+        read = getattr(stream, 'read1', None) or stream.read
+        while True:
+            data = read(READ_SIZE)
+            if not data:
+                break
+            if skipping:
+                # 丢弃超长行的剩余部分
+                end = data.find(b'\n')
+                if end < 0:
+                    continue
+                data = data[end + 1:]
+                skipping = False
+            data = pending + data
+            cut = data.rfind(b'\n') + 1
+            pending = data[cut:]
+            lines = data[:cut].splitlines()
+            if len(pending) > budget.limit:
+                lines.append(None)
+                pending = b''
+                skipping = True
+            if lines:
+                budget.acquire(cut)
+                blocks.put((number, lines, cut))
+                number += len(lines)
+        if pending:
+            budget.acquire(len(pending))
+            blocks.put((number, [pending], len(pending)))
+    except BaseException as e:
+        blocks.put(e)
+    else:
+        blocks.put(_EOF)
+
+
+def _next_batch(blocks, max_batch):
+    # 阻塞取第一块，随后只取已经在队列中的块；返回 ([(行号, 行)], 字节数, 是否到达结尾)。
+    # 读线程的异常在之前的行都交出之后抛出
+    item = blocks.get()
+    if item is _EOF:
+        return [], 0, True
+    if isinstance(item, BaseException):
+        raise item
+    batch = []
+    size = 0
+    while True:
+        number, lines, nbytes = item
+        batch.extend((number + i, line) for i, line in enumerate(lines)
+                     if line is None or line.strip())
+        size += nbytes
+        if len(batch) >= max_batch:
+            return batch, size, False
+        try:
+            item = blocks.get_nowait()
+        except queue.Empty:
+            return batch, size, False
+        if item is _EOF:
+            return batch, size, True
+        if isinstance(item, BaseException):
+            # 异常总是最后一项，放回队列，下次调用时抛出
+            blocks.put(item)
+            return batch, size, False
+
+
+def _kind(keys):
+    if all(k in keys for k in SPHERICAL_COLUMNS):
+        return 'spherical'
+    if all(k in keys for k in CARTESIAN_COLUMNS):
+        return 'cartesian'
+    raise ValueError("记录缺少 ra,dec,distance 或 x,y,z 字段")
+
+
+def _convert(values):
+    # values: [(类型, (a, b, c))]，按类型分组批量转换，返回每条记录的六个输出值
+    out = np.empty((len(values), 6))
+    for kind in ('spherical', 'cartesian'):
+        rows = [i for i, (k, _) in enumerate(values) if k == kind]
+        if not rows:
+            continue
+        a, b, c = np.array([values[i][1] for i in rows], dtype=np.float64).T
+        if kind == 'spherical':
+            converted = (a, b, c) + spherical_to_cartesian_batch(a, b, c)
+        else:
+            converted = cartesian_to_spherical_batch(a, b, c) + (a, b, c)
+        out[rows] = np.column_stack(converted)
+    return out
+
+
+class NDJSONCodec:
+    name = 'ndjson'
+
+    def parse(self, line):
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError("每行应为一个 JSON 对象")
+        names = {k: COLUMN_ALIASES.get(k.lower(), k.lower()) for k in record}
+        fields = {names[k]: v for k, v in record.items()}
+        kind = _kind(fields)
+        columns = SPHERICAL_COLUMNS if kind == 'spherical' else CARTESIAN_COLUMNS
+        values = (kind, tuple(float(fields[c]) for c in columns))
+        # 与 CSV 一样只保留坐标以外的字段，坐标由输出列（小写规范名）给出，
+        # 避免 RA、ra_deg 之类的原字段与输出的 ra 重复
+        converted = set(OUTPUT_COLUMNS)
+        return {k: v for k, v in record.items() if names[k] not in converted}, values
+
+    def format(self, record, values):
+        record.update(zip(OUTPUT_COLUMNS, values.tolist()))
+        return json.dumps(record, ensure_ascii=False) + '\n'
+
+
+class CSVCodec:
+    name = 'csv'
+
+    def __init__(self, header):
+        self.columns = next(csv.reader([header]))
+        names = [COLUMN_ALIASES.get(c.strip().lower(), c.strip().lower()) for c in self.columns]
+        self.kind = _kind(names)
+        wanted = SPHERICAL_COLUMNS if self.kind == 'spherical' else CARTESIAN_COLUMNS
+        self.indices = [names.index(c) for c in wanted]
+        # 输出时保留输入中除坐标列以外的列
+        converted = set(OUTPUT_COLUMNS)
+        self.kept = [i for i, n in enumerate(names) if n not in converted]
+
+    def header(self):
+        return ','.join([self.columns[i] for i in self.kept] + list(OUTPUT_COLUMNS)) + '\n'
+
+    def parse(self, line):
+        row = next(csv.reader([line]))
+        return row, (self.kind, tuple(float(row[i]) for i in self.indices))
+
+    def format(self, row, values):
+        kept = [row[i] for i in self.kept]
+        return ','.join(kept + [format(v, '.10g') for v in values.tolist()]) + '\n'
+
+
+def run_pipe(stdin, stdout, fmt='auto', max_batch=DEFAULT_MAX_BATCH,
+             max_buffer=DEFAULT_MAX_BUFFER, stderr=None, strict=False):
+    """从 stdin 读记录、转换后写到 stdout，返回成功转换的记录数
+
+    stdin/stdout 为二进制流。无法解析的记录写一行说明到 stderr 后跳过，
+    strict 为真时直接抛出异常。
+    """
+    stderr = stderr or sys.stderr
+    budget = _ByteBudget(max_buffer)
+    blocks = queue.Queue()
+    threading.Thread(target=_reader, args=(stdin, blocks, budget), daemon=True).start()
+
+    def skip(number, e):
+        if strict:
+            raise ValueError(f"第 {number} 行: {e}") from e
+        stderr.write(f"第 {number} 行已跳过: {e}\n")
+
+    codec = None
+    converted = 0
+    done = False
+    while not done:
+        batch, size, done = _next_batch(blocks, max_batch)
+        if metrics.enabled:
+            metrics.queue_depth('pipe', blocks.qsize())
+        while codec is None and batch:
+            # 首行决定格式；CSV 表头无法识别时与数据行一样报告并跳过，下一行再作为表头
+            number, first = batch[0]
+            if first is not None and (fmt == 'ndjson' or (
+                    fmt == 'auto' and
+                    first.decode('utf-8-sig', 'replace').lstrip().startswith('{'))):
+                codec = NDJSONCodec()
+                break
+            batch = batch[1:]
+            try:
+                if first is None:
+                    raise ValueError(f"行长度超过 {max_buffer} 字节")
+                codec = CSVCodec(first.decode('utf-8-sig').strip())
+            except ValueError as e:
+                skip(number, e)
+                continue
+            stdout.write(codec.header().encode('utf-8'))
+        if not batch:
+            budget.release(size)
+            continue
+        records, values = [], []
+        with metrics.stage('parse', len(batch), format=codec.name):
+            for number, line in batch:
+                try:
+                    if line is None:
+                        raise ValueError(f"行长度超过 {max_buffer} 字节")
+                    record, value = codec.parse(line.decode('utf-8').strip())
+                except (ValueError, KeyError, IndexError, TypeError) as e:
+                    skip(number, e)
+                    continue
+                records.append(record)
+                values.append(value)
+        out = _convert(values) if records else ()
+        with metrics.stage('write', len(records), format=codec.name):
+            if records:
+                stdout.write(''.join(codec.format(r, v) for r, v in zip(records, out))
+                             .encode('utf-8'))
+            stdout.flush()
+        budget.release(size)
+        converted += len(records)
+    return converted
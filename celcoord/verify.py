@@ -0,0 +1,335 @@
+# celcoord/verify.py 加速路径的精度与速度校验
+#
+# 以 coords.py 中的标量函数为参考，在每个可用后端（numpy、numba）上运行批量函数，
+# 同一次运行中报告与参考值的最大误差、往返误差和吞吐量。输入除随机样本外还包含
+# 容易出错的边界值：天极、赤经 24h 回绕、r == 0、界面上限 1e9 附近的距离、
+# 取整后需要进位的 59.9995 秒等。每项检查都记录误差最大的那一行输入，便于复现。
+# 并行路径（pairs_within 多线程）与单线程结果逐项比较；分块转换（pipeline.py）使用的
+# 原地内核与对应的批量函数逐位比较，输入放在与转换时相同的跨步缓冲区中。
+#
+# 命令行：python -m celcoord verify [--samples N] [--rows N] [--json report.json]
+import itertools
+import time
+import numpy as np
+from . import coords
+from .backends import available_backends, using
+from .batch import (spherical_to_cartesian_batch, cartesian_to_spherical_batch,
+                    hours_to_hms_batch, deg_to_dms_batch)
+from .separation import separation_from, distance_from, pairs_within
+from .pipeline import ChunkBuffer, spherical_to_cartesian_into, cartesian_to_spherical_into
+
+DEFAULT_SAMPLES = 20000
+DEFAULT_THROUGHPUT_ROWS = 1000000
+# 标量参考的吞吐量只用这么多行测量
+REFERENCE_ROWS = 20000
+# 界面输入框的距离上限
+GUI_DISTANCE_LIMIT = 1e9
+ARCSEC_PER_RAD = np.degrees(1) * 3600
+
+# 检查项 -> (容差, 单位)；往返检查另行要求不劣于标量参考
+TOLERANCES = {
+    'spherical_to_cartesian': (1e-14, '相对'),
+    'cartesian_to_spherical.angle': (1e-9, '角秒'),
+    'cartesian_to_spherical.distance': (1e-14, '相对'),
+    'hours_to_hms': (0.0, '秒'),
+    'deg_to_dms': (0.0, '秒'),
+    'roundtrip.angle': (1e-6, '角秒'),
+    'roundtrip.distance': (1e-14, '相对'),
+    'separation_from': (1e-6, '角秒'),
+    'distance_from': (1e-12, '相对'),
+    'pairs_within.parallel': (0.0, '差异数'),
+    'pipeline.spherical_to_cartesian': (0.0, '差异行'),
+    'pipeline.cartesian_to_spherical': (0.0, '差异行'),
+}
+
+
+# ---- 输入生成 ----
+
+def edge_hours():
+    # 赤经（时）：0/24 回绕、极小正负数、各整点附近与取整后需要进位的秒数
+    values = [0.0, -0.0, 24.0, 24 - 1e-12, 23.999999999, -1e-15, 1e-15, 6.0, 12.0, 18.0]
+    for h, m in itertools.product((0, 11, 23), (0, 59)):
+        for s in (0.0005, 59.5, 59.9995, 59.99949999999, 59.99950000001, 59.9999999):
+            values.append(h + m / 60 + s / 3600)
+    return np.array(values)
+
+
+def edge_degrees():
+    # 赤纬（度）：天极、极点附近、赤道两侧的符号与需要进位的秒数
+    values = [90.0, -90.0, 90 - 1e-12, -90 + 1e-12, 89.9999999, 0.0, -0.0, 1e-300, -1e-300]
+    for d, m in itertools.product((0, 45, 89), (0, 59)):
+        for s in (59.9995, 59.99949999999, 59.99950000001):
+            value = d + m / 60 + s / 3600
+            values += [value, -value]
+    return np.array(values)
+
+
+def edge_distances():
+    return np.array([0.0, 5e-324, 1e-300, 1e-9, 1.0, 412.0, GUI_DISTANCE_LIMIT,
+                     GUI_DISTANCE_LIMIT - 1e-7, np.nextafter(GUI_DISTANCE_LIMIT, 0)])
+
+
+def spherical_inputs(rng, n):
+    """(赤经(时), 赤纬(度), 距离)：边界值的全组合加 n 个随机样本"""
+    grid = np.array(list(itertools.product(edge_hours(), edge_degrees(),
+                                           edge_distances()))).T
+    ra = rng.uniform(0, 24, n)
+    dec = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    distance = 10 ** rng.uniform(-3, np.log10(GUI_DISTANCE_LIMIT), n)
+    return tuple(np.concatenate((g, r)) for g, r in zip(grid, (ra, dec, distance)))
+
+
+def cartesian_inputs(rng, n):
+    """(x, y, z)：原点、坐标轴、极大极小量级混合等边界值加 n 个随机样本"""
+    scales = (0.0, -0.0, 1e-300, 1e-9, 1.0, GUI_DISTANCE_LIMIT, -GUI_DISTANCE_LIMIT)
+    grid = np.array(list(itertools.product(scales, repeat=3))).T
+    xyz = rng.standard_normal((3, n)) * 10 ** rng.uniform(-3, 9, n)
+    return tuple(np.concatenate((g, r)) for g, r in zip(grid, xyz))
+
+
+# ---- 误差度量 ----
+
+def _unit(ra_hours, dec_deg):
+    ra = np.radians(np.asarray(ra_hours) * 15)
+    dec = np.radians(np.asarray(dec_deg))
+    return np.stack((np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)), axis=-1)
+
+
+def _angle_arcsec(ra1, dec1, ra2, dec2):
+    a, b = _unit(ra1, dec1), _unit(ra2, dec2)
+    cross = np.linalg.norm(np.cross(a, b), axis=-1)
+    return np.arctan2(cross, np.einsum('ij,ij->i', a, b)) * ARCSEC_PER_RAD
+
+
+def _relative(value, reference):
+    scale = np.maximum(np.abs(reference), np.finfo(np.float64).tiny)
+    return np.abs(np.asarray(value) - reference) / scale
+
+
+def _reference(func, *columns):
+    return tuple(np.array(c) for c in zip(*map(func, *(c.tolist() for c in columns))))
+
+
+def _result(check, path, errors, inputs, **extra):
+    tolerance, unit = TOLERANCES[check]
+    errors = np.where(np.isnan(errors), np.inf, errors)
+    worst = int(np.argmax(errors)) if len(errors) else 0
+    max_error = float(errors[worst]) if len(errors) else 0.0
+    result = {'check': check, 'path': path, 'max_error': max_error, 'unit': unit,
+              'tolerance': tolerance, 'rows': len(errors),
+              'worst_input': [float(c[worst]) for c in inputs] if len(errors) else [],
+              'passed': max_error <= tolerance}
+    result.update(extra)
+    return result
+
+
+def _sexagesimal_errors(batch, reference):
+    # 整数部分不一致记为无穷大，否则为秒的差值
+    *ints, seconds = batch[:3]
+    *ref_ints, ref_seconds = reference[:3]
+    same = np.all([a == b for a, b in zip(ints, ref_ints)], axis=0)
+    if len(batch) > 3:
+        same &= batch[3] == reference[3]
+    return np.where(same, np.abs(seconds - ref_seconds), np.inf)
+
+
+# ---- 各项检查 ----
+
+def check_backend(path, sph, cart, hours, degrees):
+    results = []
+    ref = _reference(coords.spherical_to_cartesian, *sph)
+    out = spherical_to_cartesian_batch(*sph)
+    r = np.abs(sph[2])
+    errors = np.max([np.abs(o - e) for o, e in zip(out, ref)], axis=0) / np.maximum(
+        r, np.finfo(np.float64).tiny)
+    results.append(_result('spherical_to_cartesian', path, errors, sph))
+
+    ref = _reference(coords.cartesian_to_spherical, *cart)
+    out = cartesian_to_spherical_batch(*cart)
+    results.append(_result('cartesian_to_spherical.angle', path,
+                           _angle_arcsec(out[0], out[1], ref[0], ref[1]), cart))
+    results.append(_result('cartesian_to_spherical.distance', path,
+                           _relative(out[2], ref[2]), cart))
+
+    for decimals in (None, 3):
+        ref = _reference(lambda h: coords.hours_to_hms(h, decimals), hours)
+        results.append(_result('hours_to_hms', path, _sexagesimal_errors(
+            hours_to_hms_batch(hours, decimals), ref), (hours,), decimals=decimals))
+        ref = _reference(lambda d: coords.deg_to_dms(d, decimals), degrees)
+        results.append(_result('deg_to_dms', path, _sexagesimal_errors(
+            deg_to_dms_batch(degrees, decimals), ref), (degrees,), decimals=decimals))
+
+    results.extend(check_roundtrip(path, sph))
+    results.extend(check_separation(path, sph))
+    return results
+
+
+def check_roundtrip(path, sph):
+    # 球面 -> 直角 -> 球面。距离为 0 或次正规数时方向没有意义，不计入。
+    # 标量参考自身在天极附近有 arcsin 的精度损失，距离小于约 1e-154 时 x**2 下溢、
+    # 整个方向丢失；这些是公式本身的限制，因此要求批量路径逐行不劣于参考，
+    # 同时报告两者的绝对最大误差
+    ra, dec, distance = sph
+    back = cartesian_to_spherical_batch(*spherical_to_cartesian_batch(ra, dec, distance))
+    ref = _reference(lambda a, b, c: coords.cartesian_to_spherical(
+        *coords.spherical_to_cartesian(a, b, c)), ra, dec, distance)
+    valid = np.abs(distance) >= np.finfo(np.float64).tiny
+    angle = _angle_arcsec(back[0], back[1], ra, dec)[valid]
+    ref_angle = _angle_arcsec(ref[0], ref[1], ra, dec)[valid]
+    rel = _relative(back[2][valid], distance[valid])
+    ref_rel = _relative(ref[2][valid], distance[valid])
+    inputs = tuple(c[valid] for c in sph)
+    return [
+        _result('roundtrip.angle', path, np.maximum(angle - ref_angle, 0), inputs,
+                max_abs_error=float(angle.max()), reference_max_abs_error=float(ref_angle.max())),
+        _result('roundtrip.distance', path, np.maximum(rel - ref_rel, 0), inputs,
+                max_abs_error=float(rel.max()), reference_max_abs_error=float(ref_rel.max())),
+    ]
+
+
+def check_separation(path, sph):
+    # 以若干边界位置为目标，与 coords.angular_separation / distance_3d 逐行比较
+    ra, dec, distance = (c[-REFERENCE_ROWS:] for c in sph)
+    targets = [(0.0, 90.0, 1.0), (23.9999999, -90.0, 1e9), (0.0, 0.0, 412.0),
+               (12.0, 0.0, 1.0), (5.5, -5.39, 412.0)]
+    sep_errors, dist_errors = [], []
+    for t_ra, t_dec, t_dist in targets:
+        ref = np.array([coords.angular_separation(t_ra, t_dec, a, b)
+                        for a, b in zip(ra.tolist(), dec.tolist())])
+        sep_errors.append(np.abs(separation_from(t_ra, t_dec, ra, dec) - ref) * 3600)
+        ref = np.array([coords.distance_3d(t_ra, t_dec, t_dist, a, b, c)
+                        for a, b, c in zip(ra.tolist(), dec.tolist(), distance.tolist())])
+        scale = np.maximum(np.maximum(distance, t_dist), np.finfo(np.float64).tiny)
+        dist_errors.append(np.abs(distance_from(t_ra, t_dec, t_dist, ra, dec, distance) - ref)
+                           / scale)
+    inputs = tuple(np.tile(c, len(targets)) for c in (ra, dec, distance))
+    return [_result('separation_from', path, np.concatenate(sep_errors), inputs[:2]),
+            _result('distance_from', path, np.concatenate(dist_errors), inputs)]
+
+
+def check_parallel(path, rng, n=3000, workers=4):
+    # 多线程与单线程的 pairs_within 结果应完全一致（各线程分到的块大小不同，
+    # 配对的输出顺序会不同，按 (i, j) 排序后再逐项比较）
+    ra = np.concatenate((rng.uniform(0, 24, n // 2), rng.normal(23.99, 0.02, n // 2) % 24))
+    dec = np.concatenate((np.degrees(np.arcsin(rng.uniform(-1, 1, n // 2))),
+                          rng.uniform(88, 90, n // 2)))
+    distance = 10 ** rng.uniform(0, 9, n)
+    serial = pairs_within(ra, dec, 2.0, distance, workers=1, memory_budget=2**20)
+    parallel = pairs_within(ra, dec, 2.0, distance, workers=workers, memory_budget=2**20)
+    if len(serial[0]) != len(parallel[0]):
+        differences = abs(len(serial[0]) - len(parallel[0]))
+    else:
+        serial, parallel = ([c[np.lexsort((r[1], r[0]))] for c in r] for r in (serial, parallel))
+        differences = int(sum(np.count_nonzero(a != b) for a, b in zip(serial, parallel)))
+    return _result('pairs_within.parallel', path, np.array([differences], dtype=np.float64),
+                   (), pairs=len(serial[0]), workers=workers)
+
+
+def _bitwise_differences(actual, expected):
+    # 每行中任一列的位模式不同记为 1
+    actual = np.ascontiguousarray(np.column_stack(actual)).view(np.uint64)
+    expected = np.ascontiguousarray(np.column_stack(expected)).view(np.uint64)
+    return np.any(actual != expected, axis=1).astype(np.float64)
+
+
+def check_pipeline(path, sph, cart):
+    # pipeline 的原地内核与批量函数应逐位一致（包括 -0.0 与 r == 0 的行）
+    results = []
+    # (检查项, 输入, 原地内核, 批量函数, 输入所在的列)；ChunkBuffer 的列依次为 ra, dec, r, x, y, z
+    cases = (('pipeline.spherical_to_cartesian', sph, spherical_to_cartesian_into,
+              spherical_to_cartesian_batch, slice(0, 3)),
+             ('pipeline.cartesian_to_spherical', cart, cartesian_to_spherical_into,
+              cartesian_to_spherical_batch, slice(3, 6)))
+    for check, inputs, into, batch, given in cases:
+        buffer = ChunkBuffer(len(inputs[0]))
+        buffer.rows = len(inputs[0])
+        buffer.data[:, given] = np.column_stack(inputs)
+        into(buffer)
+        computed = buffer.columns()[3:] if given.start == 0 else buffer.columns()[:3]
+        differences = _bitwise_differences(computed, batch(*inputs))
+        results.append(_result(check, path, differences, inputs,
+                               differing_rows=int(differences.sum())))
+    return results
+
+
+# ---- 吞吐量 ----
+
+def _rate(func, rows, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return rows / best if best > 0 else float('inf')
+
+
+def measure_throughput(rng, rows, backends):
+    ra = rng.uniform(0, 24, rows)
+    dec = np.degrees(np.arcsin(rng.uniform(-1, 1, rows)))
+    distance = 10 ** rng.uniform(0, 9, rows)
+    x, y, z = spherical_to_cartesian_batch(ra, dec, distance)
+    n_ref = min(rows, REFERENCE_ROWS)
+    cases = [
+        ('spherical_to_cartesian', lambda: spherical_to_cartesian_batch(ra, dec, distance),
+         lambda: [coords.spherical_to_cartesian(*v) for v in
+                  zip(ra[:n_ref].tolist(), dec[:n_ref].tolist(), distance[:n_ref].tolist())]),
+        ('cartesian_to_spherical', lambda: cartesian_to_spherical_batch(x, y, z),
+         lambda: [coords.cartesian_to_spherical(*v) for v in
+                  zip(x[:n_ref].tolist(), y[:n_ref].tolist(), z[:n_ref].tolist())]),
+        ('hours_to_hms', lambda: hours_to_hms_batch(ra, 3),
+         lambda: [coords.hours_to_hms(v, 3) for v in ra[:n_ref].tolist()]),
+        ('deg_to_dms', lambda: deg_to_dms_batch(dec, 3),
+         lambda: [coords.deg_to_dms(v, 3) for v in dec[:n_ref].tolist()]),
+    ]
+    table = []
+    for name, batch_call, scalar_call in cases:
+        entry = {'function': name, 'rows': rows, 'reference': _rate(scalar_call, n_ref, 1)}
+        for backend in backends:
+            with using(backend):
+                batch_call()   # 预热（JIT 编译、缓存）
+                entry[backend] = _rate(batch_call, rows)
+        table.append(entry)
+    return table
+
+
+def run(samples=DEFAULT_SAMPLES, rows=DEFAULT_THROUGHPUT_ROWS, seed=0, backends=None):
+    """运行全部检查与吞吐量测量，返回报告字典（见 format_report）"""
+    backends = list(backends or available_backends())
+    rng = np.random.default_rng(seed)
+    sph = spherical_inputs(rng, samples)
+    cart = cartesian_inputs(rng, samples)
+    hours = np.concatenate((edge_hours(), rng.uniform(-48, 48, samples)))
+    degrees = np.concatenate((edge_degrees(), rng.uniform(-90, 90, samples)))
+    checks = []
+    for backend in backends:
+        with using(backend):
+            checks.extend(check_backend(backend, sph, cart, hours, degrees))
+            checks.append(check_parallel(backend, np.random.default_rng(seed)))
+            checks.extend(check_pipeline(backend, sph, cart))
+    throughput = measure_throughput(rng, rows, backends) if rows else []
+    return {'seed': seed, 'samples': samples, 'backends': backends, 'checks': checks,
+            'throughput': throughput, 'passed': all(c['passed'] for c in checks)}
+
+
+def format_report(report):
+    lines = [f"精度校验（种子 {report['seed']}，随机样本 {report['samples']}，"
+             f"后端 {', '.join(report['backends'])}）"]
+    lines.append(f"  {'检查项':<34}{'路径':<8}{'最大误差':>12}  {'容差':>9}  结果")
+    for c in report['checks']:
+        name = c['check'] + (f" (decimals={c['decimals']})" if 'decimals' in c else '')
+        lines.append(f"  {name:<36}{c['path']:<8}{c['max_error']:>12.3g}  "
+                     f"{c['tolerance']:>9.3g}  {'通过' if c['passed'] else '失败'}  {c['unit']}")
+        if 'reference_max_abs_error' in c:
+            lines.append(f"    往返绝对最大误差 {c['max_abs_error']:.3g}，"
+                         f"标量参考 {c['reference_max_abs_error']:.3g}（{c['unit']}）")
+        if not c['passed']:
+            lines.append(f"    误差最大的输入: {c['worst_input']}")
+    if report['throughput']:
+        backends = report['backends']
+        lines.append("吞吐量（行/秒，括号内为相对标量参考的倍数）")
+        lines.append(f"  {'函数':<24}{'标量参考':>12}" + ''.join(f"{b:>22}" for b in backends))
+        for t in report['throughput']:
+            cells = ''.join(f"{t[b]:>12.3g} ({t[b] / t['reference']:>6.0f}x)" for b in backends)
+            lines.append(f"  {t['function']:<26}{t['reference']:>12.3g}{cells}")
+    lines.append("全部通过" if report['passed'] else "存在未通过的检查")
+    return '\n'.join(lines)
@@ -0,0 +1,21 @@
+# celcoord_gui 图形界面包
+#
+# 导入本包本身不会加载 PyQt5，只有访问下列名称时才导入对应子模块。
+_LAZY = {
+    'CoordinateConverter': 'main_window',
+    'CelestialSphereWidget': 'widget',
+    'BatchConvertPanel': 'batch_panel',
+    'main': 'app',
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+        module = importlib.import_module('.' + _LAZY[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,36 @@
+# celcoord_gui/app.py 图形界面启动
+import sys
+from . import startup
+
+
+def main(argv=None):
+    argv = list(sys.argv if argv is None else argv)
+    if '--startup-report' in argv:
+        argv.remove('--startup-report')
+        startup.enable()
+    metrics_path = None
+    if '--metrics' in argv:
+        # --metrics PATH：退出时写出运行指标（缓存命中率等）
+        i = argv.index('--metrics')
+        if i + 1 >= len(argv) or argv[i + 1].startswith('-'):
+            print("用法: --metrics PATH（缺少指标文件路径）", file=sys.stderr)
+            return 2
+        metrics_path = argv[i + 1]
+        del argv[i:i + 2]
+
+    from PyQt5.QtWidgets import QApplication
+    startup.mark('导入 Qt')
+    app = QApplication(argv)
+    startup.mark('创建 QApplication')
+    from .main_window import CoordinateConverter
+    ex = CoordinateConverter()
+    ex.show()
+    startup.mark('显示主窗口')
+    if metrics_path is None:
+        return app.exec_()
+    from celcoord import metrics
+    metrics.enable()
+    try:
+        return app.exec_()
+    finally:
+        metrics.write(metrics_path)
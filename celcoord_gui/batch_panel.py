@@ -0,0 +1,219 @@
+# celcoord_gui/batch_panel.py 星表批量转换面板（后台线程分块处理）
+import os
+import threading
+from PyQt5.QtWidgets import (QGroupBox, QVBoxLayout, QHBoxLayout, QPushButton,
+                             QLabel, QProgressBar, QFileDialog, QComboBox)
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+
+class BatchWorker(QObject):
+    # 信号在工作线程发出，经队列连接回到界面线程
+    progress = pyqtSignal(int, int)              # 已读字节, 总字节
+    chunk_converted = pyqtSignal(object, object, object)  # 赤经(度), 赤纬(度), 距离(pc)
+    finished = pyqtSignal(int, str)              # 行数, 输出路径
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal(int)
+
+    def __init__(self, input_path, output_path):
+        super().__init__()
+        self.input_path = input_path
+        self.output_path = output_path
+        self._cancel = threading.Event()
+        self._pipeline = None
+
+    def cancel(self):
+        # 由界面线程直接调用；流水线各阶段在等待队列时检查该标志
+        self._cancel.set()
+        pipeline = self._pipeline
+        if pipeline is not None:
+            pipeline.cancel()
+
+    def _on_chunk(self, buffer):
+        # 缓冲区写出后会被重复使用，发给界面线程的必须是副本
+        data = buffer.data[:buffer.rows]
+        self.chunk_converted.emit(data[:, 0] * 15, data[:, 1].copy(), data[:, 2].copy())
+        self.progress.emit(buffer.bytes_read, buffer.total_bytes)
+
+    def _on_arrow_chunk(self, chunk):
+        self.chunk_converted.emit(chunk.ra_hours * 15, chunk.dec_deg, chunk.distance)
+        self.progress.emit(chunk.bytes_read, chunk.total_bytes)
+
+    def run_arrow(self):
+        from celcoord import arrow_io
+        try:
+            rows, cancelled = arrow_io.convert_file(self.input_path, self.output_path,
+                                                    on_chunk=self._on_arrow_chunk,
+                                                    cancel=self._cancel.is_set)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        if cancelled:
+            self.cancelled.emit(rows)
+        else:
+            self.finished.emit(rows, self.output_path)
+
+    def run(self):
+        # 依赖 numpy 的模块放到工作线程中导入，不拖慢窗口启动
+        from celcoord.arrow_io import is_parquet
+        if is_parquet(self.input_path):
+            return self.run_arrow()
+        from celcoord.pipeline import ChunkPipeline, Cancelled
+        pipeline = ChunkPipeline(self.input_path, self.output_path, on_chunk=self._on_chunk)
+        self._pipeline = pipeline
+        if self._cancel.is_set():
+            pipeline.cancel()
+        try:
+            rows = pipeline.run()
+        except Cancelled:
+            self.cancelled.emit(pipeline.rows)
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.finished.emit(rows, self.output_path)
+
+
+# 显示方式选项：(文字, 显示方式, 密度配色刻度)
+DISPLAY_MODES = [
+    ('逐点显示', 'points', 'linear'),
+    ('密度图（线性）', 'density', 'linear'),
+    ('密度图（对数）', 'density', 'log'),
+]
+
+# 天球视图布局：(文字, 各视图的参考架)，多个视图共用同一份星表数据
+VIEW_LAYOUTS = [
+    ('赤道坐标', ('equatorial',)),
+    ('银道坐标', ('galactic',)),
+    ('赤道 + 银道并排', ('equatorial', 'galactic')),
+]
+
+
+class BatchConvertPanel(QGroupBox):
+    chunk_converted = pyqtSignal(object, object, object)
+    started = pyqtSignal()
+    display_changed = pyqtSignal(str, str)   # 显示方式, 配色刻度
+    view_frames_changed = pyqtSignal(object)  # 各视图的参考架
+    store_opened = pyqtSignal(str)            # 星表库路径
+
+    def __init__(self, parent=None):
+        super().__init__("星表批量转换", parent)
+        self.thread = None
+        self.worker = None
+
+        layout = QVBoxLayout()
+        buttons = QHBoxLayout()
+        self.open_btn = QPushButton('打开星表文件…')
+        self.open_btn.clicked.connect(self.choose_file)
+        self.cancel_btn = QPushButton('取消')
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel)
+        buttons.addWidget(self.open_btn)
+        buttons.addWidget(self.cancel_btn)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        self.status = QLabel("CSV / Parquet 列：ra(时),dec(度),distance(pc) 或 x,y,z")
+        self.status.setWordWrap(True)
+
+        display = QHBoxLayout()
+        self.display_combo = QComboBox()
+        self.display_combo.addItems([text for text, _, _ in DISPLAY_MODES])
+        self.display_combo.currentIndexChanged.connect(self.on_display_changed)
+        display.addWidget(QLabel("显示方式:"))
+        display.addWidget(self.display_combo)
+        self.view_combo = QComboBox()
+        self.view_combo.addItems([text for text, _ in VIEW_LAYOUTS])
+        self.view_combo.currentIndexChanged.connect(self.on_view_changed)
+        display.addWidget(QLabel("视图:"))
+        display.addWidget(self.view_combo)
+
+        layout.addLayout(buttons)
+        layout.addLayout(display)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.status)
+        self.setLayout(layout)
+
+    def choose_file(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "选择星表文件", "", "CSV 文件 (*.csv *.txt);;Parquet 文件 (*.parquet *.pq);;"
+                  "星表库 (*.db *.sqlite *.sqlite3);;所有文件 (*)")
+        if not path:
+            return
+        from celcoord.store import STORE_EXTENSIONS
+        if path.lower().endswith(STORE_EXTENSIONS):
+            # 星表库不做转换，由主窗口按视野分页读取
+            self.status.setText("星表库：" + os.path.basename(path) + "（按视野读取）")
+            self.store_opened.emit(path)
+            return
+        from celcoord.catalog import default_output_path
+        self.start(path, default_output_path(path))
+
+    def start(self, input_path, output_path):
+        if self.thread is not None:
+            return
+        self.worker = BatchWorker(input_path, output_path)
+        self.thread = QThread(self)
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.progress.connect(self.on_progress)
+        self.worker.chunk_converted.connect(self.chunk_converted)
+        self.worker.finished.connect(self.on_finished)
+        self.worker.failed.connect(self.on_failed)
+        self.worker.cancelled.connect(self.on_cancelled)
+        for signal in (self.worker.finished, self.worker.failed, self.worker.cancelled):
+            signal.connect(self.thread.quit)
+        self.thread.finished.connect(self.on_thread_finished)
+
+        self.progress_bar.setValue(0)
+        self.status.setText("正在转换：" + os.path.basename(input_path))
+        self.open_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.started.emit()
+        self.thread.start()
+
+    def cancel(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.status.setText("正在取消…")
+
+    def display_mode(self):
+        _, mode, scale = DISPLAY_MODES[self.display_combo.currentIndex()]
+        return mode, scale
+
+    def on_display_changed(self, index):
+        self.display_changed.emit(*self.display_mode())
+
+    def view_frames(self):
+        return VIEW_LAYOUTS[self.view_combo.currentIndex()][1]
+
+    def on_view_changed(self, index):
+        self.view_frames_changed.emit(self.view_frames())
+
+    def on_progress(self, done, total):
+        self.progress_bar.setValue(int(1000 * done / total) if total else 1000)
+
+    def on_finished(self, rows, output_path):
+        self.progress_bar.setValue(1000)
+        self.status.setText(f"完成：{rows} 行 → {os.path.basename(output_path)}")
+
+    def on_failed(self, message):
+        self.status.setText("转换失败：" + message)
+
+    def on_cancelled(self, rows):
+        self.status.setText(f"已取消（已转换 {rows} 行）")
+
+    def on_thread_finished(self):
+        self.worker.deleteLater()
+        self.thread.deleteLater()
+        self.worker = None
+        self.thread = None
+        self.open_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+
+    def shutdown(self):
+        # 关闭窗口时取消并等待工作线程结束
+        if self.thread is not None:
+            self.worker.cancel()
+            self.thread.quit()
+            self.thread.wait()
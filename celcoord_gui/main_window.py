@@ -1,19 +1,28 @@
-# main_window.py
+# celcoord_gui/main_window.py 主程序逻辑
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QGroupBox, QFormLayout, QSpinBox, QDoubleSpinBox,
                             QPushButton, QLabel, QComboBox, QMessageBox,
                             QGraphicsDropShadowEffect, QSizePolicy)
 from PyQt5.QtGui import QColor, QPalette
-from PyQt5.QtCore import Qt
-from celestial_coords import *
-from celestial_widget import CelestialSphereWidget
-from styles import MAIN_STYLESHEET
+from PyQt5.QtCore import Qt, QTimer
+from celcoord.coords import (hms_to_hours, hours_to_hms, dms_to_deg, deg_to_dms,
+                             spherical_to_cartesian, cartesian_to_spherical)
+from .batch_panel import BatchConvertPanel
+from .styles import MAIN_STYLESHEET
+from . import startup
 
 class CoordinateConverter(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.init_ui()
+        # 先设置样式表再创建子控件，避免整棵控件树被重新 polish 一次
         self.setStyleSheet(MAIN_STYLESHEET)
+        self.sphere_widget = None
+        # 与主视图共用星表场景的其他参考架视图
+        self.extra_views = []
+        # 打开星表库时按主视图的视野分页读取
+        self.store_pager = None
+        self.first_painted = False
+        self.init_ui()
         # 启用窗口透明
         self.setAttribute(Qt.WA_TranslucentBackground)
         # 创建模糊背景
@@ -22,6 +31,7 @@ class CoordinateConverter(QMainWindow):
         self.shadow.setColor(QColor(0, 0, 0, 150))
         self.shadow.setOffset(5, 5)
         self.centralWidget().setGraphicsEffect(self.shadow)        
+        startup.mark('创建主窗口')
 
         
     def init_ui(self):
@@ -31,16 +41,10 @@ class CoordinateConverter(QMainWindow):
         palette.setColor(QPalette.Window, QColor(245, 245, 245))
         self.setPalette(palette)
         
-        main_widget = QWidget()
-        self.setCentralWidget(main_widget)
-        main_layout = QHBoxLayout()
-        main_layout.setContentsMargins(20, 20, 20, 20)
-        # 左侧输入区（可伸缩）
-        input_panel = QWidget()
-        input_panel.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        input_layout = QVBoxLayout(input_panel)
+        self.main_layout = QHBoxLayout()
+        self.main_layout.setContentsMargins(20, 20, 20, 20)
 
-        # 输入面板
+        # 输入面板（可伸缩）
         input_panel = QWidget()
         input_layout = QVBoxLayout(input_panel)
         input_layout.setContentsMargins(0, 0, 0, 0)
@@ -50,26 +54,107 @@ class CoordinateConverter(QMainWindow):
         spherical_group = self.create_spherical_group()
         cartesian_group = self.create_cartesian_group()
         
+        # 星表批量转换
+        self.batch_panel = BatchConvertPanel()
+        self.batch_panel.started.connect(self.ensure_sphere_widget)
+        self.batch_panel.started.connect(self.close_store)
+        self.batch_panel.store_opened.connect(self.open_store)
+        
         input_layout.addWidget(spherical_group)
         input_layout.addWidget(cartesian_group)
+        input_layout.addWidget(self.batch_panel)
         input_layout.addStretch()
         
-        # 3D可视化面板
-        self.sphere_widget = CelestialSphereWidget()
-        self.sphere_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        # 3D可视化面板：首帧显示后再创建（见 paintEvent），先用占位控件撑开布局
+        self.sphere_placeholder = QWidget()
+        self.sphere_placeholder.setMinimumSize(600, 500)
+        self.sphere_placeholder.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         
-        main_layout.addWidget(input_panel, 35)  # 35%宽度
-        main_layout.addWidget(self.sphere_widget, 65)  # 65%宽度
+        self.main_layout.addWidget(input_panel, 35)  # 35%宽度
+        self.main_layout.addWidget(self.sphere_placeholder, 65)  # 65%宽度
         
         # 设置中心部件
         central = QWidget()
-        central.setLayout(main_layout)
+        central.setLayout(self.main_layout)
         self.setCentralWidget(central)
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_painted:
+            self.first_painted = True
+            startup.mark('主窗口首帧')
+            QTimer.singleShot(0, self.ensure_sphere_widget)
+
+    def ensure_sphere_widget(self):
+        if self.sphere_widget is not None:
+            return self.sphere_widget
+        # 天球组件依赖 numpy，延迟到这里才导入
+        from .widget import CelestialSphereWidget
+        self.sphere_widget = CelestialSphereWidget()
+        self.sphere_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.batch_panel.started.connect(self.sphere_widget.clear_catalog)
+        self.batch_panel.chunk_converted.connect(self.sphere_widget.add_catalog_chunk)
+        self.batch_panel.display_changed.connect(self.sphere_widget.set_catalog_display)
+        self.sphere_widget.set_catalog_display(*self.batch_panel.display_mode())
+        self.sphere_widget.object_picked.connect(self.fill_from_pick)
+        self.sphere_area = QWidget()
+        self.sphere_area.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        area_layout = QHBoxLayout(self.sphere_area)
+        area_layout.setContentsMargins(0, 0, 0, 0)
+        area_layout.addWidget(self.sphere_widget)
+        self.main_layout.replaceWidget(self.sphere_placeholder, self.sphere_area)
+        self.sphere_placeholder.deleteLater()
+        self.sphere_placeholder = None
+        self.batch_panel.view_frames_changed.connect(self.set_view_frames)
+        self.set_view_frames(self.batch_panel.view_frames())
+        startup.mark('创建天球组件')
+        QTimer.singleShot(0, startup.finish)
+        return self.sphere_widget
+
+    def open_store(self, path):
+        from .paging import StorePager
+        self.close_store()
+        try:
+            self.store_pager = StorePager(path, self.ensure_sphere_widget())
+        except Exception as e:
+            self.batch_panel.on_failed(str(e))
+            return
+        self.store_pager.failed.connect(self.batch_panel.on_failed)
+        self.store_pager.refresh()
+
+    def close_store(self):
+        if self.store_pager is not None:
+            self.store_pager.close()
+            self.store_pager = None
+
+    def sphere_views(self):
+        return [self.sphere_widget] + self.extra_views if self.sphere_widget else []
+
+    def set_view_frames(self, frames):
+        # 主视图显示第一个参考架，其余参考架各建一个共用同一场景的视图
+        from .widget import CelestialSphereWidget
+        primary = self.ensure_sphere_widget()
+        primary.set_frame(frames[0])
+        for view in self.extra_views:
+            self.sphere_area.layout().removeWidget(view)
+            view.deleteLater()
+        self.extra_views = []
+        for frame in frames[1:]:
+            view = CelestialSphereWidget(scene=primary.scene, frame=frame)
+            view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+            view.set_catalog_display(primary.catalog_display, primary.density_scale)
+            view.source_point = primary.source_point
+            view.target_point = primary.target_point
+            self.batch_panel.display_changed.connect(view.set_catalog_display)
+            view.object_picked.connect(self.fill_from_pick)
+            self.sphere_area.layout().addWidget(view)
+            self.extra_views.append(view)
+        minimum = (600, 500) if len(frames) == 1 else (320, 300)
+        for view in self.sphere_views():
+            view.setMinimumSize(*minimum)
         
     def create_spherical_group(self):
         group = QGroupBox("天球球面坐标系")
-        group.setStyleSheet("QGroupBox { font-weight: bold; }")
         layout = QFormLayout()
         layout.setContentsMargins(5, 15, 5, 10)
         layout.setVerticalSpacing(12)        
@@ -99,7 +184,7 @@ class CoordinateConverter(QMainWindow):
         # 转换按钮
         self.to_cartesian_btn = QPushButton('转换为天球空间直角坐标系 →')
         self.to_cartesian_btn.clicked.connect(self.to_cartesian)
-        self.to_cartesian_btn.setStyleSheet(self.button_style("#4CAF50"))
+        self.to_cartesian_btn.setObjectName('toCartesianBtn')
         layout.addRow(self.to_cartesian_btn)
         
         group.setLayout(layout)
@@ -107,7 +192,6 @@ class CoordinateConverter(QMainWindow):
         
     def create_cartesian_group(self):
         group = QGroupBox("天球空间直角坐标系")
-        group.setStyleSheet("QGroupBox { font-weight: bold; }")
         layout = QFormLayout()
         
         self.x_input = self.create_double_spinbox(-1e9, 1e9)
@@ -120,7 +204,7 @@ class CoordinateConverter(QMainWindow):
         
         self.to_spherical_btn = QPushButton('← 转换为天球球面坐标系')
         self.to_spherical_btn.clicked.connect(self.to_spherical)
-        self.to_spherical_btn.setStyleSheet(self.button_style("#2196F3"))
+        self.to_spherical_btn.setObjectName('toSphericalBtn')
         layout.addRow(self.to_spherical_btn)
         
         group.setLayout(layout)
@@ -140,7 +224,6 @@ class CoordinateConverter(QMainWindow):
     def create_spinbox(self, min_val, max_val):
         sb = QSpinBox()
         sb.setRange(min_val, max_val)
-        sb.setStyleSheet("QSpinBox { padding: 5px; background: white; }")
         sb.setMinimumWidth(70)
         return sb
         
@@ -148,23 +231,9 @@ class CoordinateConverter(QMainWindow):
         sb = QDoubleSpinBox()
         sb.setRange(min_val, max_val)
         sb.setDecimals(3)
-        sb.setStyleSheet("QDoubleSpinBox { padding: 5px; background: white; }")
         sb.setMinimumWidth(90)
         return sb
         
-    def button_style(self, color):
-        return f"""
-        QPushButton {{
-            background-color: {color};
-            color: white;
-            border: none;
-            padding: 8px 15px;
-            border-radius: 4px;
-            font-weight: bold;
-        }}
-        QPushButton:hover {{ background-color: {color}; opacity: 0.9; }}
-        """
-        
     def to_cartesian(self):
         try:
             ra_h = self.ra_h.value()
@@ -194,8 +263,8 @@ class CoordinateConverter(QMainWindow):
             z = self.z_input.value()
 
             ra_hours, dec_deg, r = cartesian_to_spherical(x, y, z)
-            ra_h, ra_m, ra_s = hours_to_hms(ra_hours)
-            dec_d, dec_m, dec_s, sign = deg_to_dms(dec_deg)
+            ra_h, ra_m, ra_s = hours_to_hms(ra_hours, 3)
+            dec_d, dec_m, dec_s, sign = deg_to_dms(dec_deg, 3)
 
             self.ra_h.setValue(ra_h)
             self.ra_m.setValue(ra_m)
@@ -209,6 +278,32 @@ class CoordinateConverter(QMainWindow):
         except Exception as e:
             QMessageBox.warning(self, "转换错误", str(e))
         
+    def fill_from_pick(self, ra_hours, dec_deg, distance):
+        # 把球面上点选的天体填入两组输入框
+        ra_h, ra_m, ra_s = hours_to_hms(ra_hours, 3)
+        dec_d, dec_m, dec_s, sign = deg_to_dms(dec_deg, 3)
+        x, y, z = spherical_to_cartesian(ra_hours, dec_deg, distance)
+
+        self.ra_h.setValue(ra_h)
+        self.ra_m.setValue(ra_m)
+        self.ra_s.setValue(ra_s)
+        self.dec_sign.setCurrentIndex(0 if sign == 1 else 1)
+        self.dec_deg.setValue(dec_d)
+        self.dec_min.setValue(dec_m)
+        self.dec_sec.setValue(dec_s)
+        self.distance.setValue(distance)
+        self.x_input.setValue(x)
+        self.y_input.setValue(y)
+        self.z_input.setValue(z)
+        self.update_visualization(ra_hours, dec_deg, distance)
+
     def update_visualization(self, ra_hours, dec_deg, distance):
         ra_deg = ra_hours * 15
-        self.sphere_widget.set_points(ra_deg, dec_deg)        
\ No newline at end of file
+        self.ensure_sphere_widget()
+        for view in self.sphere_views():
+            view.set_points(ra_deg, dec_deg)
+
+    def closeEvent(self, event):
+        self.batch_panel.shutdown()
+        self.close_store()
+        super().closeEvent(event)
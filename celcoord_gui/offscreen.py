@@ -0,0 +1,147 @@
+# celcoord_gui/offscreen.py 无界面批量渲染天球视图并导出 PNG
+#
+# 复用 CelestialSphereWidget.paint 的绘制代码，在 Qt 的 offscreen 平台上画到 QImage。
+# 任务按视图参数（旋转、尺寸）分组后交给进程池，同组任务落在同一个进程里，
+# 静态网格图层只画一次（见 widget._grid_layers）。
+#
+# 命令行：python -m celcoord_gui.offscreen jobs.json [--workers N]
+# jobs.json 为任务列表，每个任务形如
+#   {"output": "m42.png", "points": [[5.588, -5.39], ...], "rotation": [20, -30],
+#    "size": [800, 600], "target": [5.588, -5.39], "display": "points"}
+# target 为高亮标记的天体位置，display 可取 points 或 density（此时 scale 取 linear/log），
+# frame 为显示的参考架（equatorial 或 galactic）。
+# points 为 [赤经(时), 赤纬(度)] 列表，也可以用 "catalog": "stars.csv" 指定星表文件。
+# track 为可选的轨迹，格式同 points，按顺序连成折线。
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+DEFAULT_SIZE = (800, 600)
+# 每个进程任务包含的最多渲染任务数，同视图的任务较多时拆开以便负载均衡
+BATCH_SIZE = 32
+
+_app = None
+
+
+def ensure_app():
+    # 必须在创建 QApplication 之前选择 offscreen 平台
+    global _app
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    _app = QApplication.instance() or QApplication([sys.argv[0]])
+    return _app
+
+
+def view_key(job):
+    return (tuple(job.get('rotation', (0, 0))), tuple(job.get('size', DEFAULT_SIZE)))
+
+
+def _job_points(job):
+    import numpy as np
+    if 'catalog' in job:
+        from celcoord.catalog import iter_catalog_chunks
+        chunks = list(iter_catalog_chunks(job['catalog']))
+        if not chunks:
+            return np.empty(0), np.empty(0), np.empty(0)
+        return (np.concatenate([c.ra_hours for c in chunks]),
+                np.concatenate([c.dec_deg for c in chunks]),
+                np.concatenate([c.distance for c in chunks]))
+    points = np.asarray(job.get('points', []), dtype=np.float64).reshape(-1, 2)
+    return points[:, 0], points[:, 1], np.ones(len(points))
+
+
+def render_image(job):
+    """按任务描述渲染一张 QImage"""
+    ensure_app()
+    import numpy as np
+    from PyQt5.QtGui import QImage, QPainter
+    from .widget import CelestialSphereWidget
+
+    width, height = job.get('size', DEFAULT_SIZE)
+    widget = CelestialSphereWidget(frame=job.get('frame', 'equatorial'))
+    widget.setMinimumSize(0, 0)
+    widget.resize(width, height)
+    widget.x_rotation, widget.y_rotation = job.get('rotation', (0, 0))
+    widget.set_catalog_display(job.get('display', 'points'), job.get('scale'))
+    ra_hours, dec_deg, distance = _job_points(job)
+    if len(ra_hours):
+        widget.add_catalog_chunk(ra_hours * 15, dec_deg, distance)
+    if job.get('track'):
+        track = np.asarray(job['track'], dtype=np.float64).reshape(-1, 2)
+        widget.add_track('track', capacity=max(1, len(track))).append(track[:, 0] * 15, track[:, 1])
+    if job.get('target'):
+        ra, dec = job['target']
+        widget.set_points(ra * 15, dec)
+
+    image = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+    painter = QPainter(image)
+    widget.paint(painter)
+    painter.end()
+    widget.deleteLater()
+    return image
+
+
+def render_job(job):
+    image = render_image(job)
+    output = job['output']
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if not image.save(output, 'PNG'):
+        raise OSError(f"无法写入 {output}")
+    return output
+
+
+def _render_batch(jobs):
+    return [render_job(job) for job in jobs]
+
+
+def _batches(jobs, batch_size):
+    # 同视图的任务放在一起，再按 batch_size 切分
+    groups = {}
+    for index, job in enumerate(jobs):
+        groups.setdefault(view_key(job), []).append(index)
+    for indices in groups.values():
+        for start in range(0, len(indices), batch_size):
+            yield indices[start:start + batch_size]
+
+
+def render_jobs(jobs, workers=None, batch_size=BATCH_SIZE):
+    """并行渲染全部任务，按输入顺序返回输出路径列表
+
+    workers 为 1 时在当前进程中渲染。进程池使用 spawn 方式启动，
+    避免在已加载 Qt 的进程中 fork。
+    """
+    jobs = list(jobs)
+    batches = list(_batches(jobs, batch_size))
+    outputs = [None] * len(jobs)
+    if workers == 1:
+        results = [_render_batch([jobs[i] for i in batch]) for batch in batches]
+    else:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=ensure_app) as pool:
+            results = list(pool.map(_render_batch, [[jobs[i] for i in b] for b in batches]))
+    for batch, paths in zip(batches, results):
+        for index, path in zip(batch, paths):
+            outputs[index] = path
+    return outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m celcoord_gui.offscreen',
+                                     description="无界面批量渲染天球视图")
+    parser.add_argument('jobs', help="任务列表 JSON 文件")
+    parser.add_argument('--workers', type=int, default=None, help="进程数，默认为 CPU 核数")
+    args = parser.parse_args(argv)
+    with open(args.jobs, encoding='utf-8') as f:
+        jobs = json.load(f)
+    for path in render_jobs(jobs, args.workers):
+        print(path)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
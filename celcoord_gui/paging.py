@@ -0,0 +1,89 @@
+# celcoord_gui/paging.py 按视野从星表库分页读取
+#
+# 每次拖动结束后，由一个后台线程查询星表库中当前可见半球内的天体（超过预览上限时按步长抽样），
+# 结果替换场景中的星表预览。后台线程只保留最新的一次请求：查询进行中又有新的视野时，
+# 期间的请求被后来者覆盖，查询完成后直接处理最新的那个；过时查询的结果与错误都丢弃。
+# 场景与密度图只反映已读入的区域。库以只读方式打开，查询只经 CatalogStore 的读连接池进行，
+# 不建写连接也不改动库文件，同时打开同一个库的其他程序（命令行导入、本地服务）不受影响。
+import threading
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+from .widget import MAX_PREVIEW_POINTS
+
+
+class StorePager(QObject):
+    # 查询结果在后台线程发出，经队列连接回到界面线程
+    loaded = pyqtSignal(int, object)   # 查询序号, CatalogChunk
+    errored = pyqtSignal(int, str)     # 查询序号, 错误信息
+    failed = pyqtSignal(str)           # 仅对当前查询发出
+
+    def __init__(self, path, view, limit=MAX_PREVIEW_POINTS, parent=None):
+        super().__init__(parent)
+        from celcoord.store import CatalogStore
+        self.store = CatalogStore(path, readonly=True)
+        self.path = path
+        self.view = view
+        self.limit = limit
+        self.generation = 0
+        self.last_cone = None
+        # 等待查询的最新请求 (序号, 中心, 半径)；closed 后后台线程退出
+        self._request = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self.loaded.connect(self.on_loaded)
+        self.errored.connect(self.on_errored)
+        view.view_changed.connect(self.refresh)
+        self._thread = threading.Thread(target=self._run, name='celcoord-pager', daemon=True)
+        self._thread.start()
+
+    def refresh(self):
+        center, radius = self.view.visible_cone()
+        key = (tuple(np.round(center, 9)), radius)
+        if key == self.last_cone:
+            return
+        self.last_cone = key
+        self.generation += 1
+        with self._cond:
+            self._request = (self.generation, center, radius)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._request is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                request, self._request = self._request, None
+            self._query(*request)
+
+    def _query(self, generation, center, radius):
+        try:
+            _, chunk = self.store.query_direction(center, radius, self.limit)
+        except Exception as e:
+            if generation == self.generation:
+                self.errored.emit(generation, str(e))
+            return
+        if generation == self.generation:
+            self.loaded.emit(generation, chunk)
+
+    def on_loaded(self, generation, chunk):
+        # 后台线程发出之后、到达界面线程之前视野又变了（或已关闭）的结果直接丢弃
+        if generation != self.generation:
+            return
+        scene = self.view.scene
+        scene.clear()
+        scene.add_chunk(chunk.ra_hours * 15, chunk.dec_deg, chunk.distance)
+
+    def on_errored(self, generation, message):
+        if generation == self.generation:
+            self.failed.emit(message)
+
+    def close(self):
+        self.view.view_changed.disconnect(self.refresh)
+        self.generation += 1
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        # 正在进行的查询结束后归还连接时由连接池关闭
+        self.store.close()
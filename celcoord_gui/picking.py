@@ -0,0 +1,44 @@
+# celcoord_gui/picking.py 屏幕空间网格索引，用于点选与悬停提示
+#
+# 把投影后的屏幕坐标按固定像素大小分桶，并按桶号排序存成 CSR 形式。
+# 查询时只检查鼠标所在格子及相邻格子，与点的总数无关。
+import numpy as np
+
+
+class ScreenGridIndex:
+    def __init__(self, xy, visible, width, height, cell=16):
+        self.cell = cell
+        self.nx = max(1, int(np.ceil(width / cell)))
+        self.ny = max(1, int(np.ceil(height / cell)))
+        inside = (visible & (xy[:, 0] >= 0) & (xy[:, 0] < width)
+                  & (xy[:, 1] >= 0) & (xy[:, 1] < height))
+        ids = np.flatnonzero(inside)
+        ix = (xy[ids, 0] // cell).astype(np.int64)
+        iy = (xy[ids, 1] // cell).astype(np.int64)
+        keys = iy * self.nx + ix
+        order = np.argsort(keys, kind='stable')
+        # 每个桶内点在 self.ids 中的区间为 [starts[k], starts[k+1])
+        self.ids = ids[order]
+        self.xy = xy[self.ids]
+        self.starts = np.zeros(self.nx * self.ny + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=self.nx * self.ny), out=self.starts[1:])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nearest(self, x, y, radius=6):
+        # 返回半径内最近点的原始下标，没有则返回 None
+        reach = int(np.ceil(radius / self.cell))
+        cx, cy = int(x // self.cell), int(y // self.cell)
+        best, best_d2 = None, radius * radius
+        for gy in range(max(0, cy - reach), min(self.ny, cy + reach + 1)):
+            row = gy * self.nx
+            lo = self.starts[row + max(0, cx - reach)]
+            hi = self.starts[row + min(self.nx, cx + reach + 1)]
+            if lo == hi:
+                continue
+            d2 = ((self.xy[lo:hi, 0] - x) ** 2 + (self.xy[lo:hi, 1] - y) ** 2)
+            k = int(np.argmin(d2))
+            if d2[k] <= best_d2:
+                best, best_d2 = int(self.ids[lo + k]), d2[k]
+        return best
@@ -0,0 +1,41 @@
+# celcoord_gui/startup.py 启动耗时分解
+#
+# 各阶段调用 mark() 记录时间点，finish() 在天球组件首帧之后输出报告。
+# 设置环境变量 CELCOORD_STARTUP_REPORT=1 或传入 --startup-report 参数时才打印。
+import os
+import sys
+import time
+
+_origin = time.perf_counter()
+_marks = []
+_enabled = os.environ.get('CELCOORD_STARTUP_REPORT') == '1'
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def mark(name):
+    _marks.append((name, time.perf_counter()))
+
+
+def breakdown():
+    # 返回 [(阶段名, 本阶段耗时毫秒, 累计毫秒)]
+    rows = []
+    last = _origin
+    for name, t in _marks:
+        rows.append((name, (t - last) * 1000, (t - _origin) * 1000))
+        last = t
+    return rows
+
+
+def finish(stream=None):
+    mark('天球组件首帧')
+    if not _enabled:
+        return
+    stream = stream or sys.stderr
+    stream.write("启动耗时分解（自入口模块开始）：\n")
+    for name, step, total in breakdown():
+        stream.write(f"  {name:<12} {step:8.1f} ms  累计 {total:8.1f} ms\n")
+    stream.flush()
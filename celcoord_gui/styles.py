@@ -1,4 +1,4 @@
-# styles.py
+# celcoord_gui/styles.py 界面外观配置
 MAIN_STYLESHEET = """
 QMainWindow {
     background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
@@ -79,4 +79,28 @@ QLabel {
     font-weight: semi-bold;
     color: #b0f0ff;  /* 比标题稍亮的青色 */
 }
+
+/* 以下规则原先由各控件单独 setStyleSheet 设置，合并到这里以减少启动时的样式解析 */
+QGroupBox {
+    font-weight: bold;
+}
+
+QSpinBox, QDoubleSpinBox {
+    padding: 5px;
+    background: white;
+}
+
+QPushButton#toCartesianBtn, QPushButton#toSphericalBtn {
+    color: white;
+    border: none;
+    padding: 8px 15px;
+    border-radius: 4px;
+    font-weight: bold;
+}
+QPushButton#toCartesianBtn, QPushButton#toCartesianBtn:hover {
+    background-color: #4CAF50;
+}
+QPushButton#toSphericalBtn, QPushButton#toSphericalBtn:hover {
+    background-color: #2196F3;
+}
 """
\ No newline at end of file
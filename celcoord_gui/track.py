@@ -0,0 +1,103 @@
+# celcoord_gui/track.py 天球上的轨迹图层（跟踪目标的路径、赤道仪实时位置等）
+#
+# 位置按 (x, y, z, 时间) 写入固定容量的环形缓冲区。已画出的折线缓存在一张图层图像上，
+# 每帧只把新增的线段画到图层上，每次更新的代价与新增点数成正比，与轨迹总长度无关。
+# 缓冲区写满后最旧的点被覆盖，但图层上已画的线段无法单独擦除：允许图层上多保留
+# 至多 REBUILD_SLACK * capacity 个已被覆盖的点，超过后整体重画一次，重画的代价
+# 摊到此前的更新上仍是常数。视角变化时图层失效；拖动期间直接绘制，不更新图层。
+import time
+import numpy as np
+from PyQt5.QtGui import QColor, QImage, QPainter, QPen
+from PyQt5.QtCore import Qt, QPointF
+from celcoord.ringbuffer import RingBuffer
+from .widget import array_to_polygon
+
+DEFAULT_TRACK_CAPACITY = 10000
+
+
+class TrackLayer:
+    # 图层上允许残留的已覆盖点数占容量的比例
+    REBUILD_SLACK = 0.25
+
+    def __init__(self, capacity=DEFAULT_TRACK_CAPACITY, color=QColor(255, 120, 200), width=1.5):
+        self.points = RingBuffer(capacity, 4)
+        self.pen = QPen(color, width)
+        self.pen.setCapStyle(Qt.RoundCap)
+        self.color = color
+        # 图层缓存：(视图键, 图像)，以及图层上已画到的序号和图层上最旧点的序号
+        self.layer = None
+        self.drawn = 0
+        self.layer_start = 0
+
+    def __len__(self):
+        return len(self.points)
+
+    def append(self, ra_deg, dec_deg, t=None):
+        """追加一个或一批位置（赤经、赤纬均为度），t 为时间戳，默认取当前时间"""
+        ra_rad = np.radians(np.atleast_1d(np.asarray(ra_deg, dtype=np.float64)))
+        dec_rad = np.radians(np.atleast_1d(np.asarray(dec_deg, dtype=np.float64)))
+        if t is None:
+            t = time.time()
+        cos_dec = np.cos(dec_rad)
+        self.points.append(np.column_stack(np.broadcast_arrays(
+            cos_dec * np.cos(ra_rad), cos_dec * np.sin(ra_rad), np.sin(dec_rad), t)))
+
+    def clear(self):
+        self.points.clear()
+        self.layer = None
+
+    def times(self):
+        return self.points.slice()[:, 3]
+
+    def draw(self, painter, widget, direct=False):
+        if not len(self.points):
+            return
+        if direct:
+            self.draw_segments(painter, widget, self.points.start)
+        else:
+            painter.drawImage(0, 0, self.update_layer(painter, widget))
+        head = self.points.last()
+        xy, visible = widget.project_array(head[None, :3])
+        if visible[0]:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self.color)
+            painter.drawEllipse(QPointF(*xy[0]), 3.5, 3.5)
+
+    def update_layer(self, painter, widget):
+        ratio = painter.device().devicePixelRatioF()
+        key = (widget.projection_key(), ratio)
+        points = self.points
+        stale = (self.layer is None or self.layer[0] != key
+                 or self.drawn > points.total or self.drawn <= points.start
+                 or points.start - self.layer_start > self.REBUILD_SLACK * points.capacity)
+        if stale:
+            image = QImage(int(widget.width() * ratio), int(widget.height() * ratio),
+                           QImage.Format_ARGB32_Premultiplied)
+            image.setDevicePixelRatio(ratio)
+            image.fill(Qt.transparent)
+            self.layer = (key, image)
+            self.layer_start = start = points.start
+        elif self.drawn < points.total:
+            # 从上次画到的最后一点接着画，保持折线连续
+            start = self.drawn - 1
+        else:
+            return self.layer[1]
+        layer_painter = QPainter(self.layer[1])
+        layer_painter.setRenderHint(QPainter.Antialiasing)
+        self.draw_segments(layer_painter, widget, start)
+        layer_painter.end()
+        self.drawn = points.total
+        return self.layer[1]
+
+    def draw_segments(self, painter, widget, start):
+        xyz = self.points.slice(start)[:, :3]
+        if len(xyz) < 2:
+            return
+        xy, visible = widget.project_array(xyz)
+        painter.setPen(self.pen)
+        painter.setBrush(Qt.NoBrush)
+        # 按可见性切成连续的段，每段一条折线
+        edges = np.flatnonzero(np.diff(visible.astype(np.int8))) + 1
+        for run_start, run_stop in zip(np.r_[0, edges], np.r_[edges, len(xy)]):
+            if visible[run_start] and run_stop - run_start >= 2:
+                painter.drawPolyline(array_to_polygon(xy[run_start:run_stop]))
@@ -0,0 +1,549 @@
+# celcoord_gui/widget.py 3D天球可视化组件
+from PyQt5.QtWidgets import QWidget, QToolTip
+from PyQt5.QtGui import (QPainter, QColor, QPen, QVector3D, QMatrix4x4, QFont, QPolygonF,
+                         QImage)
+from PyQt5.QtCore import Qt, QPoint, QPointF, pyqtSignal
+from PyQt5 import sip
+import math
+from collections import OrderedDict
+import numpy as np
+from celcoord import metrics
+from celcoord.coords import hours_to_hms, deg_to_dms
+from celcoord.frames import frame_matrix
+from celcoord.projection import project_points
+from celcoord.scene import SceneStore
+from .picking import ScreenGridIndex
+
+# 星表预览最多绘制的点数，超出时按步长抽样
+MAX_PREVIEW_POINTS = 200000
+
+# 静态网格图层缓存：同一进程内视图参数相同的组件共用，离屏批量渲染时可跨任务复用
+GRID_LAYER_CACHE_SIZE = 16
+_grid_layers = OrderedDict()
+
+# 密度图配色：(位置, R, G, B, A)，按归一化密度线性插值
+DENSITY_COLORMAP = np.array([
+    (0.0, 20, 40, 110, 90),
+    (0.35, 40, 120, 200, 150),
+    (0.7, 250, 200, 80, 200),
+    (1.0, 255, 255, 230, 230),
+])
+
+
+def density_colors(counts, scale):
+    # 把计数映射成 (N, 4) RGBA；scale 为 'linear' 或 'log'
+    counts = counts.astype(np.float64)
+    top = counts.max() if len(counts) else 0
+    if top <= 0:
+        return np.zeros((len(counts), 4), dtype=np.uint8)
+    if scale == 'log':
+        value = np.log1p(counts) / np.log1p(top)
+    else:
+        value = counts / top
+    stops = DENSITY_COLORMAP[:, 0]
+    return np.column_stack([np.interp(value, stops, DENSITY_COLORMAP[:, i])
+                            for i in range(1, 5)]).astype(np.uint8)
+
+
+def array_to_polygon(xy):
+    # 直接把 (N, 2) float64 数组拷贝进 QPolygonF 的内存，避免逐点构造 QPointF
+    polygon = QPolygonF()
+    polygon.fill(QPointF(), len(xy))
+    ptr = polygon.data()
+    ptr.setsize(len(xy) * 2 * 8)
+    np.frombuffer(ptr, dtype=np.float64).reshape(-1, 2)[:] = xy
+    return polygon
+
+
+class CelestialSphereWidget(QWidget):
+    # 点选星表中的天体：赤经(时), 赤纬(度), 距离(pc)
+    object_picked = pyqtSignal(float, float, float)
+    # 拖动结束、视角已变化
+    view_changed = pyqtSignal()
+
+    # 点选/悬停的判定半径（像素）
+    PICK_RADIUS = 6
+
+    # 相机位于 z=5 看单位球：球面法向 n 满足 (Rn)_z > 1/5 的部分朝向观察者
+    HORIZON_COS = 0.2
+
+    # 各参考架下的赤道、北极、南极标注
+    FRAME_LABELS = {
+        'equatorial': ("赤道", "北极", "南极"),
+        'galactic': ("银道", "银北极", "银南极"),
+    }
+
+    def __init__(self, parent=None, scene=None, frame='equatorial'):
+        super().__init__(parent)
+        self.source_point = None
+        self.target_point = None
+        # 启用窗口透明
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        # 设置窗口大小
+        self.setMinimumSize(600, 500)
+        # 初始化旋转角度：北极朝上，赤道水平
+        self.x_rotation = 0   # 绕X轴的旋转（俯仰角）
+        self.y_rotation = 0   # 绕Y轴的旋转（自转角度）
+        self.dragging = False
+        self.last_pos = QPoint()
+        # 批量转换的星表预览放在场景中，多个视图可共用同一个场景，
+        # 本组件只保存自己的投影结果；frame 为显示所用的参考架
+        self.scene = scene if scene is not None else SceneStore()
+        self.scene.subscribe(self.on_scene_changed)
+        frame_matrix(frame)
+        self.frame = frame
+        # 逐点绘制只投影抽样后的点（最多 MAX_PREVIEW_POINTS 个），缓存成多边形
+        self.catalog_polygon = None
+        # 点选用的屏幕网格索引：只在悬停或点选时投影全部天体并建立，
+        # 视角或星表变化后在下次查询时重建；只保留屏幕内、朝向观察者一侧的点
+        self.pick_cache = None
+        self.setMouseTracking(True)
+        # 星表显示方式：'points' 为逐点绘制，'density' 为天区密度图
+        self.catalog_display = 'points'
+        self.density_scale = 'linear'
+        # 密度图缓存：投影后的网格随视角失效，渲染结果随视角/配色/计数失效
+        self.density_geometry = None
+        self.density_image = None
+        # 轨迹图层：名称 -> TrackLayer，按添加顺序绘制
+        self.tracks = {}
+
+    def set_points(self, src_ra, src_dec, tgt_ra=None, tgt_dec=None):
+        self.source_point = self.spherical_to_cartesian(src_ra, src_dec)
+        self.target_point = self.spherical_to_cartesian(tgt_ra, tgt_dec) if tgt_ra else None
+        self.update()
+
+    def set_frame(self, frame):
+        frame_matrix(frame)
+        self.frame = frame
+        self.update()
+
+    def on_scene_changed(self):
+        # 视图已被 Qt 销毁但 Python 对象仍在时跳过
+        if not sip.isdeleted(self):
+            self.update()
+
+    @property
+    def density_map(self):
+        return self.scene.density_map
+
+    @property
+    def catalog_revision(self):
+        return self.scene.revision
+
+    def spherical_to_cartesian(self, ra, dec, radius=1.0):
+        ra_rad = math.radians(ra)
+        dec_rad = math.radians(dec)
+        x = radius * math.cos(dec_rad) * math.cos(ra_rad)
+        y = radius * math.cos(dec_rad) * math.sin(ra_rad)
+        z = radius * math.sin(dec_rad)
+        return QVector3D(x, y, z)
+
+    def add_catalog_chunk(self, ra_deg, dec_deg, distance=None):
+        # 场景变化后会通知所有共用该场景的视图重绘
+        self.scene.add_chunk(ra_deg, dec_deg, distance)
+
+    def clear_catalog(self):
+        self.scene.clear()
+
+    def add_track(self, name, capacity=None, color=None):
+        # 已存在同名轨迹时直接返回原图层
+        if name not in self.tracks:
+            from .track import TrackLayer, DEFAULT_TRACK_CAPACITY
+            kwargs = {'capacity': capacity or DEFAULT_TRACK_CAPACITY}
+            if color is not None:
+                kwargs['color'] = QColor(color)
+            self.tracks[name] = TrackLayer(**kwargs)
+        return self.tracks[name]
+
+    def append_track(self, name, ra_deg, dec_deg, t=None):
+        # 向轨迹追加一个或一批位置（度），轨迹不存在时按默认参数创建
+        self.add_track(name).append(ra_deg, dec_deg, t)
+        self.update()
+
+    def remove_track(self, name):
+        if self.tracks.pop(name, None) is not None:
+            self.update()
+
+    def set_catalog_display(self, mode, scale=None):
+        self.catalog_display = mode
+        if scale is not None:
+            self.density_scale = scale
+        self.update()
+
+    def catalog_vectors(self):
+        return self.scene.vectors()
+
+    def pick_index(self):
+        key = (self.projection_key(), self.scene.revision)
+        hit = self.pick_cache is not None and self.pick_cache[0] == key
+        if metrics.enabled:
+            metrics.cache('pick_index', hit)
+        if not hit:
+            vectors = self.catalog_vectors()
+            xy, visible = self.project_array(vectors)
+            # 背面半球的点投影后与正面的点落在同一片屏幕区域，不能参与点选
+            visible &= self.facing(vectors)
+            self.pick_cache = (key, ScreenGridIndex(xy, visible, self.width(), self.height()))
+        return self.pick_cache[1]
+
+    def pick(self, pos):
+        # 返回鼠标位置附近天体的 (赤经(时), 赤纬(度), 距离)，没有则返回 None
+        if not len(self.scene) or self.catalog_display != 'points':
+            return None
+        i = self.pick_index().nearest(pos.x(), pos.y(), self.PICK_RADIUS)
+        if i is None:
+            return None
+        ra_hours, dec_deg = self.scene.lonlat(i)
+        return ra_hours, dec_deg, float(self.scene.distances()[i])
+
+    def view_matrix(self):
+        view = QMatrix4x4()
+        view.perspective(30, self.width()/self.height(), 0.1, 100.0)
+        view.translate(0, 0, -5)
+        
+        # 先绕Y轴旋转（自转），再绕X轴旋转（俯仰）
+        view.rotate(self.y_rotation, 0, 1, 0)  # Y轴旋转
+        view.rotate(self.x_rotation, 1, 0, 0)  # X轴旋转
+        return view
+
+    def view_key(self):
+        # 决定投影结果的全部视图参数，用作各类投影缓存的键
+        return (self.x_rotation, self.y_rotation, self.width(), self.height())
+
+    def projection_key(self):
+        # 星表、轨迹等赤道坐标数据的投影还取决于参考架
+        return self.view_key() + (self.frame,)
+
+    def data_matrix(self):
+        # 赤道坐标数据的投影矩阵：先旋转到本视图的参考架，再做视图投影
+        rotation = np.eye(4)
+        rotation[:3, :3] = frame_matrix(self.frame)
+        return self.view_matrix() * QMatrix4x4(*rotation.ravel())
+
+    def rotation_matrix(self):
+        # 视图中的旋转部分（3x3），用于判断球面朝向观察者的一侧
+        rotation = QMatrix4x4()
+        rotation.rotate(self.y_rotation, 0, 1, 0)
+        rotation.rotate(self.x_rotation, 1, 0, 0)
+        return np.array(rotation.copyDataTo(), dtype=np.float64).reshape(4, 4)[:3, :3]
+
+    def toward_viewer(self):
+        # 视图空间 +z（指向观察者）在赤道坐标中的单位向量
+        return (self.rotation_matrix() @ frame_matrix(self.frame))[2]
+
+    def facing(self, vectors):
+        # 赤道坐标单位向量 (N, 3) 中位于球面朝向观察者一侧的掩码（见 HORIZON_COS）
+        return vectors @ self.toward_viewer() > self.HORIZON_COS
+
+    def visible_cone(self):
+        # 朝向观察者的球冠：(中心在赤道坐标中的单位向量, 角半径(度))
+        return self.toward_viewer(), math.degrees(math.acos(self.HORIZON_COS))
+
+    def project_array(self, xyz):
+        # project_point 的向量化版本，返回屏幕坐标 (N, 2) 与可见掩码
+        matrix = np.array(self.data_matrix().copyDataTo(), dtype=np.float64).reshape(4, 4)
+        return project_points(xyz, matrix, self.width(), self.height())
+
+    def project_point(self, point, matrix=None):
+        projected = (self.view_matrix() if matrix is None else matrix).map(point)
+        if projected.z() <= 0:
+            return None
+            
+        x = (projected.x() + 1) * self.width() / 2
+        y = (1 - projected.y()) * self.height() / 2
+        return QPoint(int(x), int(y))
+    
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        self.paint(painter)
+
+    def paint(self, painter):
+        # 绘制整个场景；painter 可以是窗口，也可以是离屏的 QImage
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.fillRect(self.rect(), QColor(25, 30, 45))
+        
+        # 密度图画在网格下面
+        if self.catalog_display == 'density':
+            self.draw_density(painter)
+
+        # 绘制网格系统：拖动时视角每帧都变，直接绘制，否则使用缓存图层
+        if self.dragging:
+            self.draw_grid(painter)
+        else:
+            self.draw_grid_layer(painter)
+
+        # 绘制星表预览
+        if self.catalog_display == 'points':
+            self.draw_catalog(painter)
+
+        # 绘制轨迹：拖动时直接绘制，否则只把新增线段画到各自的缓存图层上
+        for track in self.tracks.values():
+            track.draw(painter, self, direct=self.dragging)
+        
+        # 绘制坐标点
+        if self.source_point:
+            self.draw_point(painter, self.source_point, Qt.red)
+        if self.target_point:
+            self.draw_point(painter, self.target_point, QColor(0, 255, 255))
+
+        # 添加标注
+        self.draw_labels(painter)
+
+    def draw_grid(self, painter):
+        # 绘制特殊经线（中央子午线）
+        self.draw_longitude(painter, 0, QColor(0, 255, 0), 2)  # 绿色
+        self.draw_longitude(painter, 180, QColor(0, 255, 0), 2) # 绿色
+
+        # 绘制其他经线
+        for ra in range(30, 360, 30):
+            self.draw_longitude(painter, ra, QColor(80, 100, 120), 1)
+
+        # 绘制特殊纬线（赤道）
+        self.draw_latitude(painter, 0, QColor(0, 255, 255), 3)  # 青色
+        
+        # 绘制其他纬线
+        for dec in list(range(-60, 0, 30)) + list(range(30, 90, 30)):
+            self.draw_latitude(painter, dec, QColor(100, 150, 200), 1)
+
+        # 绘制坐标系轴
+        self.draw_coordinate_axes(painter)
+
+    def draw_grid_layer(self, painter):
+        ratio = painter.device().devicePixelRatioF()
+        key = (self.view_key(), ratio)
+        layer = _grid_layers.get(key)
+        if metrics.enabled:
+            metrics.cache('grid_layer', layer is not None)
+        if layer is None:
+            layer = QImage(int(self.width() * ratio), int(self.height() * ratio),
+                           QImage.Format_ARGB32_Premultiplied)
+            layer.setDevicePixelRatio(ratio)
+            layer.fill(Qt.transparent)
+            layer_painter = QPainter(layer)
+            layer_painter.setRenderHint(QPainter.Antialiasing)
+            layer_painter.setFont(painter.font())
+            self.draw_grid(layer_painter)
+            layer_painter.end()
+            _grid_layers[key] = layer
+            if len(_grid_layers) > GRID_LAYER_CACHE_SIZE:
+                _grid_layers.popitem(last=False)
+        else:
+            _grid_layers.move_to_end(key)
+        painter.drawImage(0, 0, layer)
+
+    def draw_coordinate_axes(self, painter):
+        # 定义坐标轴参数
+        axis_length = 1.2  # 轴长度
+        axis_width = 3      # 线宽
+                
+        # 绘制X轴（春分点方向，红色）
+        x_end = self.spherical_to_cartesian(0, 0, axis_length)
+        self.draw_axis(painter, QVector3D(0, 0, 0), x_end, Qt.red, "X轴", axis_width)
+        
+        # 绘制Y轴（右手系方向，绿色）
+        y_end = self.spherical_to_cartesian(90, 0, axis_length)  # 赤经6小时=90度
+        self.draw_axis(painter, QVector3D(0, 0, 0), y_end, Qt.green, "Y轴", axis_width)
+        
+        # 绘制Z轴（天北极方向，蓝色）
+        z_end = self.spherical_to_cartesian(0, 90, axis_length)
+        self.draw_axis(painter, QVector3D(0, 0, 0), z_end, Qt.blue, "Z轴", axis_width)
+
+    def draw_axis(self, painter, start, end, color, label, width=2):
+        # 绘制轴线
+        pen = QPen(color)
+        pen.setWidth(width)
+        painter.setPen(pen)
+        
+        start_p = self.project_point(start)
+        end_p = self.project_point(end)
+        if start_p and end_p:
+            # 计算二维投影后的实际方向
+            dx = end_p.x() - start_p.x()
+            dy = end_p.y() - start_p.y()
+            angle = math.atan2(dy, dx)
+            
+            # 绘制箭头
+            arrow_size = 12
+            p1 = end_p + QPoint(
+                int(arrow_size * math.cos(angle + math.pi/6)),
+                int(arrow_size * math.sin(angle + math.pi/6))
+            )
+            p2 = end_p + QPoint(
+                int(arrow_size * math.cos(angle - math.pi/6)),
+                int(arrow_size * math.sin(angle - math.pi/6))
+            )
+            
+            # 绘制带箭头的线（从地心指向外）
+            painter.drawLine(start_p, end_p)
+            painter.drawLine(end_p, p1)
+            painter.drawLine(end_p, p2)
+            
+            # 标签位置调整
+            label_offset = QPoint(
+                int(20 * math.cos(angle)),
+                int(20 * math.sin(angle)))
+            painter.drawText(end_p + label_offset, label)
+
+    def draw_labels(self, painter):
+        # 设置字体样式
+        font = QFont('Arial', 10)
+        painter.setFont(font)
+        equator, north, south = self.FRAME_LABELS[self.frame]
+        
+        # 赤道标注（多个位置）
+        for ra in [180]:
+            pos = self.project_point(self.spherical_to_cartesian(ra, 0))
+            if pos:
+                painter.setPen(QColor(0, 255, 255))
+                painter.drawText(pos.x()+5, pos.y()-5, equator)
+
+        # 极地标注
+        north_pos = self.project_point(self.spherical_to_cartesian(0, 85))
+        if north_pos:
+            painter.setPen(Qt.white)
+            painter.drawText(north_pos, north)
+        
+        south_pos = self.project_point(self.spherical_to_cartesian(0, -85))
+        if south_pos:
+            painter.setPen(Qt.white)
+            painter.drawText(south_pos.x(), south_pos.y() + 20, south)
+        
+        # 中央子午线标注（多个纬度）
+        for dec in [-45]:
+            pos = self.project_point(self.spherical_to_cartesian(0, dec))
+            if pos:
+                painter.setPen(QColor(0, 255, 0))
+                painter.drawText(pos.x()+5, pos.y()+5, "中央子午线")
+
+    def draw_longitude(self, painter, ra, color, width=1):
+        pen = QPen(color)
+        pen.setWidth(width)
+        painter.setPen(pen)
+        
+        points = []
+        for dec in range(-90, 91, 2):
+            point = self.spherical_to_cartesian(ra, dec)
+            screen_point = self.project_point(point)
+            if screen_point:
+                points.append(screen_point)
+        if points:
+            painter.drawPolyline(*points)
+
+    def draw_latitude(self, painter, dec, color, width=1):
+        pen = QPen(color)
+        pen.setWidth(width)
+        painter.setPen(pen)
+        
+        points = []
+        for ra in range(0, 361, 3):
+            point = self.spherical_to_cartesian(ra, dec)
+            screen_point = self.project_point(point)
+            if screen_point:
+                points.append(screen_point)
+        if points:
+            painter.drawPolyline(*points)
+
+    def draw_catalog(self, painter):
+        xyz = self.catalog_vectors()
+        if not len(xyz):
+            return
+        step = max(1, len(xyz) // MAX_PREVIEW_POINTS)
+        painter.setPen(QPen(QColor(255, 220, 120), 1))
+        if self.dragging:
+            # 拖动时视角每帧都变，不写缓存
+            xy, visible = self.project_array(xyz[::step])
+            painter.drawPoints(array_to_polygon(xy[visible]))
+            return
+        key = (self.projection_key(), self.scene.revision)
+        hit = self.catalog_polygon is not None and self.catalog_polygon[0] == key
+        if metrics.enabled:
+            metrics.cache('catalog_polygon', hit)
+        if not hit:
+            xy, visible = self.project_array(xyz[::step])
+            self.catalog_polygon = (key, array_to_polygon(xy[visible]))
+        painter.drawPoints(self.catalog_polygon[1])
+
+    def draw_density(self, painter):
+        key = (self.projection_key(), self.density_scale, self.density_map.revision)
+        hit = self.density_image is not None and self.density_image[0] == key
+        if metrics.enabled:
+            metrics.cache('density_image', hit)
+        if not hit:
+            self.density_image = (key, self.render_density())
+        painter.drawImage(0, 0, self.density_image[1])
+
+    def density_polygons(self):
+        # 只投影朝向观察者的格子（见 HORIZON_COS）
+        key = self.projection_key()
+        if self.density_geometry is None or self.density_geometry[0] != key:
+            cells = np.flatnonzero(self.facing(self.density_map.cell_centers()))
+            quads, _ = self.project_array(
+                self.density_map.cell_vertices()[cells].reshape(-1, 3))
+            polygons = [array_to_polygon(quad) for quad in quads.reshape(-1, 4, 2)]
+            self.density_geometry = (key, cells, polygons)
+        return self.density_geometry[1], self.density_geometry[2]
+
+    def render_density(self):
+        image = QImage(self.width(), self.height(), QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        cells, polygons = self.density_polygons()
+        counts = self.density_map.counts
+        colors = density_colors(counts, self.density_scale)[cells].tolist()
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        for cell, rgba, polygon in zip(cells, colors, polygons):
+            if counts[cell]:
+                painter.setBrush(QColor(*rgba))
+                painter.drawPolygon(polygon)
+        painter.end()
+        return image
+
+    def draw_point(self, painter, point, color):
+        screen_point = self.project_point(point, self.data_matrix())
+        if screen_point:
+            painter.setPen(QPen(color, 2))
+            painter.setBrush(color)
+            painter.drawEllipse(screen_point, 6, 6)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            picked = self.pick(event.pos())
+            if picked:
+                self.object_picked.emit(*picked)
+            self.dragging = True
+            self.last_pos = event.pos()
+
+    def mouseMoveEvent(self, event):
+        if not self.dragging:
+            # 悬停提示与点选共用同一个索引
+            picked = self.pick(event.pos())
+            if picked:
+                ra_h, ra_m, ra_s = hours_to_hms(picked[0], 2)
+                dec_d, dec_m, dec_s, sign = deg_to_dms(picked[1], 1)
+                QToolTip.showText(
+                    event.globalPos(),
+                    f"RA {ra_h}h {ra_m}m {ra_s:.2f}s\n"
+                    f"Dec {'+' if sign > 0 else '-'}{dec_d}° {dec_m}' {dec_s:.1f}\"\n"
+                    f"{picked[2]:.3f} pc", self)
+            else:
+                QToolTip.hideText()
+        else:
+            delta = event.pos() - self.last_pos
+            
+            # 水平拖动：绕Y轴旋转（地轴自转）
+            self.y_rotation += delta.x() * 0.5
+            
+            # 垂直拖动：绕X轴旋转（视角俯仰）
+            self.x_rotation -= delta.y() * 0.5
+            
+            # 限制俯仰角度在[-90, 90]范围内
+            self.x_rotation = max(-90, min(90, self.x_rotation))
+            
+            self.last_pos = event.pos()
+            self.update()
+
+    def mouseReleaseEvent(self, event):
+        if self.dragging:
+            self.dragging = False
+            self.view_changed.emit()
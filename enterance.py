@@ -1,10 +1,6 @@
 # enterance.py 程序入口
 import sys
-from PyQt5.QtWidgets import QApplication
-from main_window import CoordinateConverter
+from celcoord_gui.app import main
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    ex = CoordinateConverter()
-    ex.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# tests/test_backends.py numpy 与 numba 后端的结果逐位一致
+import numpy as np
+import pytest
+from celcoord import backends
+from celcoord.batch import hours_to_hms_batch, deg_to_dms_batch, cartesian_to_spherical_batch
+from celcoord.density import SkyDensityMap
+from celcoord.projection import project_points
+
+pytestmark = pytest.mark.skipif('numba' not in backends.available_backends(),
+                                reason="需要安装 numba")
+
+
+def run_both(func, *args, **kwargs):
+    results = []
+    for name in ('numpy', 'numba'):
+        with backends.using(name):
+            result = func(*args, **kwargs)
+        results.append(result if isinstance(result, tuple) else (result,))
+    return results
+
+
+def assert_identical(results):
+    expected, actual = results
+    assert len(expected) == len(actual)
+    for a, b in zip(expected, actual):
+        a, b = np.asarray(a), np.asarray(b)
+        assert a.dtype == b.dtype
+        assert a.shape == b.shape
+        # 逐位比较，连 -0.0 与 0.0 的区别也算不一致
+        assert np.array_equal(a.view(np.uint8), b.view(np.uint8))
+
+
+def sexagesimal_inputs(limit):
+    rng = np.random.default_rng(0)
+    # 取整后秒、分进位的边界值：59.9996 秒、59 分 59.9996 秒以及接近 0 的负数
+    edges = np.array([0.0, -0.0, 1e-18, -1e-18, 23 + 59 / 60 + 59.9996 / 3600,
+                      12 + 59.9996 / 3600, 5 + 59 / 60 + 59.99996 / 3600,
+                      -(7 + 59 / 60 + 59.9996 / 3600), limit - 1e-12, -limit + 1e-12])
+    return np.concatenate([edges, rng.uniform(-limit, limit, 10000)])
+
+
+@pytest.mark.parametrize('decimals', [None, 0, 2, 3])
+def test_hours_to_hms(decimals):
+    assert_identical(run_both(hours_to_hms_batch, sexagesimal_inputs(48), decimals))
+
+
+@pytest.mark.parametrize('decimals', [None, 0, 1, 3])
+def test_deg_to_dms(decimals):
+    assert_identical(run_both(deg_to_dms_batch, sexagesimal_inputs(90), decimals))
+
+
+def test_sexagesimal_carry():
+    with backends.using('numba'):
+        h, m, s = hours_to_hms_batch(np.array([23 + 59 / 60 + 59.9996 / 3600]), 3)
+        d, dm, ds, sign = deg_to_dms_batch(np.array([-(7 + 59 / 60 + 59.9996 / 3600)]), 3)
+    assert (h[0], m[0], s[0]) == (0, 0, 0.0)
+    assert (d[0], dm[0], ds[0], sign[0]) == (8, 0, 0.0, -1)
+
+
+def test_cartesian_to_spherical():
+    rng = np.random.default_rng(1)
+    xyz = rng.normal(size=(3, 10000)) * rng.uniform(1e-3, 1e3, 10000)
+    # r == 0 的行与坐标轴上的点
+    xyz[:, :4] = 0.0
+    xyz[:, 4:10] = np.array([[1, -1, 0, 0, 0, 0], [0, 0, 1, -1, 0, 0], [0, 0, 0, 0, 1, -1]])
+    results = run_both(cartesian_to_spherical_batch, *xyz)
+    assert_identical(results)
+    ra, dec, r = results[1]
+    assert (ra[:4] == 0).all() and (dec[:4] == 0).all() and (r[:4] == 0).all()
+
+
+def test_density_add():
+    rng = np.random.default_rng(2)
+    ra = np.concatenate([[0.0, 360.0, -1e-12, 359.999999], rng.uniform(-720, 720, 20000)])
+    dec = np.concatenate([[90.0, -90.0, 0.0, -0.0], rng.uniform(-90, 90, 20000)])
+    counts = []
+    for name in ('numpy', 'numba'):
+        density = SkyDensityMap()
+        with backends.using(name):
+            density.add(ra, dec)
+            density.add(ra[:100], dec[:100])
+        counts.append(density.counts)
+    np.testing.assert_array_equal(counts[0], counts[1])
+    assert counts[0].sum() == len(ra) + 100
+
+
+def test_project_points():
+    rng = np.random.default_rng(3)
+    xyz = rng.normal(size=(20000, 3))
+    xyz /= np.linalg.norm(xyz, axis=1)[:, None]
+    # 一个透视投影矩阵，相机位于原点附近看向 -z
+    matrix = np.array([[1.2, 0.0, 0.1, 0.0],
+                       [0.0, 1.6, -0.2, 0.0],
+                       [0.0, 0.0, -1.0002, -0.02],
+                       [0.0, 0.0, -1.0, 0.05]])
+    results = run_both(project_points, xyz, matrix, 800, 600)
+    assert_identical(results)
+    xy, visible = results[0]
+    # 可见只表示在相机前方，屏幕外的点同样带有坐标，供跨屏幕边缘的折线使用
+    outside = (xy[:, 0] < 0) | (xy[:, 0] >= 800) | (xy[:, 1] < 0) | (xy[:, 1] >= 600)
+    assert (visible & outside).any()
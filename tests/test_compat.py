@@ -0,0 +1,25 @@
+# tests/test_compat.py 旧导入路径 celestial_coords 仍提供原来的公开函数
+import math
+import numpy as np
+import pytest
+
+OLD_NAMES = ('hms_to_hours', 'hours_to_hms', 'dms_to_deg', 'deg_to_dms',
+             'spherical_to_cartesian', 'cartesian_to_spherical',
+             'spherical_to_cartesian_batch', 'cartesian_to_spherical_batch')
+
+
+@pytest.mark.parametrize('name', OLD_NAMES)
+def test_old_names_importable(name):
+    import celestial_coords
+    assert callable(getattr(celestial_coords, name))
+
+
+def test_old_functions_agree():
+    from celestial_coords import (spherical_to_cartesian, cartesian_to_spherical,
+                                  spherical_to_cartesian_batch, cartesian_to_spherical_batch)
+    x, y, z = spherical_to_cartesian(5.5, -5.39, 412)
+    bx, by, bz = spherical_to_cartesian_batch(np.array([5.5]), np.array([-5.39]),
+                                              np.array([412.0]))
+    assert math.isclose(x, bx[0], rel_tol=1e-12) and math.isclose(z, bz[0], rel_tol=1e-12)
+    ra, dec, r = cartesian_to_spherical_batch(bx, by, bz)
+    assert np.allclose([ra[0], dec[0], r[0]], cartesian_to_spherical(x, y, z), rtol=1e-12)
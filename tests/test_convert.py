@@ -0,0 +1,46 @@
+# tests/test_convert.py convert 子命令对 --region / --keep 的检查
+import pytest
+from celcoord import arrow_io
+from celcoord.__main__ import main
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / 'in.csv'
+    path.write_text('ra,dec,distance\n1,10,5\n2,20,6\n23.5,-5,7\n')
+    return path
+
+
+@pytest.mark.parametrize('region', ['1,2,3', '1,2,3,4,5', 'a,b,c,d', ''])
+def test_bad_region_is_a_usage_error(catalog, region, capsys):
+    with pytest.raises(SystemExit) as exc:
+        main(['convert', str(catalog), '--region', region])
+    assert exc.value.code == 2
+    assert '--region' in capsys.readouterr().err
+
+
+def test_keep_needs_parquet_input(catalog, tmp_path, capsys):
+    assert main(['convert', str(catalog), '-o', str(tmp_path / 'out.csv'),
+                 '--keep', 'mag']) == 2
+    err = capsys.readouterr().err
+    assert 'Traceback' not in err and err.strip()
+    assert not (tmp_path / 'out.csv').exists()
+
+
+def test_keep_missing_column(catalog, tmp_path, capsys):
+    if not arrow_io.available():
+        pytest.skip("需要安装 pyarrow")
+    source = tmp_path / 'in.parquet'
+    assert main(['convert', str(catalog), '-o', str(source)]) == 0
+    assert main(['convert', str(source), '-o', str(tmp_path / 'out.arrow'),
+                 '--keep', 'mag']) == 2
+    assert 'mag' in capsys.readouterr().err
+
+
+def test_region_filters_csv(catalog, tmp_path):
+    output = tmp_path / 'out.csv'
+    # 跨过 0 时的天区：23h 到 1.5h
+    assert main(['convert', str(catalog), '-o', str(output), '--region', '23,1.5,-10,15']) == 0
+    lines = output.read_text().splitlines()
+    assert len(lines) == 3
+    assert [float(line.split(',')[0]) for line in lines[1:]] == [1.0, 23.5]
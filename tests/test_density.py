@@ -0,0 +1,52 @@
+# tests/test_density.py 天区分格计数
+import numpy as np
+import pytest
+from celcoord import backends
+from celcoord.density import SkyDensityMap
+
+
+def sky_points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    # 边界：赤经 0/360 与负数、天极、赤道两侧
+    ra = np.concatenate([[0.0, 360.0, -1e-12, 359.999999, -30.0, 725.0],
+                         rng.uniform(0, 360, n)])
+    dec = np.concatenate([[90.0, -90.0, 0.0, -0.0, 89.9999, -89.9999],
+                          np.degrees(np.arcsin(rng.uniform(-1, 1, n)))])
+    return ra, dec
+
+
+@pytest.mark.parametrize('backend', backends.available_backends())
+def test_counts_add_up_to_n(backend):
+    ra, dec = sky_points(50000)
+    density = SkyDensityMap(24, 12)
+    with backends.using(backend):
+        # 分几块累加，与一次加入的结果相同
+        for part in np.array_split(np.arange(len(ra)), 7):
+            density.add(ra[part], dec[part])
+    assert density.counts.sum() == len(ra)
+    assert (density.counts >= 0).all()
+    once = SkyDensityMap(24, 12)
+    once.add(ra, dec)
+    np.testing.assert_array_equal(density.counts, once.counts)
+
+
+def test_vectors_binned_like_angles():
+    ra, dec = sky_points(5000, seed=1)
+    by_angle, by_vector = SkyDensityMap(), SkyDensityMap()
+    by_angle.add(ra, dec)
+    ra_rad, dec_rad = np.radians(ra), np.radians(dec)
+    by_vector.add_vectors(np.column_stack((np.cos(dec_rad) * np.cos(ra_rad),
+                                           np.cos(dec_rad) * np.sin(ra_rad), np.sin(dec_rad))))
+    assert by_vector.counts.sum() == len(ra)
+    # 恰好落在格线上的点可能因舍入分到相邻格子，只允许极少数差异
+    assert np.abs(by_angle.counts - by_vector.counts).sum() <= 4
+
+
+def test_equal_area_cells():
+    # 全天均匀分布时各格计数的期望相同，偏差应在泊松涨落范围内
+    ra, dec = sky_points(200000, seed=2)
+    density = SkyDensityMap(12, 6)
+    density.add(ra, dec)
+    expected = len(ra) / density.n_cells
+    assert np.abs(density.counts - expected).max() < 5 * np.sqrt(expected)
+    assert density.density().sum() * density.cell_area == pytest.approx(len(ra))
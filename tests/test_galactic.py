@@ -0,0 +1,57 @@
+# tests/test_galactic.py 银心坐标与 astropy（v4.0 参数集）的对照
+import numpy as np
+import pytest
+from celcoord import backends
+from celcoord.__main__ import build_parser
+from celcoord.galactic import GalactocentricFrame
+
+# astropy 的 Galactocentric（galactocentric_frame_defaults.set('v4.0')）给出的参考值：
+# 输入 ra(度), dec(度), 距离(pc), pmra*cosδ(mas/yr), pmdec(mas/yr), rv(km/s)，
+# 输出 x, y, z (pc), vx, vy, vz (km/s)
+REFERENCE = [
+    ((0.0, 0.0, 100.0, 0.0, 0.0, 0.0),
+     (-8127.682948155671, 49.41107627040048, -65.95221158451736, 12.9, 245.6, 7.78)),
+    # Sgr A* 本身落在银心
+    ((266.4051, -28.936175, 8122.0, 0.0, 0.0, 0.0),
+     (0.0, 0.0, 0.0, 12.9, 245.6, 7.78)),
+    # 天狼星
+    ((101.287155, -16.716116, 2.637, -546.01, -1223.07, -5.5),
+     (-8123.743555877065, -1.9125339387195295, 20.396997313448054,
+      25.8298758484118, 243.70758415702304, -4.045043331998455)),
+    ((45.0, 60.0, 1000.0, 10.0, -5.0, 20.0),
+     (-8869.145550357207, 664.329226663414, 40.810140090155805,
+      -37.21780934336222, 219.2758589638458, 9.842113548053769)),
+    ((200.0, -70.0, 3000.0, -3.0, 2.0, -40.0),
+     (-6399.555228750065, -2426.1075427168553, -362.968095630087,
+      -39.54223504798246, 251.8273570013152, 45.7307977937129)),
+    ((359.9, 89.5, 50.0, 1.0, 1.0, 0.0),
+     (-8146.129978765118, 37.56360825399736, 43.2818460221804,
+      12.705004634094788, 245.37901952574376, 7.939702029890472)),
+]
+
+
+@pytest.mark.parametrize('backend', backends.available_backends())
+def test_matches_astropy_v4_0(backend):
+    inputs = np.array([row for row, _ in REFERENCE])
+    expected = np.array([row for _, row in REFERENCE])
+    ra_hours = inputs[:, 0] / 15
+    frame = GalactocentricFrame()
+    with backends.using(backend):
+        positions = frame.positions(ra_hours, inputs[:, 1], inputs[:, 2])
+        velocities = frame.velocities(ra_hours, *inputs[:, 1:].T)
+    np.testing.assert_allclose(positions, expected[:, :3], rtol=0, atol=1e-6)
+    np.testing.assert_allclose(velocities, expected[:, 3:], rtol=0, atol=1e-9)
+
+
+def test_v_sun_is_parsed_by_argparse():
+    parser = build_parser()
+    args = parser.parse_args(['galactocentric', 'in.csv', '--v-sun', '11.1, 232.24,7.25'])
+    assert args.v_sun == (11.1, 232.24, 7.25)
+
+
+@pytest.mark.parametrize('text', ['12.9,245.6', '12.9,245.6,7.78,1', 'a,b,c', ''])
+def test_bad_v_sun_is_a_usage_error(text, capsys):
+    with pytest.raises(SystemExit) as exc:
+        build_parser().parse_args(['galactocentric', 'in.csv', '--v-sun', text])
+    assert exc.value.code == 2
+    assert '--v-sun' in capsys.readouterr().err
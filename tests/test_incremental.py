@@ -0,0 +1,77 @@
+# tests/test_incremental.py 增量转换的续传与改写检测
+import numpy as np
+import pytest
+from celcoord import incremental
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    # 缩小校验块，让几十行的文件也跨越多个块
+    monkeypatch.setattr(incremental, 'CHECK_BLOCK', 64)
+
+
+def write_rows(path, rows, mode='w'):
+    with open(path, mode) as f:
+        if mode == 'w':
+            f.write('ra,dec,distance\n')
+        for ra, dec, distance in rows:
+            f.write(f'{ra},{dec},{distance}\n')
+
+
+def rows(start, count):
+    return [(i % 24, (i % 180) - 89.5, i + 1.0) for i in range(start, start + count)]
+
+
+def rewrite_middle(path):
+    # 改写中间一行的一个数字，长度不变
+    data = bytearray(path.read_bytes())
+    middle = data.index(b'\n', len(data) // 2) + 1
+    data[middle] = ord('7') if data[middle] != ord('7') else ord('8')
+    path.write_bytes(bytes(data))
+
+
+def test_append_then_resume(tmp_path, small_blocks):
+    src, out = tmp_path / 'in.csv', tmp_path / 'out.csv'
+    write_rows(src, rows(0, 50))
+    assert incremental.update(str(src), str(out)) == ('rebuild', 50)
+    write_rows(src, rows(50, 30), mode='a')
+    assert incremental.update(str(src), str(out)) == ('append', 30)
+    state = incremental.load_state(str(out))
+    assert len(state['blocks']) == state['offset'] // 64
+    assert incremental.update(str(src), str(out)) == ('append', 0)
+    assert len(np.loadtxt(out, delimiter=',', skiprows=1)) == 80
+
+
+def test_rewrite_in_middle_is_detected(tmp_path, small_blocks):
+    src, out = tmp_path / 'in.csv', tmp_path / 'out.csv'
+    write_rows(src, rows(0, 80))
+    incremental.update(str(src), str(out))
+    rewrite_middle(src)
+    write_rows(src, rows(80, 5), mode='a')
+    assert incremental.update(str(src), str(out)) == ('rebuild', 85)
+    converted = np.loadtxt(out, delimiter=',', skiprows=1)
+    assert len(converted) == 85
+
+
+def test_quick_check_reads_only_sampled_blocks(tmp_path, small_blocks, monkeypatch):
+    src, out = tmp_path / 'in.csv', tmp_path / 'out.csv'
+    write_rows(src, rows(0, 200))
+    incremental.update(str(src), str(out))
+    # 不抽查时，快速校验只看末尾，中间的改写要等下一次完整校验才发现
+    monkeypatch.setattr(incremental, 'SAMPLE_BLOCKS', 0)
+    rewrite_middle(src)
+    write_rows(src, rows(200, 1), mode='a')
+    assert incremental.update(str(src), str(out), full_check=False) == ('append', 1)
+    write_rows(src, rows(201, 1), mode='a')
+    assert incremental.update(str(src), str(out)) == ('rebuild', 202)
+
+
+def test_quick_check_detects_replaced_file(tmp_path, small_blocks):
+    src, out = tmp_path / 'in.csv', tmp_path / 'out.csv'
+    write_rows(src, rows(0, 50))
+    incremental.update(str(src), str(out))
+    # 内容相同但换成了另一个文件（例如日志轮转）
+    replacement = tmp_path / 'new.csv'
+    replacement.write_bytes(src.read_bytes())
+    replacement.replace(src)
+    assert incremental.update(str(src), str(out), full_check=False) == ('rebuild', 50)
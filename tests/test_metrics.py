@@ -0,0 +1,27 @@
+# tests/test_metrics.py 阶段行数的统计
+import numpy as np
+import pytest
+from celcoord import metrics
+from celcoord.frames import transform
+from celcoord.galactic import GalactocentricFrame
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(metrics, 'enabled', True)
+    monkeypatch.setattr(metrics, '_counters', {})
+
+
+def stage_rows(op):
+    return sum(v for (name, labels), v in metrics._counters.items()
+               if name == 'celcoord_stage_rows_total' and ('op', op) in labels)
+
+
+def test_rows_counts_first_axis(enabled):
+    transform(np.ones((10, 3)))
+    assert stage_rows('transform') == 10
+
+
+def test_rows_skips_self(enabled):
+    GalactocentricFrame().positions(np.ones(7), np.ones(7), np.ones(7))
+    assert stage_rows('positions') == 7
@@ -0,0 +1,62 @@
+# tests/test_picking.py 点选只命中球面朝向观察者一侧的天体
+import os
+import numpy as np
+import pytest
+
+pytest.importorskip('PyQt5')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtCore import QPoint
+from PyQt5.QtWidgets import QApplication
+from celcoord.scene import SceneStore
+from celcoord_gui.picking import ScreenGridIndex
+from celcoord_gui.widget import CelestialSphereWidget
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def make_widget(app):
+    widget = CelestialSphereWidget(scene=SceneStore())
+    widget.resize(600, 500)
+    widget.x_rotation, widget.y_rotation = 30, -40
+    return widget
+
+
+def add_points(widget, directions, distances):
+    directions = np.asarray(directions, dtype=np.float64)
+    ra = np.degrees(np.arctan2(directions[:, 1], directions[:, 0])) % 360
+    dec = np.degrees(np.arcsin(directions[:, 2]))
+    widget.scene.add_chunk(ra, dec, np.asarray(distances, dtype=np.float64))
+    return widget.project_array(widget.scene.vectors())
+
+
+def test_back_facing_point_is_not_picked(app):
+    widget = make_widget(app)
+    toward = widget.toward_viewer()
+    # 正对观察者的点与正背面的点投影到屏幕上的同一位置
+    xy, visible = add_points(widget, [-toward, toward], [2.0, 1.0])
+    assert visible.all() and np.allclose(xy[0], xy[1], atol=1e-6)
+    assert len(widget.pick_index()) == 1
+    picked = widget.pick(QPoint(int(round(xy[1, 0])), int(round(xy[1, 1]))))
+    assert picked is not None and picked[2] == 1.0
+
+
+def test_only_back_facing_point_picks_nothing(app):
+    widget = make_widget(app)
+    xy, visible = add_points(widget, [-widget.toward_viewer()], [2.0])
+    # 相机在球外，背面的点仍在相机前方，只按深度符号无法排除
+    assert visible.all()
+    assert widget.pick(QPoint(int(round(xy[0, 0])), int(round(xy[0, 1])))) is None
+
+
+def test_grid_index_nearest():
+    xy = np.array([[10.0, 10.0], [14.0, 10.0], [40.0, 40.0], [-5.0, 3.0], [12.0, 11.0]])
+    visible = np.array([True, True, True, True, False])
+    index = ScreenGridIndex(xy, visible, 64, 64, cell=16)
+    assert len(index) == 3
+    assert index.nearest(13, 10) == 1
+    assert index.nearest(11, 11) == 0
+    assert index.nearest(40, 45, radius=6) == 2
+    assert index.nearest(40, 47, radius=6) is None
@@ -0,0 +1,136 @@
+# tests/test_pipeline.py 三线程分块转换的顺序、取消、出错与结果一致性
+import random
+import threading
+import time
+import numpy as np
+import pytest
+from celcoord import backends, pipeline
+from celcoord.catalog import RAW_COLUMNS, iter_catalog_chunks
+from celcoord.pipeline import Cancelled, ChunkPipeline
+
+CHUNK_ROWS = 7
+
+
+def write_catalog(path, kind, rows=150, seed=0):
+    rng = np.random.default_rng(seed)
+    if kind == 'spherical':
+        header = 'ra,dec,distance'
+        data = np.column_stack((rng.uniform(0, 24, rows), rng.uniform(-90, 90, rows),
+                                rng.uniform(0, 1e4, rows)))
+    else:
+        header = 'x,y,z'
+        data = rng.normal(0, 1e3, (rows, 3))
+        # 原点在标量与批量版本中都返回 (0, 0, 0)
+        data[3] = 0.0
+    with open(path, 'w') as f:
+        f.write(header + '\n')
+        for row in data:
+            f.write(','.join(repr(float(v)) for v in row) + '\n')
+    return path
+
+
+def reference(path):
+    # catalog.convert_lines 按相同的块大小给出的结果
+    chunks = list(iter_catalog_chunks(str(path), CHUNK_ROWS))
+    return np.concatenate([np.column_stack((c.ra_hours, c.dec_deg, c.distance, c.x, c.y, c.z))
+                           for c in chunks])
+
+
+def pipeline_threads():
+    return [t for t in threading.enumerate() if t.name.startswith('celcoord-')]
+
+
+@pytest.fixture
+def shuffled(monkeypatch):
+    # 每块随机耽搁一会儿，让多个计算线程乱序完成
+    rng = random.Random(0)
+    convert = pipeline.spherical_to_cartesian_into
+
+    def slow(buffer):
+        time.sleep(rng.uniform(0, 0.01))
+        convert(buffer)
+
+    monkeypatch.setattr(pipeline, 'spherical_to_cartesian_into', slow)
+
+
+@pytest.mark.parametrize('backend', backends.available_backends())
+@pytest.mark.parametrize('kind', ['spherical', 'cartesian'])
+def test_bitwise_equal_to_convert_lines(tmp_path, backend, kind):
+    source = write_catalog(tmp_path / 'in.csv', kind)
+    output = tmp_path / 'out.f64'
+    with backends.using(backend):
+        rows = ChunkPipeline(str(source), str(output), CHUNK_ROWS, workers=2).run()
+        expected = reference(source)
+    actual = np.fromfile(output, dtype='<f8').reshape(-1, RAW_COLUMNS)
+    assert rows == len(expected) == 150
+    assert np.array_equal(actual.view(np.uint8), expected.view(np.uint8))
+
+
+def test_chunks_written_in_order_with_several_workers(tmp_path, shuffled):
+    source = write_catalog(tmp_path / 'in.csv', 'spherical')
+    output = tmp_path / 'out.f64'
+    seqs = []
+    rows = ChunkPipeline(str(source), str(output), CHUNK_ROWS, workers=3,
+                         on_chunk=lambda buffer: seqs.append(buffer.seq)).run()
+    assert rows == 150
+    assert seqs == list(range(-(-150 // CHUNK_ROWS)))
+    actual = np.fromfile(output, dtype='<f8').reshape(-1, RAW_COLUMNS)
+    assert np.array_equal(actual, reference(source))
+    assert not pipeline_threads()
+
+
+def test_csv_output_matches_raw_output(tmp_path, shuffled):
+    source = write_catalog(tmp_path / 'in.csv', 'spherical')
+    ChunkPipeline(str(source), str(tmp_path / 'out.csv'), CHUNK_ROWS, workers=3).run()
+    text = np.loadtxt(tmp_path / 'out.csv', delimiter=',', skiprows=1)
+    np.testing.assert_allclose(text, reference(source), rtol=1e-9)
+
+
+def test_cancel_stops_all_stages(tmp_path):
+    source = write_catalog(tmp_path / 'in.csv', 'spherical')
+    seqs = []
+
+    def on_chunk(buffer):
+        seqs.append(buffer.seq)
+        if buffer.seq == 2:
+            job.cancel()
+
+    job = ChunkPipeline(str(source), str(tmp_path / 'out.f64'), CHUNK_ROWS, workers=2,
+                        on_chunk=on_chunk)
+    with pytest.raises(Cancelled):
+        job.run()
+    assert seqs == [0, 1, 2] and not job.complete
+    assert not pipeline_threads()
+
+
+def test_reader_error_is_raised(tmp_path):
+    source = write_catalog(tmp_path / 'in.csv', 'spherical')
+    with open(source, 'a') as f:
+        f.write('1,2,not-a-number\n')
+    job = ChunkPipeline(str(source), str(tmp_path / 'out.f64'), CHUNK_ROWS, workers=2)
+    with pytest.raises(ValueError):
+        job.run()
+    assert not job.complete
+    assert not pipeline_threads()
+
+
+def test_writer_error_is_raised(tmp_path):
+    source = write_catalog(tmp_path / 'in.csv', 'spherical')
+
+    def on_chunk(buffer):
+        if buffer.seq == 1:
+            raise RuntimeError("回调出错")
+
+    job = ChunkPipeline(str(source), str(tmp_path / 'out.f64'), CHUNK_ROWS, workers=2,
+                        on_chunk=on_chunk)
+    with pytest.raises(RuntimeError, match="回调出错"):
+        job.run()
+    assert not pipeline_threads()
+
+
+def test_unwritable_output_is_raised(tmp_path):
+    source = write_catalog(tmp_path / 'in.csv', 'spherical')
+    job = ChunkPipeline(str(source), str(tmp_path / 'missing' / 'out.csv'), CHUNK_ROWS)
+    with pytest.raises(FileNotFoundError):
+        job.run()
+    assert not pipeline_threads()
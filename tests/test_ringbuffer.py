@@ -0,0 +1,62 @@
+# tests/test_ringbuffer.py 环形缓冲区的回绕与覆盖后的顺序
+import numpy as np
+import pytest
+from celcoord.ringbuffer import RingBuffer
+
+
+def rows(start, stop):
+    # 第 k 行为 (k, -k)，便于从内容看出序号
+    k = np.arange(start, stop, dtype=np.float64)
+    return np.column_stack((k, -k))
+
+
+def test_wraparound_keeps_last_capacity_rows_in_order():
+    buf = RingBuffer(5, 2)
+    buf.append(rows(0, 3))
+    buf.append(rows(3, 7))   # 跨过末尾：写入位置 3, 4, 0, 1
+    assert len(buf) == 5 and buf.total == 7 and buf.start == 2
+    assert np.array_equal(buf.slice(), rows(2, 7))
+    assert np.array_equal(buf.last(), rows(6, 7)[0])
+
+
+def test_slice_by_sequence_after_overwrite():
+    buf = RingBuffer(5, 2)
+    for k in range(13):
+        buf.append(rows(k, k + 1))
+    # 序号 0..7 已被覆盖，请求的起点被截到最旧的一行
+    assert buf.start == 8
+    assert np.array_equal(buf.slice(0, 10), rows(8, 10))
+    assert np.array_equal(buf.slice(9), rows(9, 13))
+    assert np.array_equal(buf.slice(11, 13), rows(11, 13))
+    assert len(buf.slice(13)) == 0 and len(buf.slice(3, 6)) == 0
+
+
+def test_append_longer_than_capacity():
+    buf = RingBuffer(4, 2)
+    buf.append(rows(0, 2))
+    buf.append(rows(2, 11))
+    assert buf.total == 11
+    assert np.array_equal(buf.slice(), rows(7, 11))
+    # 读取方记住的序号在覆盖后仍按绝对序号取到新增部分
+    buf.append(rows(11, 13))
+    assert np.array_equal(buf.slice(11), rows(11, 13))
+    assert np.array_equal(buf.slice(), rows(9, 13))
+
+
+def test_slice_is_view_unless_it_wraps():
+    buf = RingBuffer(5, 2)
+    buf.append(rows(0, 4))
+    assert np.shares_memory(buf.slice(), buf.data)
+    buf.append(rows(4, 7))
+    wrapped = buf.slice()
+    assert not np.shares_memory(wrapped, buf.data)
+    assert np.array_equal(wrapped, rows(2, 7))
+
+
+def test_clear_and_capacity_check():
+    buf = RingBuffer(3, 2)
+    buf.append(rows(0, 5))
+    buf.clear()
+    assert len(buf) == 0 and buf.last() is None and len(buf.slice()) == 0
+    with pytest.raises(ValueError):
+        RingBuffer(0)
@@ -0,0 +1,58 @@
+# tests/test_scene.py 多个视图共用一个 SceneStore
+import gc
+import os
+import numpy as np
+import pytest
+from celcoord.scene import SceneStore
+
+
+class Listener:
+    def __init__(self, scene):
+        self.scene = scene
+        self.seen = []
+        scene.subscribe(self.on_changed)
+
+    def on_changed(self):
+        self.seen.append((self.scene.revision, len(self.scene)))
+
+
+def test_all_subscribers_see_each_update():
+    scene = SceneStore()
+    a, b = Listener(scene), Listener(scene)
+    scene.add_chunk(np.array([10.0, 20.0]), np.array([0.0, 5.0]))
+    scene.add_chunk(np.array([30.0]), np.array([-5.0]), np.array([7.0]))
+    scene.clear()
+    assert a.seen == b.seen == [(1, 2), (2, 3), (3, 0)]
+
+
+def test_dropped_subscriber_is_released():
+    scene = SceneStore()
+    kept, dropped = Listener(scene), Listener(scene)
+    del dropped
+    gc.collect()
+    scene.add_chunk(np.array([10.0]), np.array([0.0]))
+    assert kept.seen == [(1, 1)] and len(scene._listeners) == 1
+
+
+def test_two_views_share_the_same_data():
+    pytest.importorskip('PyQt5')
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    from celcoord_gui.widget import CelestialSphereWidget
+    app = QApplication.instance() or QApplication([])  # noqa: F841（视图需要应用对象存活）
+    scene = SceneStore()
+    views = [CelestialSphereWidget(scene=scene, frame=frame)
+             for frame in ('equatorial', 'galactic')]
+    for view in views:
+        view.resize(600, 500)
+    ra = np.linspace(0, 350, 36)
+    dec = np.zeros(36)
+    scene.add_chunk(ra, dec)
+    first = [view.catalog_vectors() for view in views]
+    # 两个视图拿到的是同一份数组，只是投影矩阵不同
+    assert np.shares_memory(first[0], first[1]) and len(first[0]) == 36
+    indexes = [view.pick_index() for view in views]
+    scene.add_chunk(np.array([45.0]), np.array([60.0]), np.array([3.0]))
+    assert all(len(view.catalog_vectors()) == 37 for view in views)
+    # 新数据使两个视图的点选索引都失效
+    assert all(view.pick_index() is not index for view, index in zip(views, indexes))
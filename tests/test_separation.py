@@ -0,0 +1,67 @@
+# tests/test_separation.py pairs_within 与逐对暴力计算的对照
+import numpy as np
+import pytest
+from celcoord import coords
+from celcoord.separation import pairs_within
+
+MAX_SEP = 1.5
+# 角距与阈值相差不到这么多的配对两边都可能判定，不参与比较
+MARGIN = 1e-9
+
+
+def sample_points(n=300, seed=0):
+    # 三分之一均匀分布在全天；其余聚集在赤经 0h/24h 接缝两侧和两个天极附近
+    rng = np.random.default_rng(seed)
+    k = n // 3
+    ra = np.concatenate((rng.uniform(0, 24, k),
+                         rng.normal(0, 0.05, k) % 24,
+                         rng.uniform(0, 24, n - 2 * k)))
+    dec = np.concatenate((np.degrees(np.arcsin(rng.uniform(-1, 1, k))),
+                          rng.uniform(-3, 3, k),
+                          rng.choice([-1, 1], n - 2 * k) * rng.uniform(88, 90, n - 2 * k)))
+    distance = 10 ** rng.uniform(0, 4, n)
+    return ra, dec, distance
+
+
+def brute_force(ra, dec, distance):
+    pairs = {}
+    for i in range(len(ra)):
+        for j in range(i + 1, len(ra)):
+            sep = coords.angular_separation(ra[i], dec[i], ra[j], dec[j])
+            if abs(sep - MAX_SEP) > MARGIN and sep <= MAX_SEP:
+                pairs[i, j] = (sep, coords.distance_3d(ra[i], dec[i], distance[i],
+                                                       ra[j], dec[j], distance[j]))
+    return pairs
+
+
+@pytest.fixture(scope='module')
+def points():
+    ra, dec, distance = sample_points()
+    return ra, dec, distance, brute_force(ra, dec, distance)
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_matches_brute_force(points, workers):
+    ra, dec, distance, expected = points
+    # 预算很小，使配对分散在许多块中
+    i, j, sep, dist = pairs_within(ra, dec, MAX_SEP, distance, memory_budget=2**16,
+                                   workers=workers)
+    assert np.all(i < j)
+    found = {(a, b): (s, d) for a, b, s, d in zip(i.tolist(), j.tolist(), sep, dist)
+             if abs(s - MAX_SEP) > MARGIN}
+    assert found.keys() == expected.keys()
+    for key, (s, d) in found.items():
+        assert s == pytest.approx(expected[key][0], abs=1e-9)
+        assert d == pytest.approx(expected[key][1], rel=1e-12)
+    # 接缝两侧（一个 < 1h、一个 > 23h）与天极附近都要有配对，否则没测到这些情况
+    across_seam = [(a, b) for a, b in found if min(ra[a], ra[b]) < 1 and max(ra[a], ra[b]) > 23]
+    near_pole = [(a, b) for a, b in found if abs(dec[a]) > 88 and abs(dec[b]) > 88]
+    assert across_seam and near_pole
+
+
+def test_groups_only_pair_within_group(points):
+    ra, dec, distance, expected = points
+    groups = np.arange(len(ra)) % 2
+    i, j, sep, _ = pairs_within(ra, dec, MAX_SEP, groups=groups, memory_budget=2**16)
+    found = {(a, b) for a, b, s in zip(i.tolist(), j.tolist(), sep) if abs(s - MAX_SEP) > MARGIN}
+    assert found == {(a, b) for a, b in expected if groups[a] == groups[b]}
@@ -0,0 +1,75 @@
+# tests/test_store.py 星表库读连接池的关闭与只读打开
+import sqlite3
+import threading
+import numpy as np
+import pytest
+from celcoord.store import CatalogStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CatalogStore(str(tmp_path / 'catalog.db'), readers=1)
+    store.insert(np.array([1.0, 2.0]), np.array([10.0, 20.0]), np.array([5.0, 6.0]))
+    yield store
+    store.close()
+
+
+def test_connection_returned_after_close_is_closed(store):
+    with store.pool.connection() as conn:
+        store.close()
+        assert conn.execute('SELECT count(*) FROM objects').fetchone()[0] == 2
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute('SELECT 1')
+    assert store.pool._idle.get_nowait() is None
+
+
+def test_acquire_after_close_raises(store):
+    store.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        with store.pool.connection():
+            pass
+
+
+def test_close_wakes_waiting_borrowers(store):
+    errors = []
+
+    def borrow():
+        try:
+            with store.pool.connection():
+                pass
+        except sqlite3.ProgrammingError as e:
+            errors.append(e)
+
+    with store.pool.connection():
+        # 只有一个连接且已借出，另一个线程只能等待
+        waiter = threading.Thread(target=borrow)
+        waiter.start()
+        waiter.join(0.1)
+        assert waiter.is_alive()
+        store.close()
+        waiter.join(5)
+    assert not waiter.is_alive() and len(errors) == 1
+
+
+def test_readonly_store_reads_without_writing(tmp_path):
+    path = str(tmp_path / 'catalog.db')
+    with CatalogStore(path) as writer:
+        writer.insert(np.array([1.0]), np.array([10.0]), np.array([5.0]))
+        with CatalogStore(path, readonly=True) as reader:
+            assert reader._writer is None and len(reader) == 1
+            with pytest.raises(sqlite3.OperationalError):
+                reader.insert(np.array([2.0]), np.array([20.0]), np.array([6.0]))
+            # 读连接本身也是 mode=ro
+            with reader.pool.connection() as conn:
+                with pytest.raises(sqlite3.OperationalError):
+                    conn.execute('DELETE FROM objects')
+            # 写连接之后提交的数据对只读库可见
+            writer.insert(np.array([3.0]), np.array([30.0]), np.array([7.0]))
+            assert len(reader) == 2
+
+
+def test_readonly_store_does_not_create_file(tmp_path):
+    path = tmp_path / 'missing.db'
+    with pytest.raises(sqlite3.OperationalError):
+        CatalogStore(str(path), readonly=True)
+    assert not path.exists()
@@ -0,0 +1,132 @@
+# tests/test_stream.py 流式转换的错误处理与缓冲上限
+import io
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import pytest
+from celcoord import stream
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ChunkedSource:
+    # 像管道一样每次只返回一小段数据
+    def __init__(self, data, size):
+        self.data, self.size, self.pos = data, size, 0
+
+    def read1(self, size=-1):
+        chunk = self.data[self.pos:self.pos + min(size, self.size)]
+        self.pos += len(chunk)
+        return chunk
+
+    read = read1
+
+
+def pipe(text, read_size=256, **kwargs):
+    stdout, stderr = io.BytesIO(), io.StringIO()
+    source = ChunkedSource(text.encode('utf-8'), read_size)
+    count = stream.run_pipe(source, stdout, stderr=stderr, **kwargs)
+    return count, stdout.getvalue().decode('utf-8'), stderr.getvalue()
+
+
+def test_bad_csv_header_is_skipped():
+    count, out, err = pipe('a,b,c\nra,dec,distance\n1,2,3\n')
+    assert count == 1
+    assert out.splitlines()[0] == 'ra,dec,distance,x,y,z'
+    assert err.startswith('第 1 行已跳过')
+
+
+def test_bad_csv_header_strict():
+    with pytest.raises(ValueError, match='第 1 行'):
+        pipe('a,b,c\n1,2,3\n', strict=True)
+
+
+def test_ndjson_output_has_no_duplicate_keys():
+    count, out, _ = pipe('{"id": 7, "RA": 1.5, "Dec": 10, "DIST": 2}\n')
+    assert count == 1
+    text = out.strip()
+    record = json.loads(text)
+    assert text.count('"ra"') == 1 and 'RA' not in record and 'Dec' not in record
+    assert record['id'] == 7 and record['ra'] == 1.5 and record['dec'] == 10
+
+
+def test_overlong_line_is_dropped():
+    long_line = '{"ra": 1, "dec": 2, "distance": 3, "pad": "' + 'x' * 5000 + '"}'
+    text = long_line + '\n{"ra": 4, "dec": 5, "distance": 6}\n'
+    count, out, err = pipe(text, max_buffer=1024)
+    assert count == 1 and json.loads(out)['ra'] == 4
+    assert err.startswith('第 1 行已跳过')
+    with pytest.raises(ValueError, match='第 1 行'):
+        pipe(text, max_buffer=1024, strict=True)
+
+
+class RepeatingSource:
+    # 反复给出同一段数据，并记下已被读走的字节数
+    def __init__(self, line, count):
+        self.line, self.left, self.consumed = line, count, 0
+
+    def read1(self, size=-1):
+        if not self.left:
+            return b''
+        self.left -= 1
+        self.consumed += len(self.line)
+        return self.line
+
+    read = read1
+
+
+def test_reader_buffer_is_byte_bounded():
+    line = b'1,2,3\n' * 100
+    source = RepeatingSource(line, 1000)
+    budget = stream._ByteBudget(4 * len(line))
+    blocks = queue.Queue()
+    threading.Thread(target=stream._reader, args=(source, blocks, budget), daemon=True).start()
+    time.sleep(0.2)
+    # 没有消费者时，读线程在额度用完后停止读取
+    assert budget.used <= budget.limit
+    assert source.consumed <= budget.limit + len(line)
+    number, lines, size = blocks.get()
+    budget.release(size)
+    time.sleep(0.1)
+    assert budget.used <= budget.limit
+
+
+class FailingSource(ChunkedSource):
+    # 给出全部数据之后读取出错，模拟管道或设备故障
+    def read1(self, size=-1):
+        chunk = super().read1(size)
+        if not chunk:
+            raise OSError("读取失败")
+        return chunk
+
+    read = read1
+
+
+def test_reader_error_is_raised_after_earlier_rows():
+    source = FailingSource(b'ra,dec,distance\n1,2,3\n4,5,6\n', 256)
+    stdout = io.BytesIO()
+    with pytest.raises(OSError, match='读取失败'):
+        stream.run_pipe(source, stdout, stderr=io.StringIO())
+    assert len(stdout.getvalue().decode('utf-8').splitlines()) == 3
+
+
+def test_cli_broken_pipe_exits_quietly():
+    proc = subprocess.Popen([sys.executable, '-m', 'celcoord', 'pipe'], cwd=ROOT,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE)
+    proc.stdin.write(b'ra,dec,distance\n1,2,3\n')
+    proc.stdin.flush()
+    proc.stdout.readline()
+    # 下游读了一行就关闭，之后的输出都写进已关闭的管道
+    proc.stdout.close()
+    try:
+        proc.stdin.write(b'1,2,3\n' * 200000)
+        proc.stdin.close()
+    except BrokenPipeError:
+        pass
+    assert proc.wait(30) == 1
+    assert b'Traceback' not in proc.stderr.read()
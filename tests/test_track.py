@@ -0,0 +1,87 @@
+# tests/test_track.py 轨迹图层的增量绘制
+import os
+import numpy as np
+import pytest
+
+pytest.importorskip('PyQt5')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QApplication
+from celcoord_gui.track import TrackLayer
+from celcoord_gui.widget import CelestialSphereWidget
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture(scope='module')
+def widget(app):
+    view = CelestialSphereWidget()
+    view.resize(600, 500)
+    return view
+
+
+@pytest.fixture
+def layer(monkeypatch):
+    # 记录每次画到图层上的起始序号
+    layer = TrackLayer(capacity=40)
+    layer.starts = []
+    draw = layer.draw_segments
+
+    def record(painter, widget, start):
+        layer.starts.append(start)
+        draw(painter, widget, start)
+
+    monkeypatch.setattr(layer, 'draw_segments', record)
+    return layer
+
+
+def draw(layer, widget):
+    image = QImage(600, 500, QImage.Format_ARGB32_Premultiplied)
+    painter = QPainter(image)
+    layer.draw(painter, widget)
+    painter.end()
+
+
+def append(layer, start, stop):
+    k = np.arange(start, stop, dtype=np.float64)
+    layer.append(k * 2 % 360, np.sin(k / 10) * 30, t=k)
+
+
+def test_only_new_points_are_drawn(layer, widget):
+    append(layer, 0, 10)
+    draw(layer, widget)
+    append(layer, 10, 15)
+    draw(layer, widget)
+    draw(layer, widget)   # 没有新点时不再画
+    # 第二次从上次的最后一点接着画，折线保持连续
+    assert layer.starts == [0, 9]
+    assert layer.drawn == 15
+
+
+def test_overwritten_points_trigger_rebuild(layer, widget):
+    append(layer, 0, 40)
+    draw(layer, widget)
+    # 覆盖的点数未超过 REBUILD_SLACK * capacity（10 个）时继续增量绘制
+    append(layer, 40, 48)
+    draw(layer, widget)
+    assert layer.starts == [0, 39]
+    append(layer, 48, 53)
+    draw(layer, widget)
+    # 图层上残留 13 个已覆盖的点，整体重画缓冲区中仍有的点
+    assert layer.starts == [0, 39, 13]
+    assert layer.layer_start == layer.points.start == 13
+
+
+def test_view_change_rebuilds_layer(layer, widget):
+    append(layer, 0, 10)
+    draw(layer, widget)
+    widget.y_rotation += 15
+    try:
+        draw(layer, widget)
+    finally:
+        widget.y_rotation -= 15
+    assert layer.starts == [0, 0]
+    assert np.array_equal(layer.times(), np.arange(10.0))
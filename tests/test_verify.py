@@ -0,0 +1,30 @@
+# tests/test_verify.py 校验命令覆盖分块转换的原地内核
+import numpy as np
+import pytest
+from celcoord import backends, verify
+
+
+@pytest.mark.parametrize('backend', backends.available_backends())
+def test_pipeline_kernels_match_batch(backend):
+    rng = np.random.default_rng(0)
+    sph, cart = verify.spherical_inputs(rng, 500), verify.cartesian_inputs(rng, 500)
+    with backends.using(backend):
+        results = verify.check_pipeline(backend, sph, cart)
+    assert [r['check'] for r in results] == ['pipeline.spherical_to_cartesian',
+                                             'pipeline.cartesian_to_spherical']
+    assert all(r['passed'] and r['differing_rows'] == 0 for r in results)
+
+
+def test_pipeline_check_reports_differing_rows(monkeypatch):
+    convert = verify.spherical_to_cartesian_into
+
+    def off_by_one_ulp(buffer):
+        convert(buffer)
+        buffer.data[7, 3] = np.nextafter(buffer.data[7, 3], np.inf)
+
+    monkeypatch.setattr(verify, 'spherical_to_cartesian_into', off_by_one_ulp)
+    rng = np.random.default_rng(0)
+    sph = verify.spherical_inputs(rng, 10)
+    result = verify.check_pipeline('numpy', sph, verify.cartesian_inputs(rng, 10))[0]
+    assert not result['passed'] and result['differing_rows'] == 1
+    assert result['worst_input'] == [float(c[7]) for c in sph]
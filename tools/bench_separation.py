@@ -0,0 +1,49 @@
+# tools/bench_separation.py 比较角距计算在标量、批量与并行路径上的吞吐量
+#
+# 用法：python tools/bench_separation.py [--n 20000] [--workers 4]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from celcoord.coords import angular_separation
+from celcoord.separation import separation_from, pairs_within
+
+
+def rate(pairs, seconds):
+    return pairs / seconds if seconds > 0 else float('inf')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="角距计算吞吐量对比")
+    parser.add_argument('--n', type=int, default=20000, help="两两计算的天体数")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    ra = rng.uniform(0, 24, args.n)
+    dec = np.degrees(np.arcsin(rng.uniform(-1, 1, args.n)))
+    pairs = args.n * (args.n - 1) // 2
+
+    sample = min(args.n, 200000)
+    start = time.perf_counter()
+    for k in range(sample):
+        angular_separation(ra[0], dec[0], ra[k], dec[k])
+    print(f"标量（单目标）   {rate(sample, time.perf_counter() - start):14,.0f} 对/秒")
+
+    start = time.perf_counter()
+    separation_from(ra[0], dec[0], ra, dec)
+    print(f"批量（单目标）   {rate(args.n, time.perf_counter() - start):14,.0f} 对/秒")
+
+    for workers in sorted({1, args.workers}):
+        start = time.perf_counter()
+        pairs_within(ra, dec, 1.0, workers=workers)
+        label = "批量（两两）" if workers == 1 else f"并行（两两×{workers}）"
+        print(f"{label:<14} {rate(pairs, time.perf_counter() - start):14,.0f} 对/秒")
+
+
+if __name__ == '__main__':
+    main()
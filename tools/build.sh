@@ -0,0 +1,31 @@
+#!/bin/sh
+# tools/build.sh 可复现地构建 dist/cel_coor_tran_system（Linux）
+#
+# 固定依赖版本、哈希种子与文件时间戳，同一提交在同一环境下构建结果一致。
+# 构建完成后用 --startup-report 启动一次，输出启动耗时分解。
+set -eu
+cd "$(dirname "$0")/.."
+
+export PYTHONHASHSEED=0
+export SOURCE_DATE_EPOCH="${SOURCE_DATE_EPOCH:-$(git log -1 --format=%ct)}"
+
+python -m pip install --quiet -r tools/build-requirements.txt
+python -m PyInstaller --clean --noconfirm cel_coor_tran_system.spec
+
+# 统一打包产物的修改时间
+find dist/cel_coor_tran_system -exec touch -h -d "@$SOURCE_DATE_EPOCH" {} +
+
+# 保留下来的 Qt 库与插件不能依赖被 spec 剔除的 Qt 库（例如 xcb 插件需要 Qt5DBus）
+missing=$(find dist/cel_coor_tran_system -name '*.so*' -path '*Qt5*' -exec ldd {} + 2>/dev/null \
+          | grep 'libQt5.*not found' | sort -u || true)
+if [ -n "$missing" ]; then
+    echo "打包结果缺少 Qt 库：" >&2
+    echo "$missing" >&2
+    exit 1
+fi
+du -sh dist/cel_coor_tran_system
+
+if [ "${SKIP_STARTUP_REPORT:-0}" != 1 ]; then
+    CELCOORD_STARTUP_REPORT=1 timeout 10 \
+        dist/cel_coor_tran_system/cel_coor_tran_system --startup-report || true
+fi
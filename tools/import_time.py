@@ -0,0 +1,70 @@
+# tools/import_time.py 测量并跟踪各包的冷启动导入耗时
+#
+# 用法：python tools/import_time.py [--runs N] [--json 记录文件]
+# 每个模块在独立的子进程中用 -X importtime 导入，取多次运行的最小值；
+# 超出预算或导入了不该导入的依赖时返回非零退出码，可直接用于 CI。
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 模块名 -> (预算毫秒, 导入后不得出现的模块)
+BUDGETS = {
+    'celcoord': (15, ('numpy', 'PyQt5')),
+    'celcoord.batch': (150, ('PyQt5',)),
+    'celcoord.catalog': (150, ('PyQt5',)),
+    'celcoord_gui': (15, ('numpy', 'PyQt5')),
+}
+
+
+def measure(module, forbidden):
+    code = (f"import sys, {module}\n"
+            f"print(','.join(m for m in {forbidden!r} if m in sys.modules))")
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    cumulative_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[12:].split('|'))
+        if name == module:
+            cumulative_us = int(cumulative)
+    leaked = [m for m in proc.stdout.strip().split(',') if m]
+    return cumulative_us / 1000, leaked
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="测量 celcoord 各包的导入耗时")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', help="把本次结果追加到该 JSON Lines 文件中")
+    args = parser.parse_args(argv)
+
+    ok = True
+    results = {}
+    for module, (budget, forbidden) in BUDGETS.items():
+        samples = [measure(module, forbidden) for _ in range(args.runs)]
+        best = min(ms for ms, _ in samples)
+        leaked = sorted(set(m for _, ms_leaked in samples for m in ms_leaked))
+        passed = best <= budget and not leaked
+        ok = ok and passed
+        results[module] = {'ms': round(best, 2), 'budget_ms': budget, 'leaked': leaked}
+        status = 'ok' if passed else 'FAIL'
+        extra = f"  额外导入: {', '.join(leaked)}" if leaked else ''
+        print(f"{module:<20} {best:8.2f} ms  (预算 {budget} ms)  {status}{extra}")
+
+    if args.json:
+        record = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                  'python': platform.python_version(),
+                  'results': results}
+        with open(args.json, 'a') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())